@@ -0,0 +1,138 @@
+"""
+Checkpointer工厂模块
+
+按配置创建LangGraph的checkpointer：
+- memory: 进程内存存储（默认），重启后会话状态丢失
+- sqlite: 本地SQLite文件存储（需安装 langgraph-checkpoint-sqlite，即 sqlite 可选依赖），重启后可恢复中断的会话
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+logger = logging.getLogger(__name__)
+
+# SQLite持久化checkpointer为可选依赖（pip install turingagent[sqlite]）
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    SQLITE_CHECKPOINTER_AVAILABLE = True
+except ImportError:
+    SQLITE_CHECKPOINTER_AVAILABLE = False
+
+if SQLITE_CHECKPOINTER_AVAILABLE:
+    class ThreadedSqliteSaver(SqliteSaver):
+        """
+        支持异步接口的SQLite checkpointer
+
+        服务端每个请求都在独立的事件循环中执行图，绑定事件循环的 AsyncSqliteSaver 无法跨请求共享；
+        这里复用同步 SqliteSaver（内部以线程锁串行访问连接），异步接口在工作线程中调用同步实现，
+        同一实例可同时用于任意事件循环中的 astream/ainvoke 和同步节点中的 invoke
+        """
+
+        async def aget_tuple(self, config):
+            return await asyncio.to_thread(self.get_tuple, config)
+
+        async def alist(
+            self,
+            config,
+            *,
+            filter: Optional[Dict[str, Any]] = None,
+            before=None,
+            limit: Optional[int] = None,
+        ) -> AsyncIterator:
+            checkpoints = await asyncio.to_thread(
+                lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+            )
+            for checkpoint in checkpoints:
+                yield checkpoint
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+        async def aput_writes(self, config, writes, task_id: str, task_path: str = ""):
+            return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+        async def adelete_thread(self, thread_id: str):
+            return await asyncio.to_thread(self.delete_thread, thread_id)
+
+# 按数据库文件复用的SQLite checkpointer，每个文件只持有一条长连接，进程退出时统一关闭
+_sqlite_checkpointers: Dict[str, "ThreadedSqliteSaver"] = {}
+_sqlite_checkpointers_lock = threading.Lock()
+
+
+def _create_sqlite_checkpointer(db_path: str):
+    """创建SQLite checkpointer，首次读写时建表并开启WAL日志模式"""
+    with _sqlite_checkpointers_lock:
+        checkpointer = _sqlite_checkpointers.get(db_path)
+        if checkpointer is not None:
+            return checkpointer
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # 连接在多个线程间共享，由SqliteSaver的线程锁保证串行访问
+        checkpointer = ThreadedSqliteSaver(sqlite3.connect(db_path, check_same_thread=False))
+        if not _sqlite_checkpointers:
+            atexit.register(_close_sqlite_checkpointers)
+        _sqlite_checkpointers[db_path] = checkpointer
+        logger.info(f"使用SQLite checkpointer: {db_path}")
+        return checkpointer
+
+
+def _close_sqlite_checkpointers():
+    """关闭所有SQLite checkpointer的连接（进程退出时调用）"""
+    with _sqlite_checkpointers_lock:
+        checkpointers = list(_sqlite_checkpointers.items())
+        _sqlite_checkpointers.clear()
+
+    for db_path, checkpointer in checkpointers:
+        try:
+            with checkpointer.lock:
+                checkpointer.conn.close()
+        except Exception as e:
+            logger.warning(f"关闭SQLite checkpointer连接失败 {db_path}: {e}")
+
+
+def create_checkpointer(checkpointer_type: str = "business"):
+    """
+    按配置创建checkpointer
+
+    Args:
+        checkpointer_type: "business" 或 "interaction"，持久化后端按类型使用独立的存储文件
+
+    Returns:
+        checkpointer实例，持久化后端不可用时退回InMemorySaver
+    """
+    from src.config import get_config_manager
+    config = get_config_manager().get_checkpointer_config()
+    backend = (config.backend or "memory").lower()
+
+    if backend == "sqlite":
+        if SQLITE_CHECKPOINTER_AVAILABLE:
+            db_path = os.path.join(os.path.expanduser(config.sqlite_dir), f"{checkpointer_type}.sqlite")
+            try:
+                return _create_sqlite_checkpointer(db_path)
+            except Exception as e:
+                logger.error(f"创建SQLite checkpointer失败，使用内存存储: {e}")
+        else:
+            logger.warning("未安装langgraph-checkpoint-sqlite，checkpointer使用内存存储")
+    elif backend != "memory":
+        logger.warning(f"不支持的checkpointer后端: {backend}，使用内存存储")
+
+    return InMemorySaver()
+
+
+def is_memory_checkpointer(checkpointer) -> bool:
+    """是否为进程内存checkpointer（可直接重建以清空全部记忆）"""
+    return isinstance(checkpointer, InMemorySaver)
+
+
+__all__ = [
+    'SQLITE_CHECKPOINTER_AVAILABLE',
+    'create_checkpointer',
+    'is_memory_checkpointer'
+]
@@ -5,12 +5,13 @@ EDW系统智能代理管理模块
 
 import logging
 import asyncio
+import threading
 from typing import Dict, Any, List
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import InMemorySaver
 from langchain.output_parsers import PydanticOutputParser
 from langchain.prompts import PromptTemplate
 from src.agent.mix_agent import LLMFactory
+from src.agent.checkpointer import create_checkpointer, is_memory_checkpointer
 from src.models.edw_models import ModelEnhanceRequest
 
 logger = logging.getLogger(__name__)
@@ -21,12 +22,14 @@ class EDWAgentManager:
     def __init__(self):
         self.llm = None
         # 创建两个不同的 checkpointer 用于不同功能组
-        self.business_checkpointer = InMemorySaver()  # 业务处理相关：validation + code_enhancement
-        self.interaction_checkpointer = InMemorySaver()  # 用户交互相关：chat + navigation
+        self.business_checkpointer = create_checkpointer("business")  # 业务处理相关：validation + code_enhancement
+        self.interaction_checkpointer = create_checkpointer("interaction")  # 用户交互相关：chat + navigation
         self.agents = {}
         self.parser = None
         self._initialized = False
         self._async_initialized = False
+        # 每个请求运行在独立线程的事件循环上，一次性异步初始化需要进程级的锁
+        self._async_init_lock = threading.Lock()
         self.code_enhancement_tools = []
         
     def initialize(self):
@@ -154,24 +157,33 @@ class EDWAgentManager:
         """异步初始化：包含需要异步获取的代码增强智能体和功能智能体"""
         if self._async_initialized:
             return
-            
-        # 先确保同步部分已初始化
-        if not self._initialized:
-            self.initialize()
-            
+        
+        # 并发的首次请求只初始化一次：轮询获取线程锁，等待期间不阻塞当前事件循环
+        while not self._async_init_lock.acquire(blocking=False):
+            await asyncio.sleep(0.05)
         try:
-            # 异步创建代码增强智能体
-            await self._create_code_enhancement_agent()
+            if self._async_initialized:
+                return
             
-            # 异步创建功能智能体
-            await self._create_function_agent()
-            
-            self._async_initialized = True
-            logger.info("EDW智能代理管理器异步初始化完成")
-            
-        except Exception as e:
-            logger.error(f"EDW智能代理管理器异步初始化失败: {e}")
-            raise
+            # 先确保同步部分已初始化
+            if not self._initialized:
+                self.initialize()
+                
+            try:
+                # 异步创建代码增强智能体
+                await self._create_code_enhancement_agent()
+                
+                # 异步创建功能智能体
+                await self._create_function_agent()
+                
+                self._async_initialized = True
+                logger.info("EDW智能代理管理器异步初始化完成")
+                
+            except Exception as e:
+                logger.error(f"EDW智能代理管理器异步初始化失败: {e}")
+                raise
+        finally:
+            self._async_init_lock.release()
     
     async def _create_code_enhancement_agent(self):
         """创建代码增强智能体 - 负责代码增强任务，需要异步获取MCP工具"""
@@ -361,21 +373,28 @@ class EDWAgentManager:
             memory_type: "all", "business", "interaction" 指定清除哪种类型的记忆
         """
         if thread_id:
-            # 清除特定线程的内存
-            try:
-                # InMemorySaver没有直接的清除方法，需要重新创建
-                logger.info(f"清除线程 {thread_id} 的会话记录")
-            except Exception as e:
-                logger.error(f"清除内存失败: {e}")
+            # 清除特定线程的内存 - delete_thread 一次删除该线程的全部检查点，无需逐个遍历
+            for checkpointer in self._select_checkpointers(memory_type):
+                try:
+                    checkpointer.delete_thread(thread_id)
+                except Exception as e:
+                    logger.error(f"清除内存失败: {e}")
+            logger.info(f"清除线程 {thread_id} 的会话记录 (类型: {memory_type})")
         else:
-            # 重新创建checkpointer来清除所有内存
+            # 重新创建checkpointer来清除所有内存（持久化存储的会话需按线程清除）
             if memory_type in ["all", "business"]:
-                self.business_checkpointer = InMemorySaver()
-                logger.info("业务处理记忆已清除")
+                if is_memory_checkpointer(self.business_checkpointer):
+                    self.business_checkpointer = create_checkpointer("business")
+                    logger.info("业务处理记忆已清除")
+                else:
+                    logger.warning("业务处理记忆使用持久化存储，请按线程清除")
             
             if memory_type in ["all", "interaction"]:
-                self.interaction_checkpointer = InMemorySaver()
-                logger.info("用户交互记忆已清除")
+                if is_memory_checkpointer(self.interaction_checkpointer):
+                    self.interaction_checkpointer = create_checkpointer("interaction")
+                    logger.info("用户交互记忆已清除")
+                else:
+                    logger.warning("用户交互记忆使用持久化存储，请按线程清除")
             
             # 重新初始化所有代理以使用新的checkpointer
             if self._initialized:
@@ -392,6 +411,15 @@ class EDWAgentManager:
             
             logger.info(f"会话记录已清除 (类型: {memory_type})")
     
+    def _select_checkpointers(self, memory_type: str = "all") -> List:
+        """按记忆类型选择需要操作的checkpointer"""
+        checkpointers = []
+        if memory_type in ["all", "business"]:
+            checkpointers.append(self.business_checkpointer)
+        if memory_type in ["all", "interaction"]:
+            checkpointers.append(self.interaction_checkpointer)
+        return checkpointers
+    
     def get_memory_stats(self) -> Dict[str, Any]:
         """获取内存使用统计"""
         try:
@@ -444,6 +472,11 @@ def get_code_enhancement_agent():
     """获取代码增强智能体"""
     return get_agent_manager().get_agent('code_enhancement')
 
+async def aget_code_enhancement_agent():
+    """获取代码增强智能体，首次使用时完成异步初始化（加载MCP工具）"""
+    await async_initialize_agents()
+    return get_code_enhancement_agent()
+
 def get_code_enhancement_tools():
     """获取代码增强工具列表"""
     manager = get_agent_manager()
@@ -484,9 +517,12 @@ def create_intent_analysis_agent():
     创建专门用于意图分析的无记忆agent
     
     该agent专门用于分析用户在代码微调阶段的意图，
-    不使用checkpointer以避免记忆干扰
+    不使用checkpointer以避免记忆干扰。
+    通过模型原生的 function calling 直接返回 RefinementIntentAnalysis 对象，
+    无需再用 PydanticOutputParser 解析文本。
     """
-    from langgraph.prebuilt import create_react_agent
+    from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+    from src.models.edw_models import RefinementIntentAnalysis
     
     # 专门的意图分析提示词
     intent_system_prompt = """你是一个专业的用户意图分析专家。
@@ -497,13 +533,13 @@ def create_intent_analysis_agent():
 1. 用户的真实情感倾向和实际需求
 2. 语境和上下文，不要只看字面意思
 3. 对于模糊或间接的表达，要推断其深层含义
-4. 如果用户表达含糊，倾向于理解为需要进一步沟通
-
-请严格按照要求的JSON格式输出分析结果。"""
+4. 如果用户表达含糊，倾向于理解为需要进一步沟通"""
     
-    return create_react_agent(
-        model=get_shared_llm(),
-        tools=[],  # 意图分析不需要工具
-        prompt=intent_system_prompt,
-        checkpointer=None  # 无记忆，避免干扰
-    )
\ No newline at end of file
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", intent_system_prompt),
+        MessagesPlaceholder("messages"),
+    ])
+    structured_llm = get_shared_llm().with_structured_output(
+        RefinementIntentAnalysis, method="function_calling"
+    )
+    return prompt | structured_llm
\ No newline at end of file
@@ -645,6 +645,19 @@ class ConfluenceManager:
         Returns:
             是否添加成功
         """
+        if not labels:
+            return True
+
+        # 批量接口一次请求提交全部标签，避免逐个标签往返
+        try:
+            label_data = [{"prefix": "global", "name": label} for label in labels]
+            self.confluence.post(f"rest/api/content/{page_id}/label", data=label_data)
+            print(f"标签添加成功: {', '.join(labels)}")
+            return True
+        except Exception as batch_error:
+            print(f"批量添加标签失败，回退为逐个添加: {batch_error}")
+
+        # 旧版本Confluence不支持数组提交时逐个添加
         try:
             for label in labels:
                 self.confluence.set_page_label(page_id, label)
@@ -4,14 +4,28 @@ Confluence集成工具
 为工作流提供Confluence页面创建和信息收集功能
 """
 
+import asyncio
 import logging
 import os
-from typing import Dict, Any, Optional, List
+import threading
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from .confluence_operate import ConfluenceManager
 
 logger = logging.getLogger(__name__)
 
+# 目标空间与父页面很少变化，按 (Confluence地址, 空间名, 页面路径) 缓存查找结果，
+# 避免每次创建页面都重复发起空间查询和逐级的页面路径查询
+_space_parent_cache: Dict[Tuple[str, str, Tuple[str, ...]], Tuple[str, Dict[str, Any]]] = {}
+_space_parent_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _get_shared_confluence_manager(url: str, username: str, api_token: str) -> ConfluenceManager:
+    """按连接配置复用ConfluenceManager，跨工具实例共享同一个HTTP客户端"""
+    return ConfluenceManager(url, username, "", api_token)
+
 
 class ConfluenceWorkflowTools:
     """Confluence工作流集成工具"""
@@ -56,10 +70,9 @@ class ConfluenceWorkflowTools:
     def _get_confluence_manager(self) -> ConfluenceManager:
         """获取Confluence管理器实例"""
         if not self.confluence_manager:
-            self.confluence_manager = ConfluenceManager(
+            self.confluence_manager = _get_shared_confluence_manager(
                 self.confluence_url,
                 self.username,
-                "",
                 self.api_token
             )
         return self.confluence_manager
@@ -114,9 +127,12 @@ class ConfluenceWorkflowTools:
             # 获取模型属性名称
             model_name = context.get("model_name", "")
             
+            # 统一使用同一个时间点，保证页面内各处日期一致
+            now = datetime.now()
+            
             # 生成文档内容
             doc_info = {
-                "title": self._generate_page_title(table_name, explanation, model_name),
+                "title": self._generate_page_title(table_name, explanation, model_name, now),
                 "template": "enhanced_model_template",
                 "schema_info": schema_info,
                 "field_info": field_info,
@@ -128,13 +144,13 @@ class ConfluenceWorkflowTools:
                     "alter_sql": alter_sql
                 },
                 "metadata": {
-                    "created_date": datetime.now().strftime('%Y年%m月%d日'),
+                    "created_date": now.strftime('%Y年%m月%d日'),
                     "model_type": "enhanced",
                     "source_table": table_name,
-                    "enhancement_timestamp": datetime.now().isoformat()
+                    "enhancement_timestamp": now.isoformat()
                 },
                 "stakeholders": self._get_model_stakeholders(schema_info["schema"]),
-                "review_info": self._generate_review_info(table_name, schema_info["schema"], model_name)
+                "review_info": self._generate_review_info(table_name, schema_info["schema"], model_name, now)
             }
             
             logger.info(f"✅ 模型文档信息收集完成: {table_name}")
@@ -173,26 +189,22 @@ class ConfluenceWorkflowTools:
             
             cm = self._get_confluence_manager()
             
-            # 1. 查找目标空间
-            target_space = cm.find_space_by_name(self.target_space_name)
-            if not target_space:
-                raise Exception(f"未找到空间: {self.target_space_name}")
-            
-            space_key = target_space['key']
-            
-            # 2. 确定页面路径
+            # ConfluenceManager是同步HTTP客户端，放到线程中执行以免阻塞事件循环，
+            # 这样多个页面的创建可以并发进行
+            # 1-3. 在后台线程中查找目标空间和父页面
             page_path = self._get_page_path_for_schema(schema)
+            # run_in_executor立即提交到线程池，下面的渲染期间查找已在进行
+            lookup_future = asyncio.get_running_loop().run_in_executor(
+                None, self._find_space_and_parent, cm, page_path
+            )
             
-            # 3. 查找父页面
-            parent_page = cm.find_page_by_path(space_key, page_path)
-            if not parent_page:
-                raise Exception(f"未找到父页面路径: {' -> '.join(page_path)}")
-            
-            # 4. 生成页面内容
+            # 4. 查找进行的同时在本地渲染页面内容，与网络请求解耦
             page_content = self._generate_page_content(doc_info)
+            space_key, parent_page = await lookup_future
             
             # 5. 创建页面
-            new_page = cm.create_page(
+            new_page = await asyncio.to_thread(
+                cm.create_page,
                 space_key=space_key,
                 title=doc_info["title"],
                 content=page_content,
@@ -202,7 +214,7 @@ class ConfluenceWorkflowTools:
             if new_page:
                 # 6. 添加标签
                 labels = self._generate_page_labels(doc_info)
-                cm.add_page_labels(new_page['id'], labels)
+                await asyncio.to_thread(cm.add_page_labels, new_page['id'], labels)
                 
                 # 7. 评论功能已禁用
                 logger.info("页面评论功能已暂时禁用")
@@ -223,6 +235,7 @@ class ConfluenceWorkflowTools:
                 logger.info(f"✅ Confluence页面创建成功: {table_name} - {new_page['id']}")
                 return result
             else:
+                self._invalidate_space_and_parent(page_path)
                 raise Exception("页面创建失败")
                 
         except Exception as e:
@@ -233,6 +246,32 @@ class ConfluenceWorkflowTools:
                 "table_name": doc_info.get("schema_info", {}).get("table_name", "unknown")
             }
     
+    def _find_space_and_parent(self, cm: ConfluenceManager, page_path: List[str]) -> tuple:
+        """查找目标空间和父页面（同步，供线程池调用），成功的结果在进程内缓存"""
+        cache_key = (self.confluence_url, self.target_space_name, tuple(page_path))
+        cached = _space_parent_cache.get(cache_key)
+        if cached:
+            return cached
+        
+        target_space = cm.find_space_by_name(self.target_space_name)
+        if not target_space:
+            raise Exception(f"未找到空间: {self.target_space_name}")
+        
+        space_key = target_space['key']
+        
+        parent_page = cm.find_page_by_path(space_key, page_path)
+        if not parent_page:
+            raise Exception(f"未找到父页面路径: {' -> '.join(page_path)}")
+        
+        with _space_parent_cache_lock:
+            _space_parent_cache[cache_key] = (space_key, parent_page)
+        return space_key, parent_page
+    
+    def _invalidate_space_and_parent(self, page_path: List[str]):
+        """页面创建失败时丢弃对应的查找缓存，下次重新查询（父页面可能已被移动或删除）"""
+        with _space_parent_cache_lock:
+            _space_parent_cache.pop((self.confluence_url, self.target_space_name, tuple(page_path)), None)
+    
     def _parse_table_name(self, table_name: str) -> Dict[str, str]:
         """解析表名获取schema信息"""
         if '.' in table_name:
@@ -343,9 +382,10 @@ class ConfluenceWorkflowTools:
         
         return stakeholder_mapping.get(schema, stakeholder_mapping["default"])
     
-    def _generate_page_title(self, table_name: str, explanation: str, model_name: str = "") -> str:
+    def _generate_page_title(self, table_name: str, explanation: str, model_name: str = "",
+                             now: Optional[datetime] = None) -> str:
         """生成页面标题 - 固定格式: 2025-08-14: Finance Data Model Review - 模型属性名称"""
-        date_str = datetime.now().strftime('%Y-%m-%d')
+        date_str = (now or datetime.now()).strftime('%Y-%m-%d')
         
         # 解析schema信息决定业务域
         if '.' in table_name:
@@ -372,7 +412,8 @@ class ConfluenceWorkflowTools:
             
         return f"{date_str}: {domain} Data Model Review - {display_name} [AI Generate]"
     
-    def _generate_review_info(self, table_name: str, schema: str, model_name: str = "") -> Dict[str, Any]:
+    def _generate_review_info(self, table_name: str, schema: str, model_name: str = "",
+                              now: Optional[datetime] = None) -> Dict[str, Any]:
         """生成审核信息"""
         stakeholders = self._get_model_stakeholders(schema)
         
@@ -392,7 +433,7 @@ class ConfluenceWorkflowTools:
             "entity_list": entity_list,
             "review_requesters": stakeholders["requesters"],
             "reviewer_mandatory": stakeholders["reviewers"][0] if stakeholders["reviewers"] else "@EDW Reviewer",
-            "review_date": datetime.now().strftime('%Y年%m月%d日'),
+            "review_date": (now or datetime.now()).strftime('%Y年%m月%d日'),
             "business_owner": stakeholders["business_owner"],
             "data_owner": stakeholders["data_owner"]
         }
@@ -445,33 +486,24 @@ class ConfluenceWorkflowTools:
     
     def _format_fields_for_confluence(self, field_info: Dict[str, Any], schema: str = "default", model_name: str = "", table_name: str = "") -> List[Dict[str, str]]:
         """格式化字段信息用于Confluence表格"""
-        formatted_fields = []
-        
-        # 确定模型名称，如果没有则使用默认值
+        # 与字段无关的列只计算一次
         display_model_name = model_name if model_name else "Enhanced Model"
+        display_table_name = table_name.lower() if table_name else "unknown"
         
-        # 新增字段
-        for field in field_info.get("new_fields", []):
-            # 获取字段信息 - 从state中fields正确获取
-            physical_name = field.get("physical_name", field.get("name", ""))  # 字段物理名（保持原样）
-            attribute_name = field.get("attribute_name", "")  # 字段属性名称（英文）
-            data_type = field.get("data_type", field.get("type", "string"))  # 数据类型
-            
-            # 如果没有attribute_name，使用physical_name作为备选
-            if not attribute_name:
-                attribute_name = physical_name
-            
-            formatted_fields.append({
+        # 新增字段 - 从state中fields获取，缺少attribute_name时使用physical_name作为备选
+        return [
+            {
                 "schema": schema,  # 使用实际的数据库schema
                 "mode_name": display_model_name,  # 使用模型名称
-                "table_name": table_name.lower() if table_name else "unknown",  # 使用实际表名（小写）
-                "attribute_name": attribute_name,  # 字段的属性名称（英文）
+                "table_name": display_table_name,  # 使用实际表名（小写）
+                "attribute_name": field.get("attribute_name", "") or physical_name,  # 字段的属性名称（英文）
                 "column_name": physical_name,  # 字段的物理名称
-                "column_type": data_type,  # 数据类型
+                "column_type": field.get("data_type", field.get("type", "string")),  # 数据类型
                 "pk": "N"
-            })
-        
-        return formatted_fields
+            }
+            for field in field_info.get("new_fields", [])
+            for physical_name in (field.get("physical_name", field.get("name", "")),)
+        ]
     
     def _build_enhancement_section(self, doc_info: Dict[str, Any]) -> str:
         """构建增强特定的页面部分"""
@@ -536,20 +568,24 @@ class ConfluenceWorkflowTools:
     
     def _generate_page_labels(self, doc_info: Dict[str, Any]) -> List[str]:
         """生成页面标签"""
-        labels = ['EDW', 'Enhanced-Model', 'Auto-Generated']
-        
         schema = doc_info["schema_info"]["schema"]
-        labels.append(schema)
-        
-        if doc_info["enhancement_details"]["has_new_fields"]:
-            labels.append('New-Fields')
+        schema_lower = schema.lower()
         
-        if 'fi' in schema.lower():
-            labels.extend(['Finance', 'Financial-Model'])
-        elif 'hr' in schema.lower():
-            labels.extend(['HR', 'Human-Resources'])
+        if 'fi' in schema_lower:
+            domain_labels = ('Finance', 'Financial-Model')
+        elif 'hr' in schema_lower:
+            domain_labels = ('HR', 'Human-Resources')
+        else:
+            domain_labels = ()
         
-        return labels
+        # 一次性构建标签列表，过滤掉不适用的项
+        return [
+            label for label in (
+                'EDW', 'Enhanced-Model', 'Auto-Generated', schema,
+                doc_info["enhancement_details"]["has_new_fields"] and 'New-Fields',
+                *domain_labels
+            ) if label
+        ]
     
     def _generate_page_comment(self, doc_info: Dict[str, Any]) -> str:
         """生成页面评论"""
@@ -1,4 +1,4 @@
 """GitHub工具模块"""
-from .github_tool import GitHubTool
+from .github_tool import GitHubTool, get_github_tool
 
-__all__ = ["GitHubTool"]
\ No newline at end of file
+__all__ = ["GitHubTool", "get_github_tool"]
\ No newline at end of file
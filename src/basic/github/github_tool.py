@@ -30,6 +30,7 @@ GitHub工具类：用于在企业GitHub仓库中搜索和读取代码
 import os
 import base64
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from pathlib import Path
@@ -924,4 +925,15 @@ class GitHubTool:
             return {
                 "status": "error",
                 "message": error_msg
-            }
\ No newline at end of file
+            }
+
+
+@lru_cache(maxsize=8)
+def get_github_tool(branch: Optional[str] = None) -> GitHubTool:
+    """
+    按分支获取共享的GitHubTool实例
+
+    复用同一个Github客户端及其HTTP连接池，避免每次推送/搜索都重新鉴权和获取仓库对象；
+    初始化失败时抛出异常且不会被缓存
+    """
+    return GitHubTool(branch=branch)
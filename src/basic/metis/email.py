@@ -1,5 +1,19 @@
 import requests
 import json
+import threading
+
+# 复用同一个HTTP会话，保持与Metis的长连接，避免每封邮件都重新做TLS握手
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = requests.Session()
+    return _session
 
 
 class EmailParam:
@@ -42,7 +56,7 @@ class Email:
                     # 'content-type': 'application/json',
                     # 'apiKey': self.token
                 }
-                ret = requests.post(self.url, json=self.param, headers=headers, timeout=10, verify=False)
+                ret = _get_session().post(self.url, json=self.param, headers=headers, timeout=10, verify=False)
                 if ret.status_code == 200:
                     text = ret.text
                 else:
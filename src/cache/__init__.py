@@ -6,8 +6,9 @@
 - 自动过期清理
 - 缓存命中率统计
 - 多线程安全
+- SQLite磁盘持久化（进程重启后复用）
 """
 
-from .table_cache import TableCacheManager, get_cache_manager, init_cache_manager
+from .table_cache import TableCacheManager, TableDiskCache, get_cache_manager, init_cache_manager
 
-__all__ = ['TableCacheManager', 'get_cache_manager', 'init_cache_manager']
\ No newline at end of file
+__all__ = ['TableCacheManager', 'TableDiskCache', 'get_cache_manager', 'init_cache_manager']
\ No newline at end of file
@@ -1,4 +1,8 @@
 import asyncio
+import json
+import os
+import random
+import sqlite3
 import time
 import logging
 from typing import Dict, Any, Optional, Tuple, List
@@ -30,21 +34,105 @@ class CacheStats:
             return 0.0
         return self.cache_hits / self.total_requests
 
+class TableDiskCache:
+    """基于SQLite的表结构持久化缓存，进程重启后仍可复用已查询的表结构"""
+    
+    def __init__(self, db_path: str, ttl_seconds: int = 3600):
+        self.db_path = os.path.expanduser(db_path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS table_fields ("
+            "cache_key TEXT PRIMARY KEY, data TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        logger.info(f"磁盘缓存初始化完成: {self.db_path}")
+    
+    def get(self, cache_key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """读取缓存，返回 (数据, 查询时间戳)，不存在或已过期时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, fetched_at FROM table_fields WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            data, fetched_at = row
+            if time.time() - fetched_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM table_fields WHERE cache_key = ?", (cache_key,))
+                self._conn.commit()
+                return None
+        
+        return json.loads(data), fetched_at
+    
+    def set(self, cache_key: str, data: Dict[str, Any], fetched_at: float):
+        """写入缓存"""
+        payload = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO table_fields (cache_key, data, fetched_at) VALUES (?, ?, ?)",
+                (cache_key, payload, fetched_at)
+            )
+            self._conn.commit()
+    
+    def delete_key(self, cache_key: str) -> int:
+        """精确删除单个缓存键，返回删除的条目数"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM table_fields WHERE cache_key = ?", (cache_key,))
+            self._conn.commit()
+            return cursor.rowcount
+    
+    def delete(self, table_pattern: Optional[str] = None) -> int:
+        """删除缓存，table_pattern为空时清空全部，返回删除的条目数"""
+        with self._lock:
+            if table_pattern is None:
+                cursor = self._conn.execute("DELETE FROM table_fields")
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM table_fields WHERE instr(cache_key, ?) > 0", (table_pattern.lower(),)
+                )
+            self._conn.commit()
+            return cursor.rowcount
+
+
 class TableCacheManager:
     """表结构信息缓存管理器"""
     
     def __init__(self, 
                  ttl_seconds: int = 3600,  # 默认1小时TTL
                  max_entries: int = 1000,   # 最大缓存条目数
-                 cleanup_interval: int = 300):  # 清理间隔5分钟
+                 cleanup_interval: int = 300,  # 清理间隔5分钟
+                 disk_cache_path: Optional[str] = None,  # 磁盘缓存路径，为空则不启用
+                 refresh_ahead_ratio: float = 0.1,  # 剩余有效期低于该比例时后台提前刷新
+                 refresh_jitter_seconds: float = 60):  # 后台刷新的随机延迟上限，避免集中刷新
         self.ttl_seconds = ttl_seconds
         self.max_entries = max_entries
         self.cleanup_interval = cleanup_interval
+        self.refresh_ahead_ratio = refresh_ahead_ratio
+        self.refresh_jitter_seconds = refresh_jitter_seconds
         
         self._cache: Dict[str, CacheEntry] = {}
         self._stats = CacheStats()
         self._lock = threading.RLock()  # 线程安全锁
         
+        # 正在后台刷新的缓存键及提交到后台事件循环的刷新任务
+        self._refreshing: set = set()
+        self._refresh_tasks: set = set()
+        
+        # 磁盘持久化缓存（二级缓存），初始化失败时仅使用内存缓存
+        self._disk_cache: Optional[TableDiskCache] = None
+        if disk_cache_path:
+            try:
+                self._disk_cache = TableDiskCache(disk_cache_path, ttl_seconds)
+            except Exception as e:
+                logger.warning(f"磁盘缓存初始化失败，仅使用内存缓存: {e}")
+        
         # 启动后台清理任务
         self._cleanup_task = None
         self._start_cleanup_task()
@@ -131,25 +219,42 @@ class TableCacheManager:
                     self._stats.cache_hits += 1
                     
                     logger.debug(f"缓存命中: {table_name} (命中次数: {entry.hits})")
+                    self._maybe_schedule_refresh(cache_key, table_name, entry, fetch_func)
                     return entry.data
                 else:
                     # 缓存过期，删除
                     del self._cache[cache_key]
                     logger.debug(f"缓存过期: {table_name}")
         
+        # 内存未命中，查询磁盘缓存
+        disk_entry = await self._read_disk_cache(cache_key)
+        if disk_entry is not None:
+            data, fetched_at = disk_entry
+            with self._lock:
+                # 沿用磁盘中的查询时间，保证TTL从首次查询开始计算
+                self._cache[cache_key] = CacheEntry(data=data, timestamp=fetched_at, hits=1)
+                self._stats.cache_hits += 1
+            logger.debug(f"磁盘缓存命中: {table_name}")
+            return data
+        
         # 缓存未命中，获取数据
         logger.debug(f"缓存未命中: {table_name}，正在查询数据库...")
         try:
             data = await fetch_func(table_name)
+            fetched_at = time.time()
             
             # 存入缓存
             with self._lock:
                 self._cache[cache_key] = CacheEntry(
                     data=data,
-                    timestamp=time.time(),
+                    timestamp=fetched_at,
                     hits=0
                 )
                 self._stats.cache_misses += 1
+            
+            # 仅持久化查询成功的结果，避免错误信息在重启后继续生效
+            if isinstance(data, dict) and data.get("status") == "success":
+                await self._write_disk_cache(cache_key, data, fetched_at)
                 
             logger.debug(f"数据已缓存: {table_name}")
             return data
@@ -160,6 +265,69 @@ class TableCacheManager:
             logger.error(f"获取表字段信息失败: {table_name}, 错误: {e}")
             raise
     
+    def _maybe_schedule_refresh(self, cache_key: str, table_name: str, entry: CacheEntry, fetch_func):
+        """热点条目临近过期时在后台提前刷新，使后续请求持续命中缓存（调用方需持有锁）"""
+        age = time.time() - entry.timestamp
+        if age < self.ttl_seconds * (1 - self.refresh_ahead_ratio) or cache_key in self._refreshing:
+            return
+        # 请求结束时其事件循环会被关闭，刷新任务提交到常驻的后台事件循环执行
+        from src.graph.tools.base import _get_background_loop
+        
+        self._refreshing.add(cache_key)
+        future = asyncio.run_coroutine_threadsafe(
+            self._refresh_entry(cache_key, table_name, fetch_func),
+            _get_background_loop()
+        )
+        self._refresh_tasks.add(future)
+        future.add_done_callback(self._refresh_tasks.discard)
+    
+    async def _refresh_entry(self, cache_key: str, table_name: str, fetch_func):
+        """后台刷新单个缓存条目，随机延迟以错开多个条目的刷新时间"""
+        try:
+            # 延迟不超过提前刷新窗口的一半，保证在过期前完成刷新
+            max_delay = min(self.refresh_jitter_seconds, self.ttl_seconds * self.refresh_ahead_ratio / 2)
+            await asyncio.sleep(random.uniform(0, max_delay))
+            
+            data = await fetch_func(table_name)
+            if not (isinstance(data, dict) and data.get("status") == "success"):
+                logger.debug(f"后台刷新未成功，保留原缓存: {table_name}")
+                return
+            
+            fetched_at = time.time()
+            with self._lock:
+                old_entry = self._cache.get(cache_key)
+                self._cache[cache_key] = CacheEntry(
+                    data=data,
+                    timestamp=fetched_at,
+                    hits=old_entry.hits if old_entry else 0
+                )
+            await self._write_disk_cache(cache_key, data, fetched_at)
+            logger.debug(f"后台刷新缓存完成: {table_name}")
+        except Exception as e:
+            logger.warning(f"后台刷新缓存失败: {table_name}, 错误: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(cache_key)
+    
+    async def _read_disk_cache(self, cache_key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """在线程池中读取磁盘缓存，读取失败时视为未命中"""
+        if self._disk_cache is None:
+            return None
+        try:
+            return await asyncio.to_thread(self._disk_cache.get, cache_key)
+        except Exception as e:
+            logger.warning(f"读取磁盘缓存失败: {cache_key}, 错误: {e}")
+            return None
+    
+    async def _write_disk_cache(self, cache_key: str, data: Dict[str, Any], fetched_at: float):
+        """在线程池中写入磁盘缓存，写入失败不影响本次查询结果"""
+        if self._disk_cache is None:
+            return
+        try:
+            await asyncio.to_thread(self._disk_cache.set, cache_key, data, fetched_at)
+        except Exception as e:
+            logger.warning(f"写入磁盘缓存失败: {cache_key}, 错误: {e}")
+    
     def get_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         with self._lock:
@@ -171,6 +339,7 @@ class TableCacheManager:
                 "hit_rate": f"{self._stats.hit_rate:.2%}",
                 "ttl_seconds": self.ttl_seconds,
                 "max_entries": self.max_entries,
+                "disk_cache_path": self._disk_cache.db_path if self._disk_cache else None,
                 "memory_usage_estimate": len(self._cache) * 1024  # 粗略估算
             }
     
@@ -186,6 +355,8 @@ class TableCacheManager:
                 # 清理所有缓存
                 cleared_count = len(self._cache)
                 self._cache.clear()
+                if self._disk_cache:
+                    self._disk_cache.delete()
                 logger.info(f"清理了所有缓存，共 {cleared_count} 个条目")
             else:
                 # 清理匹配模式的缓存
@@ -197,6 +368,9 @@ class TableCacheManager:
                 for key in keys_to_remove:
                     del self._cache[key]
                 
+                if self._disk_cache:
+                    self._disk_cache.delete(table_pattern)
+                
                 logger.info(f"清理了匹配 '{table_pattern}' 的缓存，共 {len(keys_to_remove)} 个条目")
     
     def refresh_table(self, table_name: str, fetch_func):
@@ -214,6 +388,8 @@ class TableCacheManager:
             if cache_key in self._cache:
                 del self._cache[cache_key]
                 logger.info(f"删除表 {table_name} 的缓存")
+            if self._disk_cache:
+                self._disk_cache.delete_key(cache_key)
         
         # 重新获取数据会自动缓存
         return self.get_table_fields(table_name, fetch_func)
@@ -264,11 +440,23 @@ def get_cache_manager() -> TableCacheManager:
     """获取全局缓存管理器实例"""
     global _global_cache_manager
     if _global_cache_manager is None:
-        _global_cache_manager = TableCacheManager()
+        from src.config import get_config_manager
+        cache_config = get_config_manager().get_cache_config()
+        _global_cache_manager = TableCacheManager(
+            ttl_seconds=cache_config.ttl_seconds,
+            max_entries=cache_config.max_entries,
+            cleanup_interval=cache_config.cleanup_interval,
+            disk_cache_path=cache_config.disk_path if cache_config.disk_enabled else None
+        )
     return _global_cache_manager
 
-def init_cache_manager(ttl_seconds: int = 3600, max_entries: int = 1000) -> TableCacheManager:
+def init_cache_manager(ttl_seconds: int = 3600, max_entries: int = 1000,
+                       disk_cache_path: Optional[str] = None) -> TableCacheManager:
     """初始化缓存管理器"""
     global _global_cache_manager
-    _global_cache_manager = TableCacheManager(ttl_seconds=ttl_seconds, max_entries=max_entries)
+    _global_cache_manager = TableCacheManager(
+        ttl_seconds=ttl_seconds,
+        max_entries=max_entries,
+        disk_cache_path=disk_cache_path
+    )
     return _global_cache_manager
\ No newline at end of file
@@ -15,6 +15,7 @@ from .config_manager import (
     CacheConfig, 
     ValidationConfig, 
     SystemConfig,
+    CheckpointerConfig,
     EDWConfig,
     get_config_manager, 
     init_config_manager
@@ -26,6 +27,7 @@ __all__ = [
     'CacheConfig', 
     'ValidationConfig',
     'SystemConfig',
+    'CheckpointerConfig',
     'EDWConfig',
     'get_config_manager',
     'init_config_manager'
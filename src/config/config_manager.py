@@ -24,6 +24,14 @@ class CacheConfig:
     max_entries: int = 1000
     cleanup_interval: int = 300
     enabled: bool = True
+    disk_enabled: bool = True                               # 是否启用磁盘持久化缓存
+    disk_path: str = "~/.edw_cache/table_fields.sqlite"     # 磁盘缓存文件路径
+
+@dataclass
+class CheckpointerConfig:
+    """会话检查点存储配置"""
+    backend: str = "memory"                     # memory: 进程内存；sqlite: 本地SQLite文件（重启后可恢复会话）
+    sqlite_dir: str = "~/.edw_checkpoints"      # SQLite检查点文件目录
 
 @dataclass
 class ValidationConfig:
@@ -56,6 +64,7 @@ class EDWConfig:
     validation: ValidationConfig = field(default_factory=ValidationConfig)
     system: SystemConfig = field(default_factory=SystemConfig)
     message_management: MessageManagementConfig = field(default_factory=MessageManagementConfig)
+    checkpointer: CheckpointerConfig = field(default_factory=CheckpointerConfig)
     prompts: Dict[str, str] = field(default_factory=dict)
     
 class ConfigManager:
@@ -100,7 +109,9 @@ class ConfigManager:
                 ttl_seconds=int(os.getenv("EDW_CACHE_TTL", "3600")),
                 max_entries=int(os.getenv("EDW_CACHE_MAX_ENTRIES", "1000")),
                 cleanup_interval=300,
-                enabled=os.getenv("EDW_CACHE_ENABLED", "true").lower() == "true"
+                enabled=os.getenv("EDW_CACHE_ENABLED", "true").lower() == "true",
+                disk_enabled=os.getenv("EDW_DISK_CACHE_ENABLED", "true").lower() == "true",
+                disk_path=os.getenv("EDW_DISK_CACHE_PATH", "~/.edw_cache/table_fields.sqlite")
             ),
             validation=ValidationConfig(
                 similarity_threshold=float(os.getenv("EDW_SIMILARITY_THRESHOLD", "0.6")),
@@ -119,6 +130,10 @@ class ConfigManager:
                 keep_recent_count=int(os.getenv("EDW_KEEP_RECENT_COUNT", "5")),
                 max_context_length=int(os.getenv("EDW_MAX_CONTEXT_LENGTH", "10"))
             ),
+            checkpointer=CheckpointerConfig(
+                backend=os.getenv("EDW_CHECKPOINTER_BACKEND", "memory"),
+                sqlite_dir=os.getenv("EDW_CHECKPOINTER_SQLITE_DIR", "~/.edw_checkpoints")
+            ),
             prompts=self._get_default_prompts()
         )
     
@@ -213,6 +228,10 @@ class ConfigManager:
         system_data = data.get('system', {})
         system_config = SystemConfig(**system_data)
         
+        # 解析checkpointer配置
+        checkpointer_data = data.get('checkpointer', {})
+        checkpointer_config = CheckpointerConfig(**checkpointer_data)
+        
         # 解析提示词
         prompts = data.get('prompts', {})
         
@@ -221,6 +240,7 @@ class ConfigManager:
             cache=cache_config,
             validation=validation_config,
             system=system_config,
+            checkpointer=checkpointer_config,
             prompts=prompts
         )
     
@@ -246,7 +266,9 @@ class ConfigManager:
                     'ttl_seconds': self._config.cache.ttl_seconds,
                     'max_entries': self._config.cache.max_entries,
                     'cleanup_interval': self._config.cache.cleanup_interval,
-                    'enabled': self._config.cache.enabled
+                    'enabled': self._config.cache.enabled,
+                    'disk_enabled': self._config.cache.disk_enabled,
+                    'disk_path': self._config.cache.disk_path
                 },
                 'validation': {
                     'similarity_threshold': self._config.validation.similarity_threshold,
@@ -258,6 +280,10 @@ class ConfigManager:
                     'thread_id_length': self._config.system.thread_id_length,
                     'max_retry_attempts': self._config.system.max_retry_attempts,
                     'request_timeout': self._config.system.request_timeout
+                },
+                'checkpointer': {
+                    'backend': self._config.checkpointer.backend,
+                    'sqlite_dir': self._config.checkpointer.sqlite_dir
                 }
             }
             
@@ -300,6 +326,11 @@ class ConfigManager:
         config = self.load_config()
         return config.message_management
     
+    def get_checkpointer_config(self) -> CheckpointerConfig:
+        """获取checkpointer配置"""
+        config = self.load_config()
+        return config.checkpointer
+    
     def get_prompt(self, prompt_name: str) -> str:
         """获取提示词模板"""
         config = self.load_config()
@@ -7,6 +7,7 @@
 
 import logging
 import json
+from string import Template
 from typing import List, Optional
 from langchain.schema.messages import HumanMessage, AIMessage
 
@@ -182,24 +183,18 @@ def _build_validation_prompt(context: dict, state: dict) -> str:
 请直接生成Markdown格式的回复内容："""
 
 
-def _build_refinement_prompt(context: dict, state: dict) -> str:
-    """构建代码微调场景的prompt"""
-    
-    current_round = state.get("current_refinement_round", 1)
-    table_name = state.get("table_name", "")
-    fields_count = len(state.get("fields", []))
-    
-    return f"""你刚为用户生成了数据模型增强代码，现在需要征求用户的反馈。
+# 代码微调场景的prompt模板（模块加载时构建一次）
+_REFINEMENT_PROMPT_TEMPLATE = Template("""你刚为用户生成了数据模型增强代码，现在需要征求用户的反馈。
 
 **上下文信息：**
 ```json
-{json.dumps(context, ensure_ascii=False, indent=2)}
+$context_json
 ```
 
 **生成结果概要：**
-- **目标表**：`{table_name}`
-- **新增字段数**：{fields_count}个
-- **当前轮次**：第{current_round}轮交互
+- **目标表**：`$table_name`
+- **新增字段数**：$fields_count个
+- **当前轮次**：第$current_round轮交互
 
 请生成一个**Markdown格式**的自然询问，要求：
 
@@ -217,7 +212,22 @@ def _build_refinement_prompt(context: dict, state: dict) -> str:
 - 包含明确的询问或选择项
 - 保持专业但友好的语调
 
-请直接生成Markdown格式的询问内容："""
+请直接生成Markdown格式的询问内容：""")
+
+
+def _build_refinement_prompt(context: dict, state: dict) -> str:
+    """构建代码微调场景的prompt"""
+    
+    current_round = state.get("current_refinement_round", 1)
+    table_name = state.get("table_name", "")
+    fields_count = len(state.get("fields", []))
+    
+    return _REFINEMENT_PROMPT_TEMPLATE.substitute(
+        context_json=json.dumps(context, ensure_ascii=False, indent=2),
+        table_name=table_name,
+        fields_count=fields_count,
+        current_round=current_round
+    )
 
 
 def _build_general_prompt(context: dict) -> str:
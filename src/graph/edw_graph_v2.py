@@ -5,6 +5,7 @@ EDW主图定义（重构版）
 
 import logging
 import uuid
+from functools import lru_cache
 from langgraph.graph import StateGraph, START, END
 from src.models.states import EDWState
 from src.agent.edw_agents import get_shared_checkpointer
@@ -36,9 +37,7 @@ from src.graph.nodes import (
     code_refinement_node,
     # 外部集成节点
     github_push_node,
-    edw_email_node,
-    edw_confluence_node,
-    edw_adb_update_node,
+    edw_publish_node,
     # Review子图
     create_review_subgraph,
 )
@@ -49,8 +48,9 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def create_model_dev_graph():
-    """创建模型开发子图"""
+    """创建模型开发子图（拓扑固定，编译结果在进程内复用）"""
     
     # 创建验证子图实例
     validation_subgraph = create_validation_subgraph()
@@ -76,9 +76,7 @@ def create_model_dev_graph():
         .add_node("code_refinement_node", code_refinement_node)
         # 外部集成节点
         .add_node("github_push_node", github_push_node)
-        .add_node("adb_update_node", edw_adb_update_node)
-        .add_node("email_node", edw_email_node)
-        .add_node("confluence_node", edw_confluence_node)
+        .add_node("publish_node", edw_publish_node)
         # 总结节点
         .add_node("workflow_summary", workflow_summary_node)
         
@@ -111,10 +109,9 @@ def create_model_dev_graph():
         
         # 后续流程
         .add_edge("model_addition_node", "github_push_node")
-        .add_edge("github_push_node", "adb_update_node")
-        .add_edge("adb_update_node", "confluence_node")
-        .add_edge("confluence_node", "email_node")
-        .add_edge("email_node", "workflow_summary")
+        # ADB更新与Confluence文档+邮件在发布节点内并发执行
+        .add_edge("github_push_node", "publish_node")
+        .add_edge("publish_node", "workflow_summary")
         .add_edge("workflow_summary", END)
     )
     
@@ -123,8 +120,9 @@ def create_model_dev_graph():
     return model_dev_graph.compile(checkpointer=checkpointer)
 
 
+@lru_cache(maxsize=1)
 def create_main_graph():
-    """创建主图"""
+    """创建主图（拓扑固定，编译结果在进程内复用）"""
     
     # 创建模型开发子图
     model_dev = create_model_dev_graph()
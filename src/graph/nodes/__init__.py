@@ -34,6 +34,7 @@ from .external.github import github_push_node
 from .external.email import edw_email_node
 from .external.confluence import edw_confluence_node
 from .external.adb import edw_adb_update_node
+from .external.publish import edw_publish_node
 
 # Review节点（从子图导入）
 from .review.code_review import create_review_subgraph
@@ -71,6 +72,7 @@ __all__ = [
     'edw_email_node',
     'edw_confluence_node',
     'edw_adb_update_node',
+    'edw_publish_node',
     
     # Review子图
     'create_review_subgraph',
@@ -31,10 +31,15 @@ async def edw_function_handler_node(state: EDWState) -> Dict[str, Any]:
         # 获取Agent管理器
         agent_manager = get_agent_manager()
 
-        # 获取功能Agent（应该在项目启动时已初始化）
+        # 功能Agent依赖MCP工具，首次使用时才异步初始化
+        try:
+            await agent_manager.async_initialize()
+        except Exception as e:
+            logger.error(f"功能Agent异步初始化失败: {e}")
+
         function_agent = agent_manager.agents.get('function')
         if not function_agent:
-            error_msg = "功能Agent未正确初始化，请检查项目启动时的初始化流程"
+            error_msg = "功能Agent未正确初始化，请检查MCP服务与模型配置"
             logger.error(error_msg)
             send_node_message(state, "function_handler", "failed", f"错误: {error_msg}", 0.0)
             return {
@@ -84,7 +84,7 @@ async def navigate_node(state: EDWState):
         return {"type": "error", "user_id": state.get("user_id", ""), "error_message": error_msg}
 
 
-def chat_node(state: EDWState):
+async def chat_node(state: EDWState):
     """聊天节点：处理普通对话"""
     try:
         # 使用带监控的配置管理器 - 聊天智能体独立memory
@@ -103,7 +103,7 @@ def chat_node(state: EDWState):
         else:
             content = last_message.content if hasattr(last_message, 'content') else str(last_message)
         
-        response = chat_agent.invoke(
+        response = await chat_agent.ainvoke(
             {"messages": [{"role": "user", "content": content}]},
             config
         )
@@ -119,7 +119,7 @@ def chat_node(state: EDWState):
         return {"messages": [AIMessage("抱歉，我遇到了一些问题，请稍后再试。")], "error_message": error_msg}
 
 
-def edw_model_node(state: EDWState):
+async def edw_model_node(state: EDWState):
     """模型节点：进一步分类模型相关任务"""
     
     # 如果已经识别到具体的意图类型，直接返回
@@ -147,7 +147,7 @@ def edw_model_node(state: EDWState):
         else:
             content = last_message.content if hasattr(last_message, 'content') else str(last_message)
         
-        response = llm_agent.invoke(
+        response = await llm_agent.ainvoke(
             {"messages": [{"role": "user", "content": prompt.format(input=content)}]},
             config
         )
@@ -4,12 +4,47 @@
 """
 
 import logging
+import os
 from langgraph.graph import END
 from src.models.states import EDWState
 
 logger = logging.getLogger(__name__)
 
 
+# 导航节点/模型分类节点产出的任务类型 -> 主路由目标节点，路由时一次字典查找即可
+_TASK_TYPE_ROUTES = {
+    "other": "chat_node",
+    "error": "chat_node",
+    "function": "function_node",
+    "model_dev": "model_node",
+    "model_enhance": "model_node",
+    "model_add": "model_node",
+    "switch_model": "model_node",
+}
+
+# 模型任务类型 -> 验证子图节点
+_MODEL_TASK_ROUTES = {
+    "model_enhance": "model_enhance_data_validation_node",
+    "model_add": "model_add_data_validation_node",
+}
+
+
+# 微调意图置信度阈值，可通过环境变量重新校准
+_REFINE_HIGH_CONFIDENCE = float(os.getenv("EDW_REFINE_HIGH_CONFIDENCE", "0.8"))
+_REFINE_MIN_CONFIDENCE = float(os.getenv("EDW_REFINE_MIN_CONFIDENCE", "0.6"))
+
+# (置信度档位, 意图) -> 目标节点；档位 2: 高置信度, 1: 中等置信度, 0: 过低
+# 未列出的组合（包括所有过低置信度）默认继续流程
+_REFINEMENT_ROUTES = {
+    (2, "REFINEMENT_NEEDED"): "code_refinement_node",
+    (1, "REFINEMENT_NEEDED"): "code_refinement_node",  # 中等置信度时倾向于响应用户需求
+}
+_REFINEMENT_DEFAULT_ROUTE = "github_push_node"
+
+# 单次增强后最多执行的代码微调次数，达到上限后直接继续流程，避免意图误判导致无限循环
+_MAX_REFINEMENT_ROUNDS = int(os.getenv("EDW_MAX_REFINEMENT_ROUNDS", "5"))
+
+
 def routing_fun(state: EDWState):
     """主路由函数：决定进入聊天、模型处理还是功能节点"""
     task_type = state.get("type", "")
@@ -17,6 +52,11 @@ def routing_fun(state: EDWState):
     if not task_type:
         return "chat_node"
     
+    route = _TASK_TYPE_ROUTES.get(task_type)
+    if route:
+        return route
+    
+    # 非标准的类型值按子串兼容匹配
     if 'function' in task_type:
         return "function_node"
     elif 'model' in task_type:
@@ -31,12 +71,15 @@ def model_routing_fun(state: EDWState):
     if not task_type:
         return END
     
-    if "model_enhance" in task_type:
-        return "model_enhance_data_validation_node"
-    elif "model_add" in task_type:
-        return "model_add_data_validation_node"
-    else:
-        return END
+    route = _MODEL_TASK_ROUTES.get(task_type)
+    if route:
+        return route
+    
+    # 非标准的类型值按子串兼容匹配
+    for type_key, node_name in _MODEL_TASK_ROUTES.items():
+        if type_key in task_type:
+            return node_name
+    return END
 
 
 def route_after_validation_check(state: EDWState):
@@ -68,26 +111,18 @@ def enhancement_routing_fun(state: EDWState):
 def refinement_loop_routing(state: EDWState):
     """基于LLM分析结果的智能循环路由"""
     
+    refinement_rounds = state.get("refinement_rounds") or 0
+    if refinement_rounds >= _MAX_REFINEMENT_ROUNDS:
+        logger.warning(f"微调次数已达上限 ({refinement_rounds}/{_MAX_REFINEMENT_ROUNDS})，继续后续流程")
+        return _REFINEMENT_DEFAULT_ROUTE
+    
     user_intent = state.get("user_intent", "SATISFIED_CONTINUE")
     intent_confidence = state.get("intent_confidence", 0.5)
     
     logger.info(f"微调路由决策 - 意图: {user_intent}, 置信度: {intent_confidence}")
     
-    # 高置信度的意图识别
-    if intent_confidence >= 0.8:
-        if user_intent == "REFINEMENT_NEEDED":
-            return "code_refinement_node"
-        elif user_intent in ["SATISFIED_CONTINUE", "UNRELATED_TOPIC"]:
-            return "github_push_node"
-    
-    # 低置信度情况下的保守策略
-    elif intent_confidence >= 0.6:
-        if user_intent == "REFINEMENT_NEEDED":
-            return "code_refinement_node"  # 倾向于响应用户需求
-        else:
-            return "github_push_node"
-    
-    # 极低置信度，默认继续流程
-    else:
+    bucket = (intent_confidence >= _REFINE_HIGH_CONFIDENCE) + (intent_confidence >= _REFINE_MIN_CONFIDENCE)
+    if not bucket:
         logger.warning(f"意图识别置信度过低 ({intent_confidence})，默认继续流程")
-        return "github_push_node"
\ No newline at end of file
+    
+    return _REFINEMENT_ROUTES.get((bucket, user_intent), _REFINEMENT_DEFAULT_ROUTE)
@@ -3,12 +3,12 @@
 实现模型增强处理的核心逻辑
 """
 
-import json
 import logging
-from datetime import datetime
+import time
 from langchain.schema.messages import AIMessage
 from src.models.states import EDWState
-from src.graph.utils.enhancement import execute_code_enhancement_task
+from src.graph.utils.enhancement import execute_code_enhancement_task, collect_table_schemas
+from src.graph.utils.field import normalize_fields
 from src.graph.utils.message_sender import (
     send_node_message,
     send_code_message
@@ -17,6 +17,21 @@ from src.graph.utils.message_sender import (
 logger = logging.getLogger(__name__)
 
 
+def _summarize_enhancement_result(enhancement_result: dict) -> str:
+    """
+    生成增强结果的简要概要（包含的键及代码长度）
+
+    完整代码已通过 enhance_code 等状态字段保存，消息中不再内联整个结果，
+    避免KB级代码被JSON转义后重复占用消息通道和后续对话上下文
+    """
+    lines = [f"- 结果字段: {', '.join(key for key, value in enhancement_result.items() if value)}"]
+    for key, label in (("enhanced_code", "增强代码"), ("new_table_ddl", "CREATE TABLE"), ("alter_statements", "ALTER TABLE")):
+        value = enhancement_result.get(key)
+        if isinstance(value, str) and value:
+            lines.append(f"- {label}: {len(value)} 字符")
+    return "\n".join(lines)
+
+
 async def edw_model_enhance_node(state: EDWState):
     """模型增强处理节点"""
     
@@ -55,9 +70,17 @@ async def edw_model_enhance_node(state: EDWState):
         # 🎯 发送代码增强进度
         send_node_message(state, "AI", "processing", f"让我基于您的需求生成新的代码...", 0.3)
         
+        # 从表字段缓存中获取底表结构（验证阶段已查询过），直接写入提示词，省去智能体查询底表结构的工具调用
+        schema_tables = list(state.get("base_tables", []) or [])
+        schema_tables.extend(
+            (field.get("source_table") if isinstance(field, dict) else getattr(field, "source_table", "")) or ""
+            for field in fields
+        )
+        table_schemas = await collect_table_schemas([t.strip() for t in schema_tables])
+        
         # 异步执行代码增强 - 优化版本：只传递state，所有参数都从state获取
         enhancement_result = await execute_code_enhancement_task(
-            state=state,
+            state={**state, "table_schemas": table_schemas},
             enhancement_mode="initial_enhancement"
         )
         
@@ -101,24 +124,16 @@ async def edw_model_enhance_node(state: EDWState):
 - CREATE TABLE 语句已生成
 - ALTER TABLE 语句已生成
 
-### 📊 详细结果
-```json
-{json.dumps(enhancement_result, ensure_ascii=False, indent=2)}
-```
+### 📊 结果概要
+{_summarize_enhancement_result(enhancement_result)}
 
 ### 📋 新增字段列表
 """
             # 添加字段详情
-            for field in fields:
-                if isinstance(field, dict):
-                    source_name = field.get('source_name', '')
-                    physical_name = field.get('physical_name', '')
-                    attribute_name = field.get('attribute_name', '')
-                else:
-                    source_name = getattr(field, 'source_name', '')
-                    physical_name = getattr(field, 'physical_name', '')
-                    attribute_name = getattr(field, 'attribute_name', '')
-                formatted_message += f"- {physical_name} ({attribute_name}) <- 源字段: {source_name}\n"
+            formatted_message += "".join(
+                f"- {physical_name} ({attribute_name}) <- 源字段: {source_name}\n"
+                for source_name, physical_name, attribute_name in normalize_fields(fields)
+            )
             
             # 🎯 发送完成进度
             send_node_message(
@@ -147,9 +162,10 @@ async def edw_model_enhance_node(state: EDWState):
                     "table_name": table_name,
                     "fields_added": len(fields),
                     "base_tables_analyzed": enhancement_result.get("base_tables_analyzed", 0),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp_ns": time.time_ns()
                 },
-                "session_state": "enhancement_completed"
+                "session_state": "enhancement_completed",
+                "refinement_rounds": 0  # 新的增强结果重新开始计算微调次数
             }
         else:
             error_msg = enhancement_result.get("error", "未知错误")
@@ -7,10 +7,12 @@ from .github import github_push_node
 from .email import edw_email_node
 from .confluence import edw_confluence_node
 from .adb import edw_adb_update_node
+from .publish import edw_publish_node
 
 __all__ = [
     'github_push_node',
     'edw_email_node',
     'edw_confluence_node',
     'edw_adb_update_node',
+    'edw_publish_node',
 ]
\ No newline at end of file
@@ -10,6 +10,8 @@ from typing import Dict, Any
 from langchain.schema.messages import AIMessage
 
 from src.graph.tools.adb_tools import update_adb_notebook, detect_code_language
+from src.graph.tools.base import now_strings
+from src.graph.utils.message import build_error_state
 from src.graph.utils.message_sender import send_node_message
 
 logger = logging.getLogger(__name__)
@@ -45,21 +47,13 @@ async def edw_adb_update_node(state: Dict[str, Any]) -> Dict[str, Any]:
             error_msg = "缺少ADB代码路径"
             logger.error(error_msg)
             send_node_message(state, "adb_update", "failed", f"错误: {error_msg}", 0.0)
-            return {
-                "messages": [AIMessage(content=f"ADB更新跳过: {error_msg}")],
-                "error_message": error_msg,
-                "user_id": user_id
-            }
+            return build_error_state(f"ADB更新跳过: {error_msg}", error_msg, user_id)
         
         if not enhanced_code:
             error_msg = "缺少增强后的代码"
             logger.error(error_msg)
             send_node_message(state, "adb_update", "failed", f"错误: {error_msg}", 0.0)
-            return {
-                "messages": [AIMessage(content=f"ADB更新跳过: {error_msg}")],
-                "error_message": error_msg,
-                "user_id": user_id
-            }
+            return build_error_state(f"ADB更新跳过: {error_msg}", error_msg, user_id)
         
         # 🎯 发送检测进度
         send_node_message(state, "adb_update", "processing", "检测代码语言和准备更新...", 0.3)
@@ -97,7 +91,7 @@ async def edw_adb_update_node(state: Dict[str, Any]) -> Dict[str, Any]:
             )
             
             # 构建成功消息
-            update_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            update_time = now_strings()[0]
             message_content = f"已成功更新ADB笔记本\n\n"
             message_content += f"路径: {adb_code_path}\n"
             message_content += f"语言: {language}\n"
@@ -119,23 +113,19 @@ async def edw_adb_update_node(state: Dict[str, Any]) -> Dict[str, Any]:
             logger.error(f"ADB更新失败: {error_msg}")
             # 🎯 发送失败进度
             send_node_message(state, "adb_update", "failed", f"错误: {error_msg}", 0.0)
-            return {
-                "messages": [AIMessage(content=f"ADB更新失败: {error_msg}")],
-                "error_message": error_msg,
-                "user_id": user_id,
-                "adb_path": adb_code_path
-            }
+            return build_error_state(
+                f"ADB更新失败: {error_msg}",
+                error_msg,
+                user_id,
+                adb_path=adb_code_path
+            )
             
     except Exception as e:
         error_msg = f"ADB更新节点处理失败: {str(e)}"
         logger.error(error_msg)
         # 🎯 发送异常失败进度
         send_node_message(state, "adb_update", "failed", f"错误: {error_msg}", 0.0)
-        return {
-            "messages": [AIMessage(content=f"ADB节点处理失败: {str(e)}")],
-            "error_message": error_msg,
-            "user_id": state.get("user_id", "")
-        }
+        return build_error_state(f"ADB节点处理失败: {str(e)}", error_msg, state.get("user_id", ""))
 
 
 
@@ -9,6 +9,7 @@ from typing import Dict, Any
 from langchain.schema.messages import AIMessage
 
 from src.graph.tools.confluence_tools import create_model_documentation
+from src.graph.utils.message import build_error_state
 from src.graph.utils.message_sender import send_node_message
 
 logger = logging.getLogger(__name__)
@@ -61,20 +62,11 @@ async def edw_confluence_node(state: Dict[str, Any]) -> Dict[str, Any]:
         if confluence_result["success"]:
             logger.info("Confluence文档创建成功")
             
-            # 获取文档信息
-            result_data = confluence_result.get("result", {})
-            confluence_page_url = result_data.get("page_url", "") if isinstance(result_data, dict) else ""
-            confluence_page_id = result_data.get("page_id", "") if isinstance(result_data, dict) else ""
-            confluence_title = result_data.get("page_title", "") if isinstance(result_data, dict) else ""
-            
-            # 从metadata中也尝试获取
-            metadata = confluence_result.get("metadata", {})
-            if not confluence_page_url:
-                confluence_page_url = metadata.get("page_url", "")
-            if not confluence_page_id:
-                confluence_page_id = metadata.get("page_id", "")
-            if not confluence_title:
-                confluence_title = metadata.get("page_title", "")
+            # 获取文档信息 - 成功时create_model_documentation保证metadata中包含以下字段
+            metadata = confluence_result["metadata"]
+            confluence_page_url = metadata["page_url"]
+            confluence_page_id = metadata["page_id"]
+            confluence_title = metadata["page_title"]
             
             # 🎯 发送成功进度
             send_node_message(
@@ -108,7 +100,7 @@ async def edw_confluence_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 "confluence_title": confluence_title,
                 # 其他详细结果
                 "confluence_result": confluence_result,
-                "confluence_creation_time": metadata.get("creation_time", ""),
+                "confluence_creation_time": metadata["creation_time"],
                 "session_state": "confluence_completed"
             }
         else:
@@ -116,23 +108,19 @@ async def edw_confluence_node(state: Dict[str, Any]) -> Dict[str, Any]:
             logger.error(f"Confluence文档创建失败: {error_msg}")
             # 🎯 发送失败进度
             send_node_message(state, "confluence", "failed", f"错误: {error_msg}", 0.0)
-            return {
-                "messages": [AIMessage(content=f"Confluence文档创建失败: {error_msg}")],
-                "error_message": error_msg,
-                "user_id": user_id,
-                "confluence_attempted": True
-            }
+            return build_error_state(
+                f"Confluence文档创建失败: {error_msg}",
+                error_msg,
+                user_id,
+                confluence_attempted=True
+            )
             
     except Exception as e:
         error_msg = f"Confluence节点处理失败: {str(e)}"
         logger.error(error_msg)
         # 🎯 发送异常失败进度
         send_node_message(state, "confluence", "failed", f"错误: {error_msg}", 0.0)
-        return {
-            "messages": [AIMessage(content=f"Confluence节点处理失败: {str(e)}")],
-            "error_message": error_msg,
-            "user_id": state.get("user_id", "")
-        }
+        return build_error_state(f"Confluence节点处理失败: {str(e)}", error_msg, state.get("user_id", ""))
 
 
 # edw_confluence_node_async 已被移除，因为主函数edw_confluence_node现在已经是async定义
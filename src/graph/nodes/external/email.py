@@ -9,6 +9,7 @@ from typing import Dict, Any
 from langchain.schema.messages import AIMessage
 
 from src.graph.tools.email_tools import send_model_review_email
+from src.graph.utils.message import build_error_state
 from src.graph.utils.message_sender import send_node_message
 
 logger = logging.getLogger(__name__)
@@ -96,24 +97,24 @@ async def edw_email_node(state: Dict[str, Any]) -> Dict[str, Any]:
             logger.error(f"邮件发送失败: {error_msg}")
             # 🎯 发送失败进度
             send_node_message(state, "email", "failed", f"错误: {error_msg}", 0.0)
-            return {
-                "messages": [AIMessage(content=f"邮件发送失败: {error_msg}")],
-                "error_message": error_msg,
-                "user_id": user_id,
-                "email_sent": False
-            }
+            return build_error_state(
+                f"邮件发送失败: {error_msg}",
+                error_msg,
+                user_id,
+                email_sent=False
+            )
             
     except Exception as e:
         error_msg = f"邮件节点处理失败: {str(e)}"
         logger.error(error_msg)
         # 🎯 发送异常失败进度
         send_node_message(state, "email", "failed", f"错误: {error_msg}", 0.0)
-        return {
-            "messages": [AIMessage(content=f"邮件节点处理失败: {str(e)}")],
-            "error_message": error_msg,
-            "user_id": state.get("user_id", ""),
-            "email_sent": False
-        }
+        return build_error_state(
+            f"邮件节点处理失败: {str(e)}",
+            error_msg,
+            state.get("user_id", ""),
+            email_sent=False
+        )
 
 
 # edw_email_node_async 已被移除，因为主函数edw_email_node现在已经是async定义
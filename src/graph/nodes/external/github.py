@@ -6,7 +6,8 @@ GitHub集成节点
 import logging
 from langchain.schema.messages import AIMessage
 from src.models.states import EDWState
-from src.basic.github import GitHubTool
+from src.basic.github import get_github_tool
+from src.graph.utils.message import build_error_state
 from src.graph.utils.message_sender import send_node_message
 
 logger = logging.getLogger(__name__)
@@ -33,25 +34,25 @@ def github_push_node(state: EDWState):
             error_msg = "缺少增强后的代码，无法推送到GitHub"
             logger.error(error_msg)
             send_node_message(state, "github_push", "skipped", "跳过: 缺少增强代码", 1.0)
-            return {
-                "messages": [AIMessage(content=f"GitHub推送跳过: {error_msg}")],
-                "user_id": user_id,
-                "status": "skipped",
-                "status_message": error_msg,
-                "error_message": error_msg  # 向后兼容
-            }
+            return build_error_state(
+                f"GitHub推送跳过: {error_msg}",
+                error_msg,
+                user_id,
+                status="skipped",
+                status_message=error_msg
+            )
         
         if not code_path:
             error_msg = "缺少代码文件路径，无法推送到GitHub"
             logger.error(error_msg)
             send_node_message(state, "github_push", "skipped", "跳过: 缺少代码路径", 1.0)
-            return {
-                "messages": [AIMessage(content=f"GitHub推送跳过: {error_msg}")],
-                "user_id": user_id,
-                "status": "skipped",
-                "status_message": error_msg,
-                "error_message": error_msg  # 向后兼容
-            }
+            return build_error_state(
+                f"GitHub推送跳过: {error_msg}",
+                error_msg,
+                user_id,
+                status="skipped",
+                status_message=error_msg
+            )
         
         # 🎯 验证JIRA号（非必需但推荐）
         jira_number = state.get("jira_number", "").strip()
@@ -67,19 +68,19 @@ def github_push_node(state: EDWState):
         
         # 初始化GitHub工具
         try:
-            github_tool = GitHubTool(branch = state.get("branch_name"))
+            github_tool = get_github_tool(state.get("branch_name") or None)
         except Exception as e:
             error_msg = f"初始化GitHub工具失败: {str(e)}"
             logger.error(error_msg)
             send_node_message(state, "github_push", "failed", f"错误: {error_msg}", 0.0)
-            return {
-                "messages": [AIMessage(content=f"GitHub工具初始化失败: {error_msg}")],
-                "user_id": user_id,
-                "status": "error",
-                "status_message": error_msg,
-                "status_details": {"exception": str(e)},
-                "error_message": error_msg  # 向后兼容
-            }
+            return build_error_state(
+                f"GitHub工具初始化失败: {error_msg}",
+                error_msg,
+                user_id,
+                status="error",
+                status_message=error_msg,
+                status_details={"exception": str(e)}
+            )
         
         # 🎯 发送推送进度
         send_node_message(state, "github_push", "processing", f"正在推送代码到GitHub: {table_name}", 0.7)
@@ -165,39 +166,39 @@ def github_push_node(state: EDWState):
                 logger.error(f"GitHub推送失败: {error_msg}")
                 # 🎯 发送失败进度
                 send_node_message(state, "github_push", "failed", f"错误: {error_msg}", 0.0)
-                return {
-                    "messages": [AIMessage(content=f"GitHub推送失败: {error_msg}")],
-                    "user_id": user_id,
-                    "status": "error",
-                    "status_message": f"推送失败: {error_msg}",
-                    "status_details": {"result": result},
-                    "error_message": error_msg  # 向后兼容
-                }
+                return build_error_state(
+                    f"GitHub推送失败: {error_msg}",
+                    error_msg,
+                    user_id,
+                    status="error",
+                    status_message=f"推送失败: {error_msg}",
+                    status_details={"result": result}
+                )
                 
         except Exception as e:
             error_msg = f"推送到GitHub时发生异常: {str(e)}"
             logger.error(error_msg)
             # 🎯 发送异常失败进度
             send_node_message(state, "github_push", "failed", f"错误: {error_msg}", 0.0)
-            return {
-                "messages": [AIMessage(content=f"GitHub推送异常: {str(e)}")],
-                "user_id": user_id,
-                "status": "error",
-                "status_message": error_msg,
-                "status_details": {"exception": str(e), "code_path": code_path},
-                "error_message": error_msg  # 向后兼容
-            }
+            return build_error_state(
+                f"GitHub推送异常: {str(e)}",
+                error_msg,
+                user_id,
+                status="error",
+                status_message=error_msg,
+                status_details={"exception": str(e), "code_path": code_path}
+            )
             
     except Exception as e:
         error_msg = f"GitHub推送节点处理失败: {str(e)}"
         logger.error(error_msg)
         # 🎯 发送全局异常失败进度
         send_node_message(state, "github_push", "failed", f"错误: {error_msg}", 0.0)
-        return {
-            "messages": [AIMessage(content=f"GitHub节点处理失败: {str(e)}")],
-            "user_id": state.get("user_id", ""),
-            "status": "error",
-            "status_message": error_msg,
-            "status_details": {"exception": str(e)},
-            "error_message": error_msg  # 向后兼容
-        }
\ No newline at end of file
+        return build_error_state(
+            f"GitHub节点处理失败: {str(e)}",
+            error_msg,
+            state.get("user_id", ""),
+            status="error",
+            status_message=error_msg,
+            status_details={"exception": str(e)}
+        )
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+发布编排节点
+
+GitHub推送完成后，并发执行ADB更新与Confluence文档生成，
+邮件依赖Confluence页面链接，在文档生成后立即发送
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, List
+
+from src.graph.nodes.external.adb import edw_adb_update_node
+from src.graph.nodes.external.confluence import edw_confluence_node
+from src.graph.nodes.external.email import edw_email_node
+from src.graph.utils.field import normalize_field_dicts
+
+logger = logging.getLogger(__name__)
+
+
+def _merge_node_updates(updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    按顺序合并多个节点的状态更新，语义与依次执行这些节点一致：
+    messages 累加，其余字段后者覆盖前者
+    """
+    merged = {}
+    messages = []
+    for update in updates:
+        if not update:
+            continue
+        for key, value in update.items():
+            if key == "messages":
+                messages.extend(value or [])
+            else:
+                merged[key] = value
+    if messages:
+        merged["messages"] = messages
+    return merged
+
+
+async def _confluence_then_email(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """先生成Confluence文档，再带上页面链接发送评审邮件"""
+    # 两个节点都要遍历字段列表，先统一为字典，下游无需再逐个区分dict/对象
+    state = {**state, "fields": normalize_field_dicts(state.get("fields"))}
+    confluence_update = await edw_confluence_node(state)
+    email_state = {**state, **{k: v for k, v in (confluence_update or {}).items() if k != "messages"}}
+    email_update = await edw_email_node(email_state)
+    return [confluence_update, email_update]
+
+
+async def edw_publish_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    发布编排节点 - ADB更新与Confluence文档+邮件两条链路并发执行
+
+    Args:
+        state: EDW状态字典
+
+    Returns:
+        合并后的状态更新（顺序与 adb -> confluence -> email 串行执行时一致）
+    """
+    adb_result, docs_result = await asyncio.gather(
+        edw_adb_update_node(state),
+        _confluence_then_email(state),
+        return_exceptions=True
+    )
+
+    updates = []
+    if isinstance(adb_result, BaseException):
+        logger.error(f"ADB更新链路异常: {adb_result}")
+    else:
+        updates.append(adb_result)
+
+    if isinstance(docs_result, BaseException):
+        logger.error(f"文档与邮件链路异常: {docs_result}")
+    else:
+        updates.extend(docs_result)
+
+    return _merge_node_updates(updates)
+
+
+__all__ = ['edw_publish_node']
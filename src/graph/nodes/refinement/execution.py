@@ -3,22 +3,28 @@
 执行代码微调任务
 """
 
+import hashlib
 import logging
+import time
 from datetime import datetime
 from src.models.states import EDWState
+from src.graph.utils.enhancement import execute_code_enhancement_task
+from src.server.socket_manager import get_session_socket
 
 logger = logging.getLogger(__name__)
 
+# 微调历史只保留最近几轮，避免checkpoint随轮次线性膨胀
+_MAX_REFINEMENT_HISTORY = 5
+
 
 async def code_refinement_node(state: EDWState):
     """代码微调执行节点 - 复用增强引擎"""
     
     user_id = state.get("user_id", "")
+    # 无论成功与否都计入微调次数，由路由函数据此限制循环
+    refinement_rounds = (state.get("refinement_rounds") or 0) + 1
     
     try:
-        # 导入执行任务函数（从独立的utils模块）
-        from src.graph.utils.enhancement import execute_code_enhancement_task
-        
         # 使用微调模式的增强引擎 - 参数从state中获取
         refinement_result = await execute_code_enhancement_task(
             enhancement_mode="refinement",
@@ -31,8 +37,6 @@ async def code_refinement_node(state: EDWState):
             
             # 🎯 发送微调后的代码到前端显示
             session_id = state.get("session_id", "unknown")
-            from src.server.socket_manager import get_session_socket
-            
             socket_queue = get_session_socket(session_id)
             if socket_queue:
                 try:
@@ -60,15 +64,17 @@ async def code_refinement_node(state: EDWState):
                 except Exception as e:
                     logger.warning(f"Socket发送微调代码失败: {e}")
             
-            # 记录微调历史
-            refinement_history = state.get("refinement_history", [])
-            refinement_history.append({
+            # 记录微调历史（旧代码只保存摘要和长度，不再截取代码片段）
+            old_code = state.get("enhance_code", "") or ""
+            refinement_history = (state.get("refinement_history") or []) + [{
                 "round": current_round,
                 "user_feedback": state.get("refinement_requirements", ""),
-                "old_code": (state.get("enhance_code", "") or "")[:200] + "...",
+                "old_code_sha": hashlib.blake2b(old_code.encode("utf-8"), digest_size=8).hexdigest(),
+                "old_code_len": len(old_code),
                 "optimization_summary": refinement_result.get("optimization_summary", ""),
-                "timestamp": datetime.now().isoformat()
-            })
+                "timestamp_ns": time.time_ns()
+            }]
+            refinement_history = refinement_history[-_MAX_REFINEMENT_HISTORY:]
             
             return {
                 "enhance_code": refinement_result["enhanced_code"],  # 更新代码
@@ -77,6 +83,7 @@ async def code_refinement_node(state: EDWState):
                 "refinement_completed": True,
                 "current_refinement_round": current_round + 1,
                 "refinement_history": refinement_history,
+                "refinement_rounds": refinement_rounds,
                 "optimization_summary": refinement_result.get("optimization_summary", ""),
                 "user_id": user_id
             }
@@ -87,6 +94,7 @@ async def code_refinement_node(state: EDWState):
             
             return {
                 "user_id": user_id,
+                "refinement_rounds": refinement_rounds,
                 "status": "error",
                 "status_message": f"代码微调失败: {error_msg}",
                 "status_details": {"refinement_result": refinement_result},
@@ -98,6 +106,7 @@ async def code_refinement_node(state: EDWState):
         logger.error(error_msg)
         return {
             "user_id": user_id,
+            "refinement_rounds": refinement_rounds,
             "status": "error",
             "status_message": error_msg,
             "status_details": {"exception": str(e)},
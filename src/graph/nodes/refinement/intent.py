@@ -4,44 +4,21 @@
 """
 
 import logging
+import re
+from string import Template
+from typing import Optional
 from langchain.schema.messages import HumanMessage, AIMessage
-from langchain.output_parsers import PydanticOutputParser
 from src.models.states import EDWState
 from src.models.edw_models import RefinementIntentAnalysis
+from src.agent.edw_agents import create_intent_analysis_agent
+from src.graph.message_summarizer import get_message_summarizer
 
 logger = logging.getLogger(__name__)
 
+# 意图分析提示词模板（模块加载时构建一次，每轮只替换用户输入）
+_INTENT_ANALYSIS_TEMPLATE = Template("""你是一个专业的用户意图分析专家，需要结合聊天历史的上下文深度理解用户对代码增强结果的真实想法和需求。
 
-def refinement_intent_node(state: EDWState):
-    """基于大语言模型的用户意图深度识别节点"""
-    
-    user_input = state.get("user_refinement_input", "")
-    user_id = state.get("user_id", "")
-    messages = state.get("messages", [])
-    
-    # 获取消息总结器和配置
-    from src.graph.message_summarizer import get_message_summarizer
-    from src.config import get_config_manager
-    
-    config_manager = get_config_manager()
-    message_config = config_manager.get_message_config()
-    
-    # 使用消息总结器处理消息历史
-    summarizer = get_message_summarizer()
-    try:
-        # 先进行消息总结（如果需要）
-        summarized_messages = summarizer.summarize_if_needed(messages)
-    except Exception as e:
-        logger.warning(f"消息总结失败，使用原始消息: {e}")
-        summarized_messages = messages
-    
-    # 使用 LangChain 的 PydanticOutputParser
-    parser = PydanticOutputParser(pydantic_object=RefinementIntentAnalysis)
-    
-    # 使用动态上下文的意图分析提示词
-    intent_analysis_prompt = f"""你是一个专业的用户意图分析专家，需要结合聊天历史的上下文深度理解用户对代码增强结果的真实想法和需求。
-
-**用户刚刚说**: "{user_input}"
+**用户刚刚说**: "$user_input"
 
 **任务**: 请深度分析用户的真实意图，考虑语义、情感、上下文等多个维度。
 
@@ -71,25 +48,108 @@ def refinement_intent_node(state: EDWState):
 - 考虑**语境和上下文**，不要只看字面意思
 - 对于模糊或间接的表达，要推断其深层含义
 - 如果用户表达含糊，倾向于理解为需要进一步沟通
+""")
 
-{parser.get_format_instructions()}
-"""
+
+# 意图快速预判：整句为简短确认语时直接判定满意，短句中带明确修改诉求时判定需要微调
+_SATISFIED_RE = re.compile(
+    r"^(是的?|对的?|不错|可以了?|好的?|好了|行|ok|okay|yes|continue|继续吧?|下一步|满意|没问题|就这样|挺好的?)\W*$",
+    re.IGNORECASE
+)
+# “不对”与否定判断中的“不”冲突（如“对不对”），不作为修改关键词
+_REFINE_RE = re.compile(r"(优化|修改|改一下|改成|调整|再改|重写|(?i:refine)|加.*异常|注释|顺序|性能|重构)")
+# 同时带有肯定/继续语气时（如“性能不错，继续吧”）语义不确定，不做快速判定
+_SATISFIED_CUE_RE = re.compile(r"(不错|满意|继续|没问题|挺好)")
+# 否定（如“不要修改”、“别改了”、“无需优化”）会反转修改关键词的含义，提问（如“性能怎么样？”）只是询问，都交给LLM判断
+_NEGATION_RE = re.compile(r"(不|别|无需|没必要)")
+_QUESTION_RE = re.compile(r"(吗|[?？]|怎么|为什么|什么)")
+# 超过该长度的输入语义可能较复杂，交给LLM判断
+_QUICK_REFINE_MAX_LEN = 30
+
+
+def _quick_classify_intent(user_input: str) -> Optional[RefinementIntentAnalysis]:
+    """
+    基于关键词的意图快速预判，命中时跳过LLM调用
+
+    Returns:
+        命中规则时返回意图分析结果，否则返回None（交由LLM分析）
+    """
+    text = (user_input or "").strip()
+    if not text:
+        return None
+
+    if _QUESTION_RE.search(text):
+        return None
+
+    if _SATISFIED_RE.match(text):
+        return RefinementIntentAnalysis(
+            intent="SATISFIED_CONTINUE",
+            confidence_score=0.95,
+            reasoning=f"用户输入「{text}」为明确的确认用语",
+            user_emotion="positive"
+        )
+
+    if (len(text) <= _QUICK_REFINE_MAX_LEN
+            and _REFINE_RE.search(text)
+            and not _SATISFIED_CUE_RE.search(text)
+            and not _NEGATION_RE.search(text)):
+        return RefinementIntentAnalysis(
+            intent="REFINEMENT_NEEDED",
+            confidence_score=0.95,
+            reasoning=f"用户输入「{text}」包含明确的修改诉求",
+            extracted_requirements=text
+        )
+
+    return None
+
+
+_intent_agent = None
+
+
+def _get_intent_agent():
+    """获取意图分析代理（首次使用时创建，之后复用）"""
+    global _intent_agent
+    if _intent_agent is None:
+        _intent_agent = create_intent_analysis_agent()
+    return _intent_agent
+
+
+def refinement_intent_node(state: EDWState):
+    """基于大语言模型的用户意图深度识别节点"""
+    
+    user_input = state.get("user_refinement_input", "")
+    user_id = state.get("user_id", "")
+    messages = state.get("messages", [])
+    
+    # 使用消息总结器处理消息历史
+    summarizer = get_message_summarizer()
+    summarized_messages = messages
     
     try:
-        # 使用专门的意图分析代理（无记忆）
-        from src.agent.edw_agents import create_intent_analysis_agent
-        
-        intent_agent = create_intent_analysis_agent()
-        
-        response = intent_agent.invoke(
-            {"messages": summarized_messages + [HumanMessage(intent_analysis_prompt)]}
-        )
-        
-        # 使用 LangChain parser 解析响应
-        analysis_content = response["messages"][-1].content
-        intent_result = parser.parse(analysis_content)
-        
-        logger.info(f"LLM意图分析结果: {intent_result}")
+        # 简单输入先走关键词预判，命中则无需总结消息和调用LLM
+        intent_result = _quick_classify_intent(user_input)
+        if intent_result is not None:
+            logger.info(f"关键词预判意图结果: {intent_result}")
+        else:
+            try:
+                # 先进行消息总结（如果需要）
+                summarized_messages = summarizer.summarize_if_needed(messages)
+            except Exception as e:
+                logger.warning(f"消息总结失败，使用原始消息: {e}")
+                summarized_messages = messages
+            
+            # 使用预编译的意图分析提示词模板，仅替换用户输入
+            intent_analysis_prompt = _INTENT_ANALYSIS_TEMPLATE.substitute(user_input=user_input)
+            
+            # 使用专门的意图分析代理（无记忆）
+            intent_agent = _get_intent_agent()
+            
+            # 结构化输出直接返回已校验的 RefinementIntentAnalysis 对象
+            intent_result = intent_agent.invoke(
+                {"messages": summarized_messages + [HumanMessage(intent_analysis_prompt)]}
+            )
+            
+            logger.info(f"LLM意图分析结果: {intent_result}")
         
         result = {
             "user_intent": intent_result.intent,
@@ -5,8 +5,8 @@
 """
 
 import logging
+import time
 from typing import Dict, Any, Optional, List
-from datetime import datetime
 from langchain.schema.messages import HumanMessage, AIMessage, SystemMessage
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import interrupt
@@ -80,7 +80,6 @@ def code_review_node(state: EDWState) -> dict:
 
             # 直接使用LLM，传入完整的消息历史作为上下文
             llm = get_shared_llm()
-            import time
             req_start_time = time.time()
             
             # 构建包含历史的消息列表
@@ -208,7 +207,7 @@ def code_review_node(state: EDWState) -> dict:
             "feedback": review_result["feedback"],
             "suggestions": review_result["suggestions"],
             "has_syntax_errors": review_result.get("has_syntax_errors", False),
-            "timestamp": datetime.now().isoformat()
+            "timestamp_ns": time.time_ns()
         })
         
         logger.info(f"代码Review完成 - 轮次: {review_round}, 评分: {review_result['score']}")
@@ -3,6 +3,7 @@
 迁移自历史文件，整合到nodes架构中
 """
 
+import asyncio
 import logging
 from typing import Dict, Any
 from langchain.schema.messages import HumanMessage, AIMessage
@@ -15,6 +16,14 @@ from src.models.states import EDWState
 from src.server.socket_manager import get_session_socket
 from src.graph.nodes.enhancement.field_standardization import field_standardization_node
 from src.graph.nodes.validation.validation_check import validation_context_node, validation_interrupt_node
+from src.graph.utils.session import SessionManager
+from src.graph.utils.field import (
+    validate_english_model_name,
+    validate_fields_against_base_tables,
+    prefetch_tables_fields
+)
+from src.graph.utils.code import asearch_table_cd, convert_to_adb_path, extract_tables_from_code
+from src.mcp.mcp_client import execute_sql_via_mcp
 
 logger = logging.getLogger(__name__)
 valid_agent = get_validation_agent()
@@ -24,6 +33,11 @@ parser = get_shared_parser()
 from src.graph.utils.message_sender import send_node_message
 
 
+def _err_msg(text: str) -> list:
+    """构建验证失败时回传的消息列表"""
+    return [HumanMessage(content=text)]
+
+
 def parse_user_input_node(state: EDWState) -> dict:
     """节点1: 解析用户输入，提取关键信息 - 支持智能路由"""
 
@@ -35,9 +49,6 @@ def parse_user_input_node(state: EDWState) -> dict:
     retry_count = state.get("retry_count", 0)
     is_resume = failed_node is not None
 
-    # 导入需要的依赖
-    from src.graph.utils.session import SessionManager
-
     try:
         config = SessionManager.get_config_with_monitor(
             user_id=state.get("user_id", ""),
@@ -86,6 +97,7 @@ def parse_user_input_node(state: EDWState) -> dict:
         # 解析响应
         try:
             parsed_request = parser.parse(validation_result)
+            # 只做一次完整序列化，fields 直接复用序列化结果，避免逐个字段重复 model_dump
             parsed_data = parsed_request.model_dump()
 
             # 🎯 实时进度发送 - 解析成功
@@ -102,7 +114,7 @@ def parse_user_input_node(state: EDWState) -> dict:
                 "business_purpose": parsed_request.business_purpose,
                 "business_requirement": parsed_request.business_requirement,
                 "field_info": parsed_request.field_info,
-                "fields": [field.model_dump() for field in parsed_request.fields] if parsed_request.fields else [],
+                "fields": parsed_data.get("fields") or [],
                 "jira_number": parsed_request.jira_number if parsed_request.jira_number else "",
                 # 🔥 清理错误信息，避免残留
                 "error_message": None,
@@ -139,7 +151,7 @@ def parse_user_input_node(state: EDWState) -> dict:
                 "validation_status": "incomplete_info",
                 "failed_validation_node": "parse_input",  # 🔥 记录失败节点
                 "error_message": error_msg,
-                "messages": [HumanMessage(error_msg)]
+                "messages": _err_msg(error_msg)
             }
 
             return result
@@ -155,7 +167,7 @@ def parse_user_input_node(state: EDWState) -> dict:
             "validation_status": "incomplete_info",
             "failed_validation_node": "parse_input",  # 🔥 记录失败节点
             "error_message": error_msg,
-            "messages": [HumanMessage(error_msg)]
+            "messages": _err_msg(error_msg)
         }
 
         return result
@@ -167,9 +179,6 @@ async def validate_model_name_node(state: EDWState) -> dict:
     # 🎯 实时进度发送 - 开始验证名称
     send_node_message(state, "AI", "processing", "让我继续验证模型名称合法性...", 0.3)
 
-    # 导入验证函数
-    from src.graph.utils.field import validate_english_model_name
-
     user_provided_model_name = state.get("model_attribute_name")  # 保存用户输入的模型名称
     model_attribute_name = None  # 重置，准备按优先级重新赋值
     table_name = state.get("table_name", "").strip()
@@ -178,8 +187,6 @@ async def validate_model_name_node(state: EDWState) -> dict:
     # 优先级1: 如果有表名，总是优先尝试从表注释中提取（不管用户是否已提供）
     if table_name:
         try:
-            from src.mcp.mcp_client import execute_sql_via_mcp
-
             # 解析表名：分离schema和table_name
             if '.' in table_name:
                 table_schema, actual_table_name = table_name.split('.', 1)
@@ -261,7 +268,7 @@ async def validate_model_name_node(state: EDWState) -> dict:
             "validation_status": "incomplete_info",
             "failed_validation_node": "validate_name",
             "error_message": error_msg,
-            "messages": [HumanMessage(error_msg)]
+            "messages": _err_msg(error_msg)
         }
 
     # 统一验证模型名称格式（无论是用户提供的还是从表中提取的）
@@ -281,7 +288,7 @@ async def validate_model_name_node(state: EDWState) -> dict:
             "validation_status": "incomplete_info",
             "failed_validation_node": "validate_name",
             "error_message": error_msg,
-            "messages": [HumanMessage(error_msg)]
+            "messages": _err_msg(error_msg)
         }
 
     # 🎯 实时进度发送 - 验证通过
@@ -366,7 +373,7 @@ def validate_completeness_node(state: EDWState) -> dict:
                 "failed_validation_node": "validate_completeness",  # 🔥 记录失败节点
                 "missing_info": missing_fields,
                 "error_message": complete_message,
-                "messages": [HumanMessage(complete_message)]
+                "messages": _err_msg(complete_message)
             }
 
         # 🎯 实时进度发送 - 验证通过
@@ -391,16 +398,13 @@ def validate_completeness_node(state: EDWState) -> dict:
             "validation_status": "incomplete_info",
             "failed_validation_node": "validate_completeness",  # 🔥 记录失败节点
             "error_message": error_msg,
-            "messages": [HumanMessage(error_msg)]
+            "messages": _err_msg(error_msg)
         }
 
 
-def search_table_code_node(state: EDWState) -> dict:
+async def search_table_code_node(state: EDWState) -> dict:
     """节点4: 查询表的源代码"""
 
-    # 导入需要的函数
-    from src.graph.utils.code import search_table_cd, convert_to_adb_path, extract_tables_from_code
-
     table_name = state.get("table_name", "").strip()
     branch_name = state.get("branch_name", "").strip()
 
@@ -417,7 +421,7 @@ def search_table_code_node(state: EDWState) -> dict:
             "validation_status": "incomplete_info",
             "failed_validation_node": "search_code",  # 🔥 记录失败节点
             "error_message": error_msg,
-            "messages": [HumanMessage(error_msg)]
+            "messages": _err_msg(error_msg)
         }
 
     if not branch_name:
@@ -430,13 +434,13 @@ def search_table_code_node(state: EDWState) -> dict:
             "validation_status": "incomplete_info",
             "failed_validation_node": "search_code",  # 🔥 记录失败节点
             "error_message": error_msg,
-            "messages": [HumanMessage(error_msg)]
+            "messages": _err_msg(error_msg)
         }
 
     # 查询表的源代码（传入分支名称）
 
     try:
-        code_info = search_table_cd(table_name, branch_name)
+        code_info = await asearch_table_cd(table_name, branch_name)
         logger.info(f"表代码查询结果: {str(code_info)[:200] if code_info else 'None'}...")
 
         if code_info.get("status") == "error":
@@ -449,7 +453,7 @@ def search_table_code_node(state: EDWState) -> dict:
                 "validation_status": "incomplete_info",
                 "failed_validation_node": "search_code",  # 🔥 记录失败节点
                 "error_message": error_msg,
-                "messages": [HumanMessage(error_msg)]
+                "messages": _err_msg(error_msg)
             }
 
         # 信息收集完成
@@ -458,11 +462,24 @@ def search_table_code_node(state: EDWState) -> dict:
         code_path = code_info.get("file_path", "")
         adb_path = convert_to_adb_path(code_path)
 
-        # 提取源代码中的底表
+        # 提取源代码中的底表，同时预热字段指定来源表的结构缓存
         source_code = code_info.get("code", "")
-        base_tables = extract_tables_from_code(source_code)
+        fields = state.get("fields") or []
+        field_source_tables = [
+            (field.get("source_table") if isinstance(field, dict) else getattr(field, "source_table", "")) or ""
+            for field in fields
+        ]
+        specified_tables = [t.strip() for t in field_source_tables if t.strip()]
+        base_tables, _ = await asyncio.gather(
+            asyncio.to_thread(extract_tables_from_code, source_code),
+            prefetch_tables_fields(specified_tables)
+        )
         logger.info(f"从源代码中提取到底表: {base_tables}")
 
+        # 存在未指定来源表的字段时，后续验证需要代码中的底表结构，提前预热缓存
+        if any(not t.strip() for t in field_source_tables):
+            await prefetch_tables_fields([t for t in base_tables if t not in specified_tables])
+
         # 🎯 实时进度发送 - 查询成功
         send_node_message(state, "AI", "completed", f"成功获取表 {table_name} 的源代码", 0.8)
 
@@ -521,7 +538,7 @@ def search_table_code_node(state: EDWState) -> dict:
             "validation_status": "incomplete_info",
             "failed_validation_node": "search_code",  # 🔥 记录失败节点
             "error_message": error_msg,
-            "messages": [HumanMessage(error_msg)]
+            "messages": _err_msg(error_msg)
         }
 
 
@@ -531,9 +548,6 @@ async def validate_field_base_tables_node(state: EDWState) -> dict:
     # 🎯 实时进度发送 - 开始验证字段
     send_node_message(state, "validate_fields", "processing", "正在验证字段与底表的关联性...", 0.9)
 
-    # 导入需要的函数
-    from src.graph.utils.field import validate_fields_against_base_tables
-
     base_tables = state.get("base_tables", [])
     fields = state.get("fields", [])
     source_code = state.get("source_code", "")
@@ -571,28 +585,29 @@ async def validate_field_base_tables_node(state: EDWState) -> dict:
                 validation_error_msg = field_validation["error_message"]
             else:
                 # 构建详细的错误信息
+                all_suggestions = field_validation["suggestions"]
                 invalid_fields_msg = []
                 for invalid_field in field_validation["invalid_fields"]:
                     field_msg = f"- **{invalid_field}**: 在底表中未找到相似字段"
 
-                    if invalid_field in field_validation["suggestions"]:
-                        suggestions = field_validation["suggestions"][invalid_field]
-                        if suggestions:
-                            suggestion_list = []
-                            for suggestion in suggestions[:3]:
-                                if "similarity" in suggestion:
-                                    suggestion_list.append(f"{suggestion['field_name']} (相似度: {suggestion['similarity']:.2f})")
-                                else:
-                                    suggestion_list.append(f"{suggestion['field_name']} ({suggestion.get('reason', '')})")
-                            field_msg += f"\n  建议字段: {', '.join(suggestion_list)}"
+                    suggestions = all_suggestions.get(invalid_field)
+                    if suggestions:
+                        suggestion_list = [
+                            f"{suggestion['field_name']} (相似度: {suggestion['similarity']:.2f})"
+                            if "similarity" in suggestion
+                            else f"{suggestion['field_name']} ({suggestion.get('reason', '')})"
+                            for suggestion in suggestions[:3]
+                        ]
+                        field_msg += f"\n  建议字段: {', '.join(suggestion_list)}"
 
                     invalid_fields_msg.append(field_msg)
 
                 # 显示底表信息
-                base_tables_info = []
-                for table_name_info, fields_list in field_validation["base_tables_info"].items():
-                    if fields_list:
-                        base_tables_info.append(f"- **{table_name_info}**: {', '.join(fields_list[:10])}{'...' if len(fields_list) > 10 else ''}")
+                base_tables_info = [
+                    f"- **{table_name_info}**: {', '.join(fields_list[:10])}{'...' if len(fields_list) > 10 else ''}"
+                    for table_name_info, fields_list in field_validation["base_tables_info"].items()
+                    if fields_list
+                ]
 
                 # 添加缓存性能信息
                 cache_info = ""
@@ -600,14 +615,17 @@ async def validate_field_base_tables_node(state: EDWState) -> dict:
                     cache_perf = field_validation["cache_performance"]
                     cache_info = f"\n\n**查询性能**: 耗时{cache_perf['duration_seconds']}秒, 缓存命中率: {cache_perf['overall_hit_rate']}"
 
-                validation_error_msg = f"""字段验证失败，以下字段在底表中未找到相似字段：
-
-{chr(10).join(invalid_fields_msg)}
-
-**底表字段信息**:
-{chr(10).join(base_tables_info) if base_tables_info else '无法获取底表字段信息'}{cache_info}
-
-请确认字段名称是否正确，或参考建议字段进行修正。"""
+                # 一次性拼接完整消息，避免嵌套 f-string 产生的中间字符串
+                validation_error_msg = "\n".join([
+                    "字段验证失败，以下字段在底表中未找到相似字段：",
+                    "",
+                    *invalid_fields_msg,
+                    "",
+                    "**底表字段信息**:",
+                    ("\n".join(base_tables_info) if base_tables_info else "无法获取底表字段信息") + cache_info,
+                    "",
+                    "请确认字段名称是否正确，或参考建议字段进行修正。",
+                ])
 
             # 字段验证失败
             send_node_message(state, "validate_fields", "failed", "字段验证失败", 1.0)
@@ -617,7 +635,7 @@ async def validate_field_base_tables_node(state: EDWState) -> dict:
                 "failed_validation_node": "validate_fields",  # 🔥 记录失败节点
                 "error_message": validation_error_msg,
                 "field_validation": field_validation,
-                "messages": [HumanMessage(validation_error_msg)]
+                "messages": _err_msg(validation_error_msg)
             }
         else:
             # 字段验证通过
@@ -644,7 +662,7 @@ async def validate_field_base_tables_node(state: EDWState) -> dict:
             "validation_status": "incomplete_info",
             "failed_validation_node": "validate_fields",  # 🔥 记录失败节点
             "error_message": error_msg,
-            "messages": [HumanMessage(error_msg)]
+            "messages": _err_msg(error_msg)
         }
 
 
@@ -6,13 +6,37 @@ ADB（Azure Databricks）工具模块
 
 import logging
 import os
+import re
 from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field
 
+from src.mcp.mcp_client import get_mcp_client_manager
 from .base import AsyncBaseTool, create_tool_result, run_with_timeout
 
 logger = logging.getLogger(__name__)
 
+# 文件扩展名到笔记本语言的映射
+_NOTEBOOK_EXT_MAP = {
+    '.py': 'PYTHON',
+    '.sql': 'SQL',
+    '.scala': 'SCALA',
+    '.r': 'R',
+    '.ipynb': 'PYTHON'  # Jupyter notebooks默认为Python
+}
+
+# 内容检测只扫描源码开头的这部分字符，避免对大型笔记本做全文扫描
+_LANGUAGE_DETECT_PREFIX = 4096
+
+# 各语言特征合并为一个正则，一次扫描即可得到出现过的特征类别
+# SQL关键字忽略大小写直接匹配原文，其余特征区分大小写
+_LANGUAGE_MARKER_PATTERN = re.compile(
+    r'(?P<sql>(?i:SELECT|FROM|WHERE|CREATE|INSERT|UPDATE|DELETE))'
+    r'|(?P<embedded_sql>spark\.sql\(|pd\.read_sql)'
+    r'|(?P<python>import |def |class )'
+    r'|(?P<scala>val |var |object )'
+    r'|(?P<r><-|library\()'
+)
+
 
 def detect_code_language(code_path: Optional[str], source_code: str = "") -> str:
     """
@@ -28,42 +52,75 @@ def detect_code_language(code_path: Optional[str], source_code: str = "") -> str
     # 基于文件扩展名检测
     if code_path:
         ext = os.path.splitext(code_path)[1].lower()
-        ext_map = {
-            '.py': 'PYTHON',
-            '.sql': 'SQL',
-            '.scala': 'SCALA',
-            '.r': 'R',
-            '.ipynb': 'PYTHON'  # Jupyter notebooks默认为Python
-        }
-        if ext in ext_map:
-            return ext_map[ext]
+        if ext in _NOTEBOOK_EXT_MAP:
+            return _NOTEBOOK_EXT_MAP[ext]
     
     # 基于内容检测
     if source_code:
-        # SQL关键字检测
-        sql_keywords = ['SELECT', 'FROM', 'WHERE', 'CREATE', 'INSERT', 'UPDATE', 'DELETE']
-        if any(keyword in source_code.upper() for keyword in sql_keywords):
-            # 检查是否是嵌入在Python中的SQL
-            if 'spark.sql(' in source_code or 'pd.read_sql' in source_code:
-                return 'PYTHON'
-            return 'SQL'
+        markers = set()
+        for match in _LANGUAGE_MARKER_PATTERN.finditer(source_code, 0, _LANGUAGE_DETECT_PREFIX):
+            markers.add(match.lastgroup)
         
-        # Python特征检测
-        if 'import ' in source_code or 'def ' in source_code or 'class ' in source_code:
-            return 'PYTHON'
+        # SQL关键字检测，嵌入在Python中的SQL仍按Python处理
+        if 'sql' in markers:
+            return 'PYTHON' if 'embedded_sql' in markers else 'SQL'
         
-        # Scala特征检测
-        if 'val ' in source_code or 'var ' in source_code or 'object ' in source_code:
+        # 按Python、Scala、R的优先级判断特征
+        if 'python' in markers:
+            return 'PYTHON'
+        if 'scala' in markers:
             return 'SCALA'
-        
-        # R特征检测
-        if '<-' in source_code or 'library(' in source_code:
+        if 'r' in markers:
             return 'R'
     
     # 默认返回Python
     return 'PYTHON'
 
 
+# 已解析的笔记本工具缓存（按操作类型），工具来自共享MCP客户端，跨调用复用
+_notebook_tool_cache: Dict[str, Any] = {}
+
+
+def _reset_notebook_tools():
+    """清空工具缓存并重置共享客户端（MCP服务重启或调用失败时），下次调用重新发现工具"""
+    _notebook_tool_cache.clear()
+    get_mcp_client_manager().reset_shared_client()
+
+
+async def _resolve_notebook_tool(action: str):
+    """
+    查找笔记本操作工具（import/export）
+    
+    优先使用缓存；否则从共享MCP客户端的工具列表中按名称精确匹配，找不到再做模糊匹配
+    
+    Args:
+        action: 操作类型，如 "import"、"export"
+    
+    Returns:
+        找到的工具，未找到返回None
+    """
+    tool = _notebook_tool_cache.get(action)
+    if tool is not None:
+        return tool
+    
+    tools = await run_with_timeout(
+        get_mcp_client_manager().get_shared_tools(),
+        timeout=10.0,
+        timeout_message="获取MCP工具超时"
+    )
+    tools_by_name = {t.name: t for t in tools or [] if hasattr(t, 'name')}
+    tool = tools_by_name.get(f"{action}_notebook") or next(
+        (t for name, t in tools_by_name.items()
+         if action in name.lower() and 'notebook' in name.lower()),
+        None
+    )
+    
+    if tool is not None:
+        logger.info(f"找到{action}工具: {tool.name}")
+        _notebook_tool_cache[action] = tool
+    return tool
+
+
 async def update_adb_notebook(
     path: str,
     content: str,
@@ -89,69 +146,42 @@ async def update_adb_notebook(
         
         logger.info(f"准备更新ADB笔记本: {path} (语言: {language})")
         
-        # 获取MCP客户端
-        from src.mcp.mcp_client import get_mcp_client
+        import_tool = await _resolve_notebook_tool("import")
+        if not import_tool:
+            error_msg = "未找到import_notebook相关的MCP工具"
+            logger.error(error_msg)
+            return create_tool_result(False, error=error_msg)
         
-        async with get_mcp_client() as client:
-            if not client:
-                error_msg = "无法连接到MCP服务"
-                logger.error(error_msg)
-                return create_tool_result(False, error=error_msg)
-            
-            try:
-                # 获取所有MCP工具
-                tools = await run_with_timeout(
-                    client.get_tools(),
-                    timeout=10.0,
-                    timeout_message="获取MCP工具超时"
-                )
-                
-                # 查找import_notebook工具
-                import_tool = None
-                for tool in tools:
-                    if hasattr(tool, 'name') and 'import' in tool.name.lower() and 'notebook' in tool.name.lower():
-                        import_tool = tool
-                        logger.info(f"找到导入工具: {tool.name}")
-                        break
-                
-                if not import_tool:
-                    error_msg = "未找到import_notebook相关的MCP工具"
-                    logger.error(error_msg)
-                    return create_tool_result(False, error=error_msg)
-                
-                # 调用import_notebook方法
-                logger.info(f"正在导入笔记本到: {path}")
-                result = await run_with_timeout(
-                    import_tool.ainvoke({
-                        "path": path,
-                        "content": content,
-                        "language": language,
-                        "overwrite": overwrite
-                    }),
-                    timeout=30.0,
-                    timeout_message=f"导入笔记本超时: {path}"
-                )
-                
-                logger.info(f"ADB笔记本更新成功: {path}")
-                return create_tool_result(
-                    True,
-                    result=str(result),
-                    adb_path=path,
-                    language=language
-                )
-                
-            except TimeoutError as e:
-                error_msg = str(e)
-                logger.error(error_msg)
-                return create_tool_result(False, error=error_msg)
-            except Exception as e:
-                error_msg = f"MCP工具调用失败: {str(e)}"
-                logger.error(error_msg)
-                return create_tool_result(False, error=error_msg)
-                
+        # 调用import_notebook方法
+        logger.info(f"正在导入笔记本到: {path}")
+        result = await run_with_timeout(
+            import_tool.ainvoke({
+                "path": path,
+                "content": content,
+                "language": language,
+                "overwrite": overwrite
+            }),
+            timeout=30.0,
+            timeout_message=f"导入笔记本超时: {path}"
+        )
+        
+        logger.info(f"ADB笔记本更新成功: {path}")
+        return create_tool_result(
+            True,
+            result=str(result),
+            adb_path=path,
+            language=language
+        )
+        
+    except TimeoutError as e:
+        error_msg = str(e)
+        logger.error(error_msg)
+        _reset_notebook_tools()
+        return create_tool_result(False, error=error_msg)
     except Exception as e:
         error_msg = f"更新ADB笔记本失败: {str(e)}"
         logger.error(error_msg)
+        _reset_notebook_tools()
         return create_tool_result(False, error=error_msg)
 
 
@@ -168,40 +198,27 @@ async def read_adb_notebook(path: str) -> Dict[str, Any]:
     try:
         logger.info(f"准备读取ADB笔记本: {path}")
         
-        from src.mcp.mcp_client import get_mcp_client
+        # 查找export_notebook工具
+        export_tool = await _resolve_notebook_tool("export")
         
-        async with get_mcp_client() as client:
-            if not client:
-                error_msg = "无法连接到MCP服务"
-                logger.error(error_msg)
-                return create_tool_result(False, error=error_msg)
-            
-            # 获取工具并查找export_notebook工具
-            tools = await client.get_tools()
-            export_tool = None
-            
-            for tool in tools:
-                if hasattr(tool, 'name') and 'export' in tool.name.lower() and 'notebook' in tool.name.lower():
-                    export_tool = tool
-                    break
-            
-            if not export_tool:
-                error_msg = "未找到export_notebook相关的MCP工具"
-                logger.error(error_msg)
-                return create_tool_result(False, error=error_msg)
-            
-            # 调用export_notebook方法
-            result = await export_tool.ainvoke({"path": path})
-            
-            return create_tool_result(
-                True,
-                result=str(result),
-                adb_path=path
-            )
+        if not export_tool:
+            error_msg = "未找到export_notebook相关的MCP工具"
+            logger.error(error_msg)
+            return create_tool_result(False, error=error_msg)
+        
+        # 调用export_notebook方法
+        result = await export_tool.ainvoke({"path": path})
+        
+        return create_tool_result(
+            True,
+            result=str(result),
+            adb_path=path
+        )
             
     except Exception as e:
         error_msg = f"读取ADB笔记本失败: {str(e)}"
         logger.error(error_msg)
+        _reset_notebook_tools()
         return create_tool_result(False, error=error_msg)
 
 
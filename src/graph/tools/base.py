@@ -6,8 +6,12 @@
 
 import asyncio
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Type
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Type
 from langchain.tools import BaseTool
 from langchain_core.callbacks import (
     AsyncCallbackManagerForToolRun,
@@ -17,6 +21,27 @@ from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# 同步调用异步工具时共用的后台事件循环（懒加载），避免每次调用都创建线程池和事件循环
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """获取在守护线程中常驻运行的后台事件循环"""
+    global _background_loop
+    if _background_loop is None:
+        with _background_loop_lock:
+            if _background_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="async-tool-loop",
+                    daemon=True
+                ).start()
+                _background_loop = loop
+                logger.info("异步工具后台事件循环已启动")
+    return _background_loop
+
 
 class AsyncBaseTool(BaseTool, ABC):
     """
@@ -51,27 +76,17 @@ class AsyncBaseTool(BaseTool, ABC):
         如果需要同步调用，框架会自动使用此方法
         """
         try:
-            # 检查是否已经在事件循环中
+            # 提交到常驻的后台事件循环执行，调用方是否已处于事件循环中都适用
+            logger.debug(f"在后台事件循环中同步执行异步工具: {self.name}")
+            future = asyncio.run_coroutine_threadsafe(
+                self._arun(*args, run_manager=None, **kwargs),
+                _get_background_loop()
+            )
             try:
-                loop = asyncio.get_running_loop()
-                # 如果已经在运行的循环中，使用线程池执行异步代码
-                logger.debug(f"在已有事件循环中同步执行异步工具: {self.name}")
-                
-                import threading
-                import concurrent.futures
-                
-                # 创建一个新线程来运行异步代码
-                def run_async():
-                    return asyncio.run(self._arun(*args, run_manager=None, **kwargs))
-                
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_async)
-                    return future.result(timeout=60)  # 60秒超时
-                    
-            except RuntimeError:
-                # 没有运行中的事件循环，直接运行
-                logger.debug(f"在新事件循环中执行异步工具: {self.name}")
-                return asyncio.run(self._arun(*args, run_manager=None, **kwargs))
+                return future.result(timeout=60)  # 60秒超时
+            except TimeoutError:
+                future.cancel()
+                raise
                 
         except Exception as e:
             error_msg = f"工具 {self.name} 同步调用失败: {str(e)}"
@@ -122,6 +137,26 @@ def create_tool_result(
     }
 
 
+@lru_cache(maxsize=1)
+def _format_now_strings(epoch_second: int) -> Tuple[str, str, str]:
+    now = datetime.fromtimestamp(epoch_second)
+    return (
+        now.strftime('%Y-%m-%d %H:%M:%S'),
+        now.strftime('%Y-%m-%d'),
+        now.strftime('%Y年%m月%d日')
+    )
+
+
+def now_strings() -> Tuple[str, str, str]:
+    """
+    获取当前时间的常用格式化字符串，同一秒内复用缓存结果
+    
+    Returns:
+        (日期时间 '%Y-%m-%d %H:%M:%S', 日期 '%Y-%m-%d', 中文日期 '%Y年%m月%d日')
+    """
+    return _format_now_strings(int(time.time()))
+
+
 async def run_with_timeout(
     coroutine,
     timeout: float = 30.0,
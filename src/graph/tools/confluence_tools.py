@@ -5,14 +5,68 @@ Confluence文档工具模块
 """
 
 import logging
+import sys
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
-from .base import AsyncBaseTool, create_tool_result, run_with_timeout
+from .base import AsyncBaseTool, create_tool_result, run_with_timeout, now_strings
 
 logger = logging.getLogger(__name__)
 
+try:
+    from src.basic.confluence.confluence_tools import ConfluenceWorkflowTools
+except ImportError as e:
+    logger.warning(f"Confluence工具模块不可用: {e}")
+    ConfluenceWorkflowTools = None
+
+
+# schema对应的相关人员（键在加载时驻留，查找时与驻留后的schema按指针比较）
+_MODEL_STAKEHOLDER_MAP = {sys.intern(k): v for k, v in {
+    "dwd_fi": {
+        "owner": "Finance Data Team",
+        "reviewer": "Finance Analytics Team",
+        "approver": "Finance Manager"
+    },
+    "cam_fi": {
+        "owner": "Campaign Finance Team",
+        "reviewer": "Finance Analytics Team",
+        "approver": "Campaign Manager"
+    },
+    "dwd_sc": {
+        "owner": "Supply Chain Data Team",
+        "reviewer": "Supply Chain Analytics Team",
+        "approver": "Supply Chain Manager"
+    },
+    "dwd_mk": {
+        "owner": "Marketing Data Team",
+        "reviewer": "Marketing Analytics Team",
+        "approver": "Marketing Manager"
+    },
+    "default": {
+        "owner": "Data Engineering Team",
+        "reviewer": "Analytics Team",
+        "approver": "Data Manager"
+    }
+}.items()}
+_DEFAULT_STAKEHOLDERS = _MODEL_STAKEHOLDER_MAP["default"]
+
+# schema对应的业务域
+_SCHEMA_DOMAIN_MAP = {sys.intern(k): v for k, v in {
+    "dwd_fi": "Finance",
+    "cam_fi": "Finance",
+    "dws_fi": "Finance",
+    "ads_fi": "Finance",
+    "dwd_sc": "Supply Chain",
+    "cam_sc": "Supply Chain",
+    "dws_sc": "Supply Chain",
+    "ads_sc": "Supply Chain",
+    "dwd_mk": "Marketing",
+    "cam_mk": "Marketing",
+    "dws_mk": "Marketing",
+    "ads_mk": "Marketing"
+}.items()}
+
 
 def _get_model_stakeholders(schema: str) -> Dict[str, str]:
     """
@@ -24,35 +78,7 @@ def _get_model_stakeholders(schema: str) -> Dict[str, str]:
     Returns:
         相关人员信息字典
     """
-    stakeholder_map = {
-        "dwd_fi": {
-            "owner": "Finance Data Team",
-            "reviewer": "Finance Analytics Team",
-            "approver": "Finance Manager"
-        },
-        "cam_fi": {
-            "owner": "Campaign Finance Team",
-            "reviewer": "Finance Analytics Team",
-            "approver": "Campaign Manager"
-        },
-        "dwd_sc": {
-            "owner": "Supply Chain Data Team",
-            "reviewer": "Supply Chain Analytics Team",
-            "approver": "Supply Chain Manager"
-        },
-        "dwd_mk": {
-            "owner": "Marketing Data Team",
-            "reviewer": "Marketing Analytics Team",
-            "approver": "Marketing Manager"
-        },
-        "default": {
-            "owner": "Data Engineering Team",
-            "reviewer": "Analytics Team",
-            "approver": "Data Manager"
-        }
-    }
-
-    return stakeholder_map.get(schema, stakeholder_map["default"])
+    return _MODEL_STAKEHOLDER_MAP.get(sys.intern(schema), _DEFAULT_STAKEHOLDERS)
 
 
 async def create_model_documentation(
@@ -85,7 +111,11 @@ async def create_model_documentation(
         # 验证table_name
         logger.info(f"准备创建Confluence文档: {table_name}")
 
-        from src.basic.confluence.confluence_tools import ConfluenceWorkflowTools
+        # 只取一次当前时间，日期与创建时间保持一致
+        now = datetime.now()
+
+        if ConfluenceWorkflowTools is None:
+            return create_tool_result(False, error="Confluence工具模块不可用")
 
         # 解析表名获取schema信息
         if '.' in table_name:
@@ -148,27 +178,13 @@ async def create_model_documentation(
 
         # 获取相关人员信息
         stakeholders = _get_model_stakeholders(schema)
-        current_date = datetime.now().strftime('%Y-%m-%d')
+        current_date = now_strings()[1]
 
         # 根据enhancement_type确定操作类型
         operation_type = "Enhance" if enhancement_type in ["add_field", "modify_logic", "optimize_query"] else "New"
 
         # 根据schema确定业务域
-        domain_map = {
-            "dwd_fi": "Finance",
-            "cam_fi": "Finance",
-            "dws_fi": "Finance",
-            "ads_fi": "Finance",
-            "dwd_sc": "Supply Chain",
-            "cam_sc": "Supply Chain",
-            "dws_sc": "Supply Chain",
-            "ads_sc": "Supply Chain",
-            "dwd_mk": "Marketing",
-            "cam_mk": "Marketing",
-            "dws_mk": "Marketing",
-            "ads_mk": "Marketing"
-        }
-        business_domain = domain_map.get(schema, "General")
+        business_domain = _SCHEMA_DOMAIN_MAP.get(sys.intern(schema), "General")
 
         # 构建model_config
         model_config = {
@@ -189,24 +205,23 @@ async def create_model_documentation(
             "business_logic": doc_info.get("business_logic", ""),
             "data_quality_checks": doc_info.get("data_quality", []),
             "dependencies": base_tables or [],
-            "fields": []
+            # 字段信息 - 使用已标准化的字段信息一次性构建
+            "fields": [
+                {
+                    "physical_name": field["physical_name"],
+                    "attribute_name": field["attribute_name"],
+                    "data_type": field["data_type"],
+                    "comment": field["comment"],
+                    "name": field["physical_name"],  # 保持兼容性
+                    "type": field["data_type"],  # 保持兼容性
+                    "description": field["comment"] or field["attribute_name"],
+                    "business_meaning": field["attribute_name"],
+                    "source": field["source"]
+                }
+                for field in standardized_fields
+            ]
         }
 
-        # 添加字段信息 - 使用已标准化的字段信息
-        for field in standardized_fields:
-            field_info = {
-                "physical_name": field["physical_name"],
-                "attribute_name": field["attribute_name"],
-                "data_type": field["data_type"],
-                "comment": field["comment"],
-                "name": field["physical_name"],  # 保持兼容性
-                "type": field["data_type"],  # 保持兼容性
-                "description": field["comment"] or field["attribute_name"],
-                "business_meaning": field["attribute_name"],
-                "source": field["source"]
-            }
-            model_config["fields"].append(field_info)
-
         # 创建Confluence页面
         logger.info(f"正在创建Confluence页面: {model_config['model_name']}")
 
@@ -214,7 +229,7 @@ async def create_model_documentation(
         doc_info["model_config"] = model_config
         doc_info["operation_type"] = operation_type
 
-        page_result = await tools.create_confluence_page(doc_info),
+        page_result = await tools.create_confluence_page(doc_info)
 
         if page_result.get("success"):
             page_url = page_result.get("page_url", "")
@@ -233,7 +248,7 @@ async def create_model_documentation(
                 page_url=page_url,
                 page_id=page_id,
                 page_title=page_title,
-                creation_time=datetime.now().isoformat()
+                creation_time=now.isoformat()
             )
         else:
             error_msg = page_result.get("error", "创建页面失败")
@@ -271,14 +286,14 @@ async def update_model_documentation(
     try:
         logger.info(f"准备更新Confluence页面: {page_id}")
 
-        from src.basic.confluence.confluence_tools import ConfluenceWorkflowTools
+        if ConfluenceWorkflowTools is None:
+            return create_tool_result(False, error="Confluence工具模块不可用")
 
         tools = ConfluenceWorkflowTools()
         confluence_manager = tools._get_confluence_manager()
 
         # 更新页面
         # 注意：ConfluenceManager.update_page 是同步方法，需要包装
-        import asyncio
 
         async def async_update_page():
             try:
@@ -4,17 +4,18 @@
 提供发送模型评审邮件的异步工具
 """
 
+import asyncio
 import logging
+import sys
 from typing import Dict, Any, List, Optional
-from datetime import datetime
 from pydantic import BaseModel, Field
 
-from .base import AsyncBaseTool, create_tool_result
+from .base import AsyncBaseTool, create_tool_result, now_strings
 
 logger = logging.getLogger(__name__)
 
-# EDW Schema对应的问候语映射
-EDW_EMAIL_GREETING_MAP = {
+# EDW Schema对应的问候语映射（键在加载时驻留，查找时与驻留后的schema按指针比较）
+EDW_EMAIL_GREETING_MAP = {sys.intern(k): v for k, v in {
     "dwd_fi": "Finance Team",
     "cam_fi": "Campaign Finance Team",
     "dws_fi": "Finance Summary Team",
@@ -28,181 +29,54 @@ EDW_EMAIL_GREETING_MAP = {
     "dws_mk": "Marketing Summary Team",
     "ads_mk": "Marketing Analytics Team",
     "default": "Data Team"
-}
+}.items()}
+_DEFAULT_GREETING = EDW_EMAIL_GREETING_MAP["default"]
 
-
-async def build_email_template(
-    table_name: str,
-    model_name: str = "",
-    fields: List[Dict] = None,
-    confluence_url: str = "",
-    confluence_title: str = "",
-    enhancement_type: str = "add_field"
-) -> str:
-    """
-    构建邮件HTML模板
-    
-    Args:
-        table_name: 表名
-        model_name: 模型名称
-        fields: 字段列表
-        confluence_url: Confluence文档链接
-        confluence_title: Confluence文档标题
-        enhancement_type: 增强类型
-    
-    Returns:
-        HTML格式的邮件内容
-    """
-    # 解析schema信息
-    schema = "default"
-    if '.' in table_name:
-        schema = table_name.split('.')[0]
-    
-    # 确定问候语
-    greeting = EDW_EMAIL_GREETING_MAP.get(schema.lower(), EDW_EMAIL_GREETING_MAP["default"])
-    
-    # 构建模型全名
-    if model_name:
-        model_full_name = f"{schema}.{model_name}"
-    else:
-        table_suffix = table_name.split('.')[-1] if '.' in table_name else table_name
-        formatted_name = table_suffix.replace('_', ' ').title()
-        model_full_name = f"{schema}.{formatted_name}"
-    
-    # 构建字段列表HTML
-    fields_html = ""
-    if fields:
-        fields_list = []
-        for field in fields:
-            if isinstance(field, dict):
-                physical_name = field.get('physical_name', '')
-                attribute_name = field.get('attribute_name', '')
-                data_type = field.get('data_type', 'string')
-                comment = field.get('comment', '')
-            else:
-                physical_name = getattr(field, 'physical_name', '')
-                attribute_name = getattr(field, 'attribute_name', '')
-                data_type = getattr(field, 'data_type', 'string')
-                comment = getattr(field, 'comment', '')
-            
-            field_desc = f"<strong>{physical_name}</strong> ({data_type})"
-            if attribute_name:
-                field_desc += f" - {attribute_name}"
-            if comment:
-                field_desc += f": {comment}"
-            
-            fields_list.append(f"<li>{field_desc}</li>")
-        
-        fields_html = f"""
-            <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                <h3 style="color: #323130; margin-top: 0;">新增字段:</h3>
-                <ul style="color: #605e5c;">
-                    {''.join(fields_list)}
-                </ul>
-            </div>"""
-    
-    # 构建Review链接HTML
-    review_link_html = ""
-    if confluence_url:
-        review_link_html = f"""
-            <div style="margin: 25px 0;">
-                <a href="{confluence_url}"
-                   style="background: linear-gradient(135deg, #0078d4, #106ebe);
-                          color: white;
-                          padding: 12px 24px;
-                          text-decoration: none;
-                          border-radius: 6px;
-                          display: inline-block;
-                          font-weight: 600;
-                          box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-                          transition: all 0.3s ease;">
-                    Review Changes
-                </a>
-            </div>
-            <p style="color: #605e5c; font-size: 14px; margin: 10px 0;">
-                Review log: <a href="{confluence_url}" style="color: #0078d4;">{confluence_url}</a>
-            </p>"""
-    else:
-        review_link_html = '<p style="color: #d13438;">Review链接暂不可用，请联系技术支持。</p>'
-    
-    # 构建字段表格HTML
-    fields_table_html = ""
-    if fields:
-        for field in fields:
-            if isinstance(field, dict):
-                physical_name = field.get('physical_name', '')
-                attribute_name = field.get('attribute_name', '')
-            else:
-                physical_name = getattr(field, 'physical_name', '')
-                attribute_name = getattr(field, 'attribute_name', '')
-            
-            if physical_name:
-                display_name = attribute_name if attribute_name else physical_name.replace('_', ' ').title()
-                fields_table_html += f"""
-                <tr>
-                    <td style="padding: 8px 12px; border-left: 3px solid #0078d4; background-color: #f8f9fa;">
-                        <span style="font-weight: 600; color: #323130;">{physical_name}</span>
-                        <span style="color: #605e5c; margin-left: 8px;">({display_name})</span>
-                    </td>
-                </tr>"""
-    
-    # 构建审查链接HTML
-    review_link_section = ""
-    if confluence_url:
-        review_link_section = f"""
-        <div class="review-log-title">Review log:</div>
-        <div style="margin: 25px 0;">
-            <a href="{confluence_url}" style="background: linear-gradient(135deg, #0078d4, #106ebe); color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; display: inline-block; font-weight: 600; box-shadow: 0 2px 8px rgba(0,120,212,0.3); transition: all 0.3s ease;">
-                📋 Review Log
-            </a>
-        </div>
-        <p style="color: #605e5c; font-size: 14px; margin: 10px 0;">
-            Review log: <a href="{confluence_url}" style="color: #0078d4;">{confluence_url}</a>
-        </p>"""
-    else:
-        review_link_section = """
+# 没有Confluence链接时的审查链接区块
+_NO_REVIEW_LINK_SECTION = """
         <div class="review-log-title">Review log:</div>
         <p style="color: #d13438; font-weight: 500;">Review链接暂不可用，请联系技术支持。</p>"""
-    
-    # 构建完整的HTML模板
-    html_content = f"""<!DOCTYPE html>
+
+
+# 评审邮件HTML模板，占位符按出现顺序为：greeting、model_full_name、fields_table_html、review_link_section、current_time
+EDW_EMAIL_HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>🤖 EDW Model Review Request [AI Generated]</title>
     <style>
-        body {{
+        body {
             font-family: 'Segoe UI', 'Microsoft YaHei', Arial, sans-serif;
             line-height: 1.6;
             margin: 0;
             padding: 0;
             background-color: #f5f5f5;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 600px;
             margin: 20px auto;
             background: white;
             border-radius: 8px;
             box-shadow: 0 2px 12px rgba(0,0,0,0.1);
             overflow: hidden;
-        }}
-        .header {{
+        }
+        .header {
             background: #0078d4;
             color: white;
             padding: 20px;
             text-align: center;
-        }}
-        .content {{
+        }
+        .content {
             padding: 30px;
-        }}
-        .greeting {{
+        }
+        .greeting {
             font-size: 16px;
             color: #323130;
             margin-bottom: 20px;
             font-weight: 500;
-        }}
-        .model-name {{
+        }
+        .model-name {
             font-size: 20px;
             font-weight: 700;
             color: #0078d4;
@@ -211,39 +85,39 @@ async def build_email_template(
             background: #f0f6ff;
             border-left: 4px solid #0078d4;
             border-radius: 4px;
-        }}
-        .fields-section {{
+        }
+        .fields-section {
             margin: 25px 0;
-        }}
-        .fields-title {{
+        }
+        .fields-title {
             font-size: 16px;
             font-weight: 600;
             color: #323130;
             margin-bottom: 15px;
-        }}
-        .fields-table {{
+        }
+        .fields-table {
             width: 100%;
             border-collapse: collapse;
             margin-bottom: 20px;
-        }}
-        .review-log-title {{
+        }
+        .review-log-title {
             font-size: 16px;
             font-weight: 600;
             color: #323130;
             margin: 25px 0 15px 0;
-        }}
-        .footer {{
+        }
+        .footer {
             background: #f8f9fa;
             padding: 20px;
             text-align: center;
             color: #605e5c;
             font-size: 14px;
             border-top: 1px solid #e1dfdd;
-        }}
-        a:hover {{
+        }
+        a:hover {
             transform: translateY(-2px);
             box-shadow: 0 4px 12px rgba(0,120,212,0.4) !important;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -274,12 +148,119 @@ async def build_email_template(
         <div class="footer">
             <p style="margin: 0; color: #4a90e2; font-weight: 600;">🤖 This email was automatically generated by EDW Intelligent Assistant</p>
             <p style="margin: 5px 0 0 0; color: #4a90e2; font-size: 13px;">
-                AI Generated Content | Generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+                AI Generated Content | Generated at {current_time}
             </p>
         </div>
     </div>
 </body>
 </html>"""
+
+_EMAIL_HTML_PLACEHOLDERS = ("greeting", "model_full_name", "fields_table_html", "review_link_section", "current_time")
+
+
+def _split_email_template(template: str, placeholders: tuple) -> tuple:
+    """将模板按占位符顺序切分为字面量片段，模块加载时执行一次"""
+    parts = []
+    rest = template
+    for name in placeholders:
+        head, sep, rest = rest.partition("{" + name + "}")
+        if not sep:
+            raise ValueError(f"邮件模板缺少占位符: {name}")
+        parts.append(head)
+    parts.append(rest)
+    return tuple(parts)
+
+
+_EMAIL_HTML_PARTS = _split_email_template(EDW_EMAIL_HTML_TEMPLATE, _EMAIL_HTML_PLACEHOLDERS)
+
+
+async def build_email_template(
+    table_name: str,
+    model_name: str = "",
+    fields: List[Dict] = None,
+    confluence_url: str = "",
+    confluence_title: str = "",
+    enhancement_type: str = "add_field"
+) -> str:
+    """
+    构建邮件HTML模板
+    
+    Args:
+        table_name: 表名
+        model_name: 模型名称
+        fields: 字段列表
+        confluence_url: Confluence文档链接
+        confluence_title: Confluence文档标题
+        enhancement_type: 增强类型
+    
+    Returns:
+        HTML格式的邮件内容
+    """
+    # 解析schema信息（只切分一次）
+    schema, has_schema, _ = table_name.partition('.')
+    if not has_schema:
+        schema = "default"
+    
+    # 确定问候语
+    greeting = EDW_EMAIL_GREETING_MAP.get(sys.intern(schema.lower()), _DEFAULT_GREETING)
+    
+    # 构建模型全名
+    if model_name:
+        model_full_name = f"{schema}.{model_name}"
+    else:
+        table_suffix = table_name.rpartition('.')[2]
+        formatted_name = table_suffix.replace('_', ' ').title()
+        model_full_name = f"{schema}.{formatted_name}"
+    
+    # 构建字段表格HTML（逐行收集后一次拼接）
+    fields_table_html = ""
+    if fields:
+        rows = []
+        for field in fields:
+            if isinstance(field, dict):
+                physical_name = field.get('physical_name', '')
+                attribute_name = field.get('attribute_name', '')
+            else:
+                physical_name = getattr(field, 'physical_name', '')
+                attribute_name = getattr(field, 'attribute_name', '')
+            
+            if physical_name:
+                display_name = attribute_name if attribute_name else physical_name.replace('_', ' ').title()
+                rows.append(f"""
+                <tr>
+                    <td style="padding: 8px 12px; border-left: 3px solid #0078d4; background-color: #f8f9fa;">
+                        <span style="font-weight: 600; color: #323130;">{physical_name}</span>
+                        <span style="color: #605e5c; margin-left: 8px;">({display_name})</span>
+                    </td>
+                </tr>""")
+        fields_table_html = "".join(rows)
+    
+    # 构建审查链接HTML（无链接时直接复用模块级常量）
+    if confluence_url:
+        review_link_section = f"""
+        <div class="review-log-title">Review log:</div>
+        <div style="margin: 25px 0;">
+            <a href="{confluence_url}" style="background: linear-gradient(135deg, #0078d4, #106ebe); color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; display: inline-block; font-weight: 600; box-shadow: 0 2px 8px rgba(0,120,212,0.3); transition: all 0.3s ease;">
+                📋 Review Log
+            </a>
+        </div>
+        <p style="color: #605e5c; font-size: 14px; margin: 10px 0;">
+            Review log: <a href="{confluence_url}" style="color: #0078d4;">{confluence_url}</a>
+        </p>"""
+    else:
+        review_link_section = _NO_REVIEW_LINK_SECTION
+    
+    # 按预切分的模板片段拼接完整的HTML，无需每次扫描整个模板
+    current_time = now_strings()[0]
+    parts = _EMAIL_HTML_PARTS
+    html_content = "".join((
+        parts[0], greeting,
+        parts[1], model_full_name,
+        parts[2], fields_table_html,
+        parts[3], review_link_section,
+        parts[4], current_time,
+        parts[5]
+    ))
     
     return html_content
 
@@ -311,6 +292,13 @@ async def send_model_review_email(
     try:
         logger.info(f"准备发送模型评审邮件: {table_name}")
         
+        # 邮件token未配置时发送必然失败，先做配置检查，避免白白构建邮件内容
+        from src.basic.config import settings
+        if not settings.EMAIL_TOKEN:
+            error_msg = "EMAIL_TOKEN未配置，请检查环境变量"
+            logger.error(error_msg)
+            return create_tool_result(False, error=error_msg)
+        
         # 构建邮件内容
         html_content = await build_email_template(
             table_name=table_name,
@@ -373,14 +361,7 @@ async def _send_email_via_metis(
         from src.basic.metis.email import Email, EmailParam
         from src.basic.config import settings
         
-        # 检查邮件token
-        if not settings.EMAIL_TOKEN or settings.EMAIL_TOKEN == "":
-            return {
-                "success": False,
-                "error": "EMAIL_TOKEN未配置，请检查环境变量"
-            }
-        
-        # 构建邮件参数
+        # 构建邮件参数（EMAIL_TOKEN已由调用方在构建邮件内容前检查）
         email_params = {
             "MOType": "EDW",
             "MOName": "ModelReview",
@@ -397,9 +378,9 @@ async def _send_email_via_metis(
         # 创建邮件参数对象
         param = EmailParam(email_params)
         
-        # 发送邮件
+        # 发送邮件（同步HTTP请求放到线程中执行，不阻塞事件循环）
         email = Email(param.get_param(), settings.EMAIL_TOKEN)
-        response = email.send()
+        response = await asyncio.to_thread(email.send)
         
         if response and "error" not in str(response).lower():
             logger.info(f"Metis邮件发送成功: {model_name}")
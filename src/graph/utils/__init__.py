@@ -8,19 +8,26 @@ from .message import (
     create_summary_reply,
     extract_message_content,
     build_context_info,
-    format_conversation_history
+    format_conversation_history,
+    build_error_state
 )
 from .code import (
     extract_tables_from_code,
     search_table_cd,
+    asearch_table_cd,
     convert_to_adb_path,
     detect_code_language,
     parse_agent_response
 )
 from .field import (
     get_table_fields_info,
+    prefetch_tables_fields,
     validate_fields_against_base_tables,
     find_similar_fields,
+    find_similar_fields_batch,
+    normalize_field,
+    normalize_fields,
+    normalize_field_dicts,
     validate_english_model_name
 )
 
@@ -30,13 +37,20 @@ __all__ = [
     'extract_message_content',
     'build_context_info',
     'format_conversation_history',
+    'build_error_state',
     'extract_tables_from_code',
     'search_table_cd',
+    'asearch_table_cd',
     'convert_to_adb_path',
     'detect_code_language',
     'parse_agent_response',
     'get_table_fields_info',
+    'prefetch_tables_fields',
     'validate_fields_against_base_tables',
     'find_similar_fields',
+    'find_similar_fields_batch',
+    'normalize_field',
+    'normalize_fields',
+    'normalize_field_dicts',
     'validate_english_model_name',
 ]
\ No newline at end of file
@@ -5,36 +5,68 @@
 import re
 import os
 import json
+import asyncio
 import logging
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+from src.graph.utils.field import normalize_field
 
 logger = logging.getLogger(__name__)
 
+# 高性能JSON解析库，未安装时使用标准库json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_loads(text: str):
+    """解析JSON字符串，优先使用orjson，解析失败统一抛出json.JSONDecodeError"""
+    if ORJSON_AVAILABLE:
+        # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# Python Spark 代码中引用表的模式
+_SPARK_TABLE_PATTERNS = [
+    re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
+        r'spark\.table\(["\']([^"\']+)["\']\)',
+        r'spark\.sql\(["\'][^"\']*FROM\s+([^\s"\';),]+)',
+        r'spark\.read\.table\(["\']([^"\']+)["\']\)',
+        r'\.read\.[^(]*\(["\']([^"\']+)["\']\)'
+    )
+]
+
+# SQL 代码中引用表的模式
+_SQL_TABLE_PATTERNS = [
+    re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
+        r'FROM\s+([^\s;,)\n]+)',
+        r'JOIN\s+([^\s;,)\n]+)',
+        r'UPDATE\s+([^\s;,)\n]+)',
+        r'INSERT\s+INTO\s+([^\s;,)\n]+)'
+    )
+]
+
+# 判断是否为Spark代码（"pyspark"同样包含"spark"）
+_SPARK_CODE_PATTERN = re.compile(r'spark', re.IGNORECASE)
+
+# 表名中需要去除的引号和括号字符
+_TABLE_NAME_STRIP_TABLE = str.maketrans('', '', '"\';()')
+
 
 def extract_tables_from_code(code: str) -> list:
     """从代码中提取引用的表名"""
     tables = set()
     
-    # Python Spark 代码模式
-    if "spark" in code.lower() or "pyspark" in code.lower():
-        patterns = [
-            r'spark\.table\(["\']([^"\']+)["\']\)',
-            r'spark\.sql\(["\'][^"\']*FROM\s+([^\s"\';),]+)',
-            r'spark\.read\.table\(["\']([^"\']+)["\']\)',
-            r'\.read\.[^(]*\(["\']([^"\']+)["\']\)'
-        ]
-    else:  # SQL 代码模式
-        patterns = [
-            r'FROM\s+([^\s;,)\n]+)',
-            r'JOIN\s+([^\s;,)\n]+)',
-            r'UPDATE\s+([^\s;,)\n]+)',
-            r'INSERT\s+INTO\s+([^\s;,)\n]+)'
-        ]
+    # Python Spark 代码模式 / SQL 代码模式
+    patterns = _SPARK_TABLE_PATTERNS if _SPARK_CODE_PATTERN.search(code) else _SQL_TABLE_PATTERNS
     
     for pattern in patterns:
-        matches = re.findall(pattern, code, re.IGNORECASE | re.MULTILINE)
-        for match in matches:
-            table_name = re.sub(r'["\';()]', '', match.strip())
+        for match in pattern.findall(code):
+            table_name = match.strip().translate(_TABLE_NAME_STRIP_TABLE)
             if '.' in table_name and len(table_name) > 5:
                 tables.add(table_name)
     
@@ -54,8 +86,8 @@ def search_table_cd(table_name: str, branch_name: str = None) -> dict:
     if use_github:
         try:
             # 使用GitHub工具进行搜索（传入分支参数）
-            from src.basic.github import GitHubTool
-            github_tool = GitHubTool(branch=branch_name) if branch_name else GitHubTool()
+            from src.basic.github import get_github_tool
+            github_tool = get_github_tool(branch_name or None)
             return github_tool.search_table_code(table_name)
         except Exception as e:
             logger.error(f"GitHub搜索失败: {e}")
@@ -69,6 +101,14 @@ def search_table_cd(table_name: str, branch_name: str = None) -> dict:
         return _search_table_cd_local(table_name)
 
 
+async def asearch_table_cd(table_name: str, branch_name: str = None) -> dict:
+    """
+    search_table_cd 的异步版本
+    GitHub客户端和本地文件搜索都是阻塞I/O，放到线程中执行，避免阻塞事件循环
+    """
+    return await asyncio.to_thread(search_table_cd, table_name, branch_name)
+
+
 def _search_table_cd_local(table_name: str) -> dict:
     """
     本地文件系统搜索实现（原始版本）
@@ -84,17 +124,27 @@ def _search_table_cd_local(table_name: str) -> dict:
     files = system.search_files_by_name("nb_" + name)
     if not files:
         return {"status": "error", "message": f"未找到表 {table_name} 的相关代码"}
-    file = [i for i in files if schema in str(i)][0]
+    file = next((i for i in files if schema in str(i)), None)
+    if file is None:
+        return {"status": "error", "message": f"未找到表 {table_name} 的相关代码"}
     if file.name.endswith(('.sql', '.py')):
         file_path = os.path.join(os.getenv("LOCAL_REPO_PATH"), str(file))
-        last_modified = os.path.getmtime(file_path)
         language = 'sql' if file.name.endswith('.sql') else 'python'
-        size = os.path.getsize(file_path)
+        # 一次stat获取大小和修改时间，并直接读取文件内容
+        stat_result = os.stat(file_path)
+        size = stat_result.st_size
+        last_modified = stat_result.st_mtime
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                code = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"读取文件失败 {file_path}: {e}")
+            code = None
         file_info = {
             'status': 'success',
             'table_name': table_name,
             'description': f"{table_name}表的数据加工代码",
-            'code': system.read_file(str(file)),
+            'code': code,
             'language': language,
             'file_name': file.name,
             'file_path': str(file.absolute()),
@@ -112,15 +162,21 @@ def _search_table_cd_local(table_name: str) -> dict:
     return {"status": "error", "message": f"暂不支持的代码文件格式: {file.name}"}
 
 
+@lru_cache(maxsize=1024)
 def convert_to_adb_path(code_path: str) -> str:
     """
-    将本地代码路径转换为ADB路径格式
+    将本地代码路径转换为ADB路径格式（结果按路径缓存，仅首次转换时记录日志）
     例如: D:\\code\\Finance\\Magellan-Finance-Databricks\\Magellan-Finance\\cam_fi\\Notebooks\\nb_daas_booking_actual_data_autoflow.py
     转换为: /Magellan-Finance/cam_fi/Notebooks/nb_daas_booking_actual_data_autoflow
     """
     if not code_path:
         return ""
     
+    # 已经是ADB路径格式，无需转换
+    if (code_path.startswith("/Magellan-Finance/") and "\\" not in code_path
+            and not code_path.endswith(('.py', '.sql'))):
+        return code_path
+    
     # 标准化路径分隔符
     normalized_path = code_path.replace("\\", "/")
     
@@ -151,24 +207,31 @@ def convert_to_adb_path(code_path: str) -> str:
     return adb_path
 
 
+# 代码文件扩展名到语言的映射
+_LANGUAGE_EXT_MAP = {
+    '.sql': 'SQL',
+    '.py': 'PYTHON',
+    '.scala': 'SCALA',
+    '.r': 'R',
+}
+
+# 预编译的内容特征正则，直接在原文上忽略大小写匹配，避免整段lower()拷贝
+_PYTHON_HINT_PATTERN = re.compile(r'spark\.sql|pyspark|import ', re.IGNORECASE)
+_SQL_HINT_PATTERN = re.compile(r'select |create table', re.IGNORECASE)
+
+
 def detect_code_language(code_path: str, source_code: str = "") -> str:
     """检测代码语言"""
     if code_path:
-        if code_path.endswith('.sql'):
-            return 'SQL'  # Databricks SQL笔记本通常使用SCALA语言标识
-        elif code_path.endswith('.py'):
-            return 'PYTHON'
-        elif code_path.endswith('.scala'):
-            return 'SCALA'
-        elif code_path.endswith('.r'):
-            return 'R'
+        ext = os.path.splitext(code_path)[1].lower()
+        if ext in _LANGUAGE_EXT_MAP:
+            return _LANGUAGE_EXT_MAP[ext]
     
     # 从源代码内容推断
     if source_code:
-        source_code_lower = source_code.lower()
-        if 'spark.sql' in source_code_lower or 'pyspark' in source_code_lower or 'import ' in source_code_lower:
+        if _PYTHON_HINT_PATTERN.search(source_code):
             return 'PYTHON'
-        elif 'select ' in source_code_lower or 'create table' in source_code_lower:
+        elif _SQL_HINT_PATTERN.search(source_code):
             return 'SQL'
     
     # 默认返回Python
@@ -270,6 +333,49 @@ def attempt_fix_truncated_json(content: str) -> str:
         return content
 
 
+# 智能体响应解析使用的正则
+_JSON_BLOCK_RE = re.compile(r'```json\n(.*?)\n```', re.DOTALL)
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+_CODE_RE = re.compile(r'```(?:python|sql)\n(.*?)\n```', re.DOTALL)
+_SQL_RE = re.compile(r'```sql\n(.*?)\n```', re.DOTALL)
+
+
+def _find_json_object(content: str) -> Optional[str]:
+    """
+    单次线性扫描定位第一个括号配对完整的JSON对象，支持任意嵌套层级
+
+    只在花括号、引号、反斜杠处停留，字符串内的花括号不参与配对
+    """
+    depth = 0
+    start = -1
+    in_str = False
+    skip_pos = -1  # 被反斜杠转义的字符位置
+    for match in _JSON_TOKEN_RE.finditer(content):
+        pos = match.start()
+        if pos == skip_pos:
+            continue
+        char = content[pos]
+        if in_str:
+            if char == '\\':
+                skip_pos = pos + 1
+            elif char == '"':
+                in_str = False
+            continue
+        if char == '"':
+            # 只关心对象内部的字符串，对象外的引号（如说明文字）忽略
+            if depth > 0:
+                in_str = True
+        elif char == '{':
+            if depth == 0:
+                start = pos
+            depth += 1
+        elif char == '}' and depth > 0:
+            depth -= 1
+            if depth == 0:
+                return content[start:pos + 1]
+    return None
+
+
 def parse_agent_response(content: str) -> dict:
     """解析智能体响应，提取JSON结果"""
     
@@ -281,23 +387,23 @@ def parse_agent_response(content: str) -> dict:
     
     try:
         # 尝试直接解析JSON
-        result = json.loads(content.strip())
+        result = _json_loads(content.strip())
         return result
     except json.JSONDecodeError:
         # 如果解析失败，尝试提取JSON代码块
-        json_match = re.search(r'```json\n(.*?)\n```', content, re.DOTALL)
+        json_match = _JSON_BLOCK_RE.search(content)
         if json_match:
             try:
-                result = json.loads(json_match.group(1).strip())
+                result = _json_loads(json_match.group(1).strip())
                 return result
             except json.JSONDecodeError:
                 logger.warning("JSON代码块解析失败")
         
         # 尝试找到花括号包围的内容
-        brace_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', content, re.DOTALL)
-        if brace_match:
+        brace_content = _find_json_object(content)
+        if brace_content:
             try:
-                result = json.loads(brace_match.group(0))
+                result = _json_loads(brace_content)
                 return result
             except json.JSONDecodeError:
                 logger.warning("花括号内容解析失败")
@@ -305,11 +411,11 @@ def parse_agent_response(content: str) -> dict:
         # 如果JSON解析都失败，尝试回退到原来的markdown解析
         logger.warning("JSON解析失败，回退到markdown解析")
         # 尝试提取代码块（python或sql）
-        code_match = re.search(r'```(?:python|sql)\n(.*?)\n```', content, re.DOTALL)
+        code_match = _CODE_RE.search(content)
         if code_match:
             default_result["enhanced_code"] = code_match.group(1).strip()
         
-        sql_matches = re.findall(r'```sql\n(.*?)\n```', content, re.DOTALL)
+        sql_matches = _SQL_RE.findall(content)
         if len(sql_matches) >= 1:
             default_result["new_table_ddl"] = sql_matches[0].strip()
         if len(sql_matches) >= 2:
@@ -320,23 +426,16 @@ def parse_agent_response(content: str) -> dict:
 
 
 
+def _format_field_label(field: Any) -> str:
+    """单个字段的显示文本：物理名 (属性名)，缺少属性名时只显示物理名"""
+    _, name, attr = normalize_field(field)
+    return f"{name} ({attr})" if name and attr else name
+
+
 def format_fields_info(fields: list) -> str:
     """格式化字段信息为字符串"""
     if not fields:
         return "无字段信息"
-    
-    fields_info = []
-    for field in fields:
-        if isinstance(field, dict):
-            name = field.get('physical_name', '')
-            attr = field.get('attribute_name', '')
-        else:
-            name = getattr(field, 'physical_name', '')
-            attr = getattr(field, 'attribute_name', '')
-        
-        if name and attr:
-            fields_info.append(f"{name} ({attr})")
-        elif name:
-            fields_info.append(name)
-    
-    return ', '.join(fields_info) if fields_info else "无字段信息"
\ No newline at end of file
+
+    # map/filter 直接交给 str.join 消费，不构建中间列表
+    return ', '.join(filter(None, map(_format_field_label, fields))) or "无字段信息"
\ No newline at end of file
@@ -4,13 +4,20 @@
 支持分阶段生成以处理大型任务，避免LLM输出截断
 """
 
+import asyncio
 import logging
 import json
+import os
 import re
+import threading
+from contextlib import asynccontextmanager
 from typing import Dict, Any, List, Optional, Tuple
-from langchain.schema.messages import HumanMessage
+from langchain.schema.messages import HumanMessage, AIMessage, AIMessageChunk
+from langgraph.config import get_stream_writer
+from src.agent.edw_agents import aget_code_enhancement_agent
 from src.graph.utils.session import SessionManager
-from src.graph.utils.code import parse_agent_response
+from src.graph.utils.code import parse_agent_response, format_fields_info
+from src.graph.utils.field import normalize_fields
 
 # Git diff解析库
 try:
@@ -22,6 +29,46 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 并发代码增强任务上限，避免大量会话同时打满MCP连接和LLM后端
+_ENHANCEMENT_CONCURRENCY = max(1, int(os.getenv("EDW_ENH_CONCURRENCY", "8")))
+# 每个请求运行在独立的事件循环上，因此使用进程级的线程信号量在所有请求间共享上限
+_enhancement_semaphore = threading.BoundedSemaphore(_ENHANCEMENT_CONCURRENCY)
+_ENHANCEMENT_POLL_INTERVAL = 0.1
+_enhancement_stats = {"running": 0, "waiting": 0}
+_enhancement_stats_lock = threading.Lock()
+
+
+def _update_enhancement_stats(key: str, delta: int):
+    """在锁内更新并发统计，多个请求线程会同时修改"""
+    with _enhancement_stats_lock:
+        _enhancement_stats[key] += delta
+
+
+@asynccontextmanager
+async def _enhancement_slot(table_name: str):
+    """占用一个代码增强并发名额，名额已满时轮询等待而不阻塞事件循环"""
+    if not _enhancement_semaphore.acquire(blocking=False):
+        logger.info(f"代码增强并发已达上限({_ENHANCEMENT_CONCURRENCY})，排队等待: {table_name}")
+        _update_enhancement_stats("waiting", 1)
+        try:
+            while not _enhancement_semaphore.acquire(blocking=False):
+                await asyncio.sleep(_ENHANCEMENT_POLL_INTERVAL)
+        finally:
+            _update_enhancement_stats("waiting", -1)
+
+    _update_enhancement_stats("running", 1)
+    try:
+        yield
+    finally:
+        _update_enhancement_stats("running", -1)
+        _enhancement_semaphore.release()
+
+
+def get_enhancement_concurrency_stats() -> Dict[str, int]:
+    """获取代码增强任务的并发统计（上限、执行中、排队中）"""
+    with _enhancement_stats_lock:
+        return {"limit": _ENHANCEMENT_CONCURRENCY, **_enhancement_stats}
+
 
 def extract_json_from_response(content: str, fallback_data: dict = None) -> dict:
     """
@@ -252,20 +299,59 @@ def analyze_code_structure(source_code: str) -> Dict[str, Any]:
 
 
 
+async def _astream_agent_content(enhancement_agent: Any, task_message: str, config: Dict) -> str:
+    """
+    流式执行智能体，逐token推送到custom流，返回最终AI消息的完整内容
+
+    智能体中间可能穿插工具调用，因此每轮AI输出单独累积，
+    以最后一轮（不含工具调用）的内容作为最终响应；
+    工具返回后推送带reset标记的片段，前端据此丢弃上一轮已展示的内容
+    """
+    # 在LangGraph图内执行时获取流写入器，图外调用时只累积结果
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        writer = None
+
+    content_chunks: List[str] = []
+    streamed = False  # 当前轮是否已向前端推送过片段
+    async for chunk, _metadata in enhancement_agent.astream(
+        {"messages": [HumanMessage(task_message)]},
+        config,
+        stream_mode="messages",
+    ):
+        if isinstance(chunk, AIMessageChunk):
+            content = chunk.text()
+        elif isinstance(chunk, AIMessage):
+            # 模型未逐token输出时整条返回AI消息，以其内容作为本轮的完整输出
+            content = chunk.text()
+            content_chunks = []
+        else:
+            # 工具返回结果后智能体会开始新一轮输出，丢弃之前的中间内容
+            content_chunks = []
+            if writer and streamed:
+                writer({"type": "enhancement_chunk", "content": "", "reset": True})
+            streamed = False
+            continue
+
+        if not content:
+            continue
+        content_chunks.append(content)
+        if writer:
+            writer({"type": "enhancement_chunk", "content": content})
+            streamed = True
+
+    return "".join(content_chunks)
+
+
 async def execute_single_phase_enhancement(enhancement_mode: str, task_message: str,
                                            enhancement_agent: Any, config: Dict,
                                            table_name: str, **kwargs) -> Dict:
     """
     传统的单次生成方法（保持原有逻辑）
     """
-    # 调用全局智能体执行增强任务
-    result = await enhancement_agent.ainvoke(
-        {"messages": [HumanMessage(task_message)]},
-        config,
-    )
-
-    # 解析智能体的响应
-    response_content = result["messages"][-1].content
+    # 流式调用全局智能体执行增强任务，完整内容到达后再解析JSON
+    response_content = await _astream_agent_content(enhancement_agent, task_message, config)
     enhancement_result = parse_agent_response(response_content)
 
     if enhancement_result.get("enhanced_code"):
@@ -325,17 +411,18 @@ async def execute_code_enhancement_task(state: "EDWState", enhancement_mode: str
         table_name = state.get("table_name", "unknown")
         logger.info(f"选择增强策略: {strategy} (模式={enhancement_mode}, 表={table_name})")
 
-        # 2. 创建并执行策略执行器
-        enhancer = create_enhancer(strategy, enhancement_mode, state)
-        result = await enhancer.execute()
+        # 2. 创建并执行策略执行器（受并发上限控制）
+        async with _enhancement_slot(table_name):
+            enhancer = create_enhancer(strategy, enhancement_mode, state)
+            result = await enhancer.execute()
 
-        # 3. 如果Git diff策略失败，降级到传统策略
-        if not result.get("success") and strategy == "single_git_diff":
-            logger.warning(f"Git diff策略失败，降级到传统策略: {table_name}")
+            # 3. 如果Git diff策略失败，降级到传统策略
+            if not result.get("success") and strategy == "single_git_diff":
+                logger.warning(f"Git diff策略失败，降级到传统策略: {table_name}")
 
-            # 创建传统策略执行器并重新执行
-            fallback_enhancer = create_enhancer("traditional", enhancement_mode, state)
-            result = await fallback_enhancer.execute()
+                # 创建传统策略执行器并重新执行
+                fallback_enhancer = create_enhancer("traditional", enhancement_mode, state)
+                result = await fallback_enhancer.execute()
 
         if result.get("success"):
             logger.info(f"代码增强成功: {enhancement_mode} - {table_name}")
@@ -355,8 +442,66 @@ async def execute_code_enhancement_task(state: "EDWState", enhancement_mode: str
         logger.debug(f"代码增强任务完成 ({enhancement_mode})")
 
 
+async def collect_table_schemas(table_names: List[str]) -> Dict[str, List[Tuple[str, str]]]:
+    """并发获取表结构（走表字段缓存），返回 {表名: [(字段名, 字段类型), ...]}，查询失败的表不包含在结果中"""
+    from src.graph.utils.field import get_table_fields_info
+
+    table_names = list(dict.fromkeys(t for t in table_names if t))
+    if not table_names:
+        return {}
+
+    results = await asyncio.gather(*(get_table_fields_info(t) for t in table_names), return_exceptions=True)
+    schemas = {}
+    for table_name, result in zip(table_names, results):
+        if isinstance(result, dict) and result.get("status") == "success":
+            schemas[table_name] = [(f["name"], f["type"]) for f in result.get("fields", [])]
+        else:
+            logger.warning(f"获取表结构失败，提示词中不包含该表: {table_name}")
+    return schemas
+
+
+def format_table_schemas(table_schemas: Optional[Dict[str, List[Tuple[str, str]]]]) -> str:
+    """将表结构格式化为提示词中的markdown文本"""
+    if not table_schemas:
+        return ""
+    blocks = []
+    for table_name, columns in table_schemas.items():
+        column_lines = "\n".join(f"    {name}: {data_type}" for name, data_type in columns)
+        blocks.append(f"- {table_name}\n{column_lines}")
+    return "\n".join(blocks)
+
+
+def _build_source_type_step(source_names: List[str], table_schemas: Optional[Dict] = None) -> str:
+    """构建"推断新字段数据类型"的执行步骤：已知底表结构时直接引用，否则指导智能体查询"""
+    source_list = ', '.join(source_names) if source_names else '无'
+    if table_schemas:
+        return f"""根据【已知表结构】中源字段的数据类型，结合用户逻辑来推断新字段的数据类型（无需再查询底表结构）
+    源字段列表：{source_list}"""
+    return f"""查询源字段在底表的数据类型，结合用户逻辑来推断新字段的数据类型
+    源字段列表：{source_list}
+    你可以使用如下类似sql查询（请根据实际底表调整table_schema和table_name）：
+         SELECT column_name, full_data_type
+         FROM `system`.information_schema.columns
+         WHERE table_schema = '相应的schema'
+         AND table_name = '相应的底表名'
+         AND LOWER(column_name) IN ('')"""
+
+
+def _build_known_schemas_section(table_schemas: Optional[Dict] = None) -> str:
+    """构建【已知表结构】提示词段落，无表结构时返回空字符串"""
+    formatted_schemas = format_table_schemas(table_schemas)
+    if not formatted_schemas:
+        return ""
+    return f"""
+**已知表结构**（字段名: 数据类型）:
+{formatted_schemas}
+"""
+
+
 def build_initial_enhancement_prompt(table_name: str, source_code: str, adb_code_path: str,
-                                     fields: list, logic_detail: str, code_path: str = "", **kwargs) -> str:
+                                     fields: list, logic_detail: str, code_path: str = "",
+                                     table_schemas: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+                                     **kwargs) -> str:
     """构建初始模型增强的提示词 - 完整流程"""
 
     # 判断代码类型
@@ -372,16 +517,7 @@ def build_initial_enhancement_prompt(table_name: str, source_code: str, adb_code
     fields_info = []
     source_names = []  # 收集源字段名用于查询
     source_names_lower = []  # 收集小写的源字段名用于大小写不敏感查询
-    for field in fields:
-        if isinstance(field, dict):
-            source_name = field.get('source_name', '')
-            physical_name = field.get('physical_name', '')
-            attribute_name = field.get('attribute_name', '')
-        else:
-            source_name = getattr(field, 'source_name', '')
-            physical_name = getattr(field, 'physical_name', '')
-            attribute_name = getattr(field, 'attribute_name', '')
-
+    for source_name, physical_name, attribute_name in normalize_fields(fields):
         # 显示格式：标准化字段名 (属性描述) <- 源字段名
         fields_info.append(f"{physical_name} ({attribute_name}) <- 源字段: {source_name}")
         if source_name:
@@ -404,16 +540,9 @@ def build_initial_enhancement_prompt(table_name: str, source_code: str, adb_code
 ```
 {source_code}
 ```
-
+{_build_known_schemas_section(table_schemas)}
 **执行步骤**:
-1. 查询源字段在底表的数据类型，结合用户逻辑来推断新字段的数据类型
-    源字段列表：{', '.join(source_names) if source_names else '无'}
-    你可以使用如下类似sql查询（请根据实际底表调整table_schema和table_name）：
-         SELECT column_name, full_data_type
-         FROM `system`.information_schema.columns
-         WHERE table_schema = '相应的schema'
-         AND table_name = '相应的底表名'
-         AND LOWER(column_name) IN ('')
+1. {_build_source_type_step(source_names, table_schemas)}
 2. 获取当前表建表语句
     你可以使用如下类似sql查询：
          SHOW CREATE TABLE {table_name};
@@ -499,28 +628,6 @@ def build_review_improvement_prompt(improvement_prompt: str, **kwargs) -> str:
 }}"""
 
 
-def format_fields_info(fields: list) -> str:
-    """格式化字段信息为字符串"""
-    if not fields:
-        return "无字段信息"
-
-    fields_info = []
-    for field in fields:
-        if isinstance(field, dict):
-            name = field.get('physical_name', '')
-            attr = field.get('attribute_name', '')
-        else:
-            name = getattr(field, 'physical_name', '')
-            attr = getattr(field, 'attribute_name', '')
-
-        if name and attr:
-            fields_info.append(f"{name} ({attr})")
-        elif name:
-            fields_info.append(name)
-
-    return ', '.join(fields_info) if fields_info else "无字段信息"
-
-
 # ===== Git diff工具函数 =====
 
 def parse_git_diff_chunk_with_unidiff(chunk: str) -> Optional[Dict[str, Any]]:
@@ -1197,16 +1304,7 @@ def build_git_diff_only_prompt(table_name: str, source_code: str, fields: List[D
     all_fields_info = []
     source_names = []
 
-    for i, field in enumerate(fields, 1):
-        if isinstance(field, dict):
-            source_name = field.get('source_name', '')
-            physical_name = field.get('physical_name', '')
-            attribute_name = field.get('attribute_name', '')
-        else:
-            source_name = getattr(field, 'source_name', '')
-            physical_name = getattr(field, 'physical_name', '')
-            attribute_name = getattr(field, 'attribute_name', '')
-
+    for i, (source_name, physical_name, attribute_name) in enumerate(normalize_fields(fields), 1):
         field_info = f"{i}.{physical_name} ({attribute_name}) <- 源字段: {source_name}"
         all_fields_info.append(field_info)
 
@@ -1318,7 +1416,8 @@ def build_git_diff_only_prompt(table_name: str, source_code: str, fields: List[D
 
 
 def build_create_table_prompt(table_name: str, fields: List[Dict],
-                              logic_detail: str, git_diffs_result: Dict) -> str:
+                              logic_detail: str, git_diffs_result: Dict,
+                              table_schemas: Optional[Dict[str, List[Tuple[str, str]]]] = None) -> str:
     """
     构建生成CREATE TABLE语句的prompt - 第二步：生成建表语句（记忆优化版）
 
@@ -1329,6 +1428,7 @@ def build_create_table_prompt(table_name: str, fields: List[Dict],
         fields: 字段列表
         logic_detail: 用户逻辑需求（可能包含字段位置要求等）
         git_diffs_result: 第一步的Git diff结果
+        table_schemas: 已知的底表结构，提供时无需智能体再查询源字段类型
 
     Returns:
         简化的CREATE TABLE生成prompt
@@ -1337,16 +1437,7 @@ def build_create_table_prompt(table_name: str, fields: List[Dict],
     fields_info = []
     source_names = []  # 收集源字段名用于查询
     source_names_lower = []  # 收集小写的源字段名用于大小写不敏感查询
-    for field in fields:
-        if isinstance(field, dict):
-            source_name = field.get('source_name', '')
-            physical_name = field.get('physical_name', '')
-            attribute_name = field.get('attribute_name', '')
-        else:
-            source_name = getattr(field, 'source_name', '')
-            physical_name = getattr(field, 'physical_name', '')
-            attribute_name = getattr(field, 'attribute_name', '')
-
+    for source_name, physical_name, attribute_name in normalize_fields(fields):
         # 显示格式：标准化字段名 (属性描述) <- 源字段名
         fields_info.append(f"{physical_name} ({attribute_name}) <- 源字段: {source_name}")
         if source_name:
@@ -1359,16 +1450,9 @@ def build_create_table_prompt(table_name: str, fields: List[Dict],
 - 用户增强需求: {logic_detail}
 - 第一步已完成: {git_diffs_result.get('total_fields_processed', len(fields))}个字段的代码修改
 - 请参考前面提到的用户位置要求和字段分组需求
-
+{_build_known_schemas_section(table_schemas)}
 **执行要求**:
-1. 查询源字段在底表的数据类型，结合用户逻辑来推断新字段的数据类型
-    源字段列表：{', '.join(source_names) if source_names else '无'}
-    你可以使用如下类似sql查询（请根据实际底表调整table_schema和table_name）：
-         SELECT column_name, full_data_type
-         FROM `system`.information_schema.columns
-         WHERE table_schema = '相应的schema'
-         AND table_name = '相应的底表名'
-         AND LOWER(column_name) IN ('')
+1. {_build_source_type_step(source_names, table_schemas)}
 2. 获取当前表建表语句: `SHOW CREATE TABLE {table_name}`
 3. 根据前面用户逻辑需求确定新增字段位置
 4. 生成完整CREATE TABLE语句（包含原有+新增字段）
@@ -1535,7 +1619,8 @@ class TraditionalEnhancer(BaseEnhancer):
                 adb_code_path=self.state.get("adb_code_path", ""),
                 fields=self.state.get("fields", []),
                 logic_detail=self.state.get("logic_detail", ""),
-                code_path=self.state.get("code_path", "")
+                code_path=self.state.get("code_path", ""),
+                table_schemas=self.state.get("table_schemas")
             )
         elif self.mode == "review_improvement":
             return self._build_traditional_review_prompt()
@@ -1627,10 +1712,8 @@ class TraditionalEnhancer(BaseEnhancer):
             prompt = self.build_prompt()
 
             # 获取智能体和配置
-            from src.agent.edw_agents import get_code_enhancement_agent
-            enhancement_agent = get_code_enhancement_agent()
+            enhancement_agent = await aget_code_enhancement_agent()
 
-            from src.graph.utils.session import SessionManager
             config = SessionManager.get_config_with_monitor(
                 user_id=self.user_id,
                 agent_type=f"enhancement_{self.table_name}",
@@ -1727,16 +1810,7 @@ class GitDiffEnhancer(BaseEnhancer):
 
         # 获取字段信息
         fields_info = []
-        for i, field in enumerate(fields, 1):
-            if isinstance(field, dict):
-                source_name = field.get('source_name', '')
-                physical_name = field.get('physical_name', '')
-                attribute_name = field.get('attribute_name', '')
-            else:
-                source_name = getattr(field, 'source_name', '')
-                physical_name = getattr(field, 'physical_name', '')
-                attribute_name = getattr(field, 'attribute_name', '')
-
+        for i, (source_name, physical_name, attribute_name) in enumerate(normalize_fields(fields), 1):
             field_info = f"{i}. {physical_name} ({attribute_name}) <- 源字段: {source_name}"
             fields_info.append(field_info)
 
@@ -1807,10 +1881,8 @@ class GitDiffEnhancer(BaseEnhancer):
             logger.info(f"开始分批次Git diff增强: 表={self.table_name}, 字段数={len(fields)}, 模式={self.mode}")
 
             # 获取智能体和配置
-            from src.agent.edw_agents import get_code_enhancement_agent
-            enhancement_agent = get_code_enhancement_agent()
+            enhancement_agent = await aget_code_enhancement_agent()
 
-            from src.graph.utils.session import SessionManager
             config = SessionManager.get_config_with_monitor(
                 user_id=self.user_id,
                 agent_type=f"enhancement_{self.table_name}",
@@ -1850,7 +1922,8 @@ class GitDiffEnhancer(BaseEnhancer):
                 table_name=self.table_name,
                 fields=fields,
                 logic_detail=logic_detail,
-                git_diffs_result=git_diff_data
+                git_diffs_result=git_diff_data,
+                table_schemas=self.state.get("table_schemas")
             )
 
             create_table_result = await enhancement_agent.ainvoke(
@@ -2,13 +2,83 @@
 字段处理工具函数
 """
 
+import os
+import re
+import csv
+import asyncio
 import logging
+from operator import itemgetter
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 from difflib import SequenceMatcher
 
 logger = logging.getLogger(__name__)
 
+# 字符串相似度计算库（C++实现），未安装时降级为difflib
+try:
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Indel as rf_indel
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+    logger.info("rapidfuzz库未安装，字段相似度计算将使用difflib")
+
+# 批量相似度矩阵的top-k选择依赖numpy
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 字段三元组：(源字段名, 物理字段名, 属性名称)
+_FIELD_KEYS = ('source_name', 'physical_name', 'attribute_name')
+_FIELD_TUPLE_GETTER = itemgetter(*_FIELD_KEYS)
+
+# 模型名称校验：中文字符、标准单词（首字母大写的英文单词）
+_CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+_MODEL_NAME_WORD_PATTERN = re.compile(r'[A-Z][a-zA-Z]*')
+
+# DESCRIBE结果中以空白分隔的行：字段名 + 字段类型
+_DESCRIBE_WHITESPACE_LINE = re.compile(r'^[ \t]*(\S+)[ \t]+(\S+)', re.MULTILINE)
+
+
+def normalize_field(field: Any) -> Tuple[str, str, str]:
+    """
+    将字典或FieldDefinition对象统一为 (source_name, physical_name, attribute_name) 元组
+
+    缺失或为None的属性统一返回空字符串
+    """
+    if isinstance(field, dict):
+        if all(key in field for key in _FIELD_KEYS):
+            values = _FIELD_TUPLE_GETTER(field)
+        else:
+            values = tuple(field.get(key) for key in _FIELD_KEYS)
+    else:
+        values = tuple(getattr(field, key, '') for key in _FIELD_KEYS)
+    return tuple(value or '' for value in values)
+
+
+def normalize_fields(fields: Optional[List[Any]]) -> List[Tuple[str, str, str]]:
+    """批量规范化字段列表，调用方只需遍历元组即可，无需再区分dict/对象"""
+    return [normalize_field(field) for field in fields or ()]
+
+
+def normalize_field_dicts(fields: Optional[List[Any]]) -> List[Dict[str, Any]]:
+    """
+    将字段列表统一为普通字典列表：字典原样保留，FieldDefinition等对象转为属性字典
+
+    下游（Confluence文档、评审邮件）只需按字典取值，无需逐个字段再区分dict/对象
+    """
+    normalized = []
+    for field in fields or ():
+        if isinstance(field, dict):
+            normalized.append(field)
+        elif hasattr(field, 'model_dump'):
+            normalized.append(field.model_dump())
+        else:
+            normalized.append(vars(field))
+    return normalized
+
 
 def validate_english_model_name(name: str) -> tuple[bool, str]:
     """验证英文模型名称格式"""
@@ -18,7 +88,7 @@ def validate_english_model_name(name: str) -> tuple[bool, str]:
     name = name.strip()
     
     # 检查是否包含中文字符
-    if any('\u4e00' <= char <= '\u9fff' for char in name):
+    if _CJK_PATTERN.search(name):
         return False, f"模型名称不能包含中文字符，当前值: '{name}'"
     
     # 检查是否符合标准格式（首字母大写，单词间空格分隔）
@@ -26,9 +96,8 @@ def validate_english_model_name(name: str) -> tuple[bool, str]:
     if not words:
         return False, "模型名称不能为空"
     
-    for word in words:
-        if not word[0].isupper() or not word.isalpha():
-            return False, f"模型名称应采用标准格式（如：Finance Invoice Header），当前值: '{name}'"
+    if not all(_MODEL_NAME_WORD_PATTERN.fullmatch(word) for word in words):
+        return False, f"模型名称应采用标准格式（如：Finance Invoice Header），当前值: '{name}'"
     
     return True, ""
 
@@ -67,26 +136,21 @@ async def _fetch_table_fields_from_db(table_name: str) -> dict:
         result = await execute_sql_via_mcp(desc_query)
         logger.info(f"调用mcp 工具 exec sql result: {result}")
         if result and "错误" not in result.lower():
-            # 解析字段信息
-            fields = []
-            lines = result.split('\n')
-            for line in lines[1:]:  # 跳过标题行
-                if line.strip():
-                    # 优先支持CSV格式（逗号分隔），然后是制表符，最后是空格
-                    if ',' in line:
-                        parts = line.split(',')
-                    elif '\t' in line:
-                        parts = line.split('\t')
-                    else:
-                        parts = line.split()
-                    
-                    if len(parts) >= 2:
-                        field_name = parts[0].strip()
-                        field_type = parts[1].strip()
-                        fields.append({
-                            "name": field_name,
-                            "type": field_type
-                        })
+            # 解析字段信息：根据标题行一次性确定分隔符（优先CSV逗号，其次制表符，最后空白）
+            header, _, body = result.partition('\n')
+            delimiter = ',' if ',' in header else ('\t' if '\t' in header else None)
+            
+            if delimiter:
+                rows = csv.reader(body.splitlines(), delimiter=delimiter)
+                fields = [
+                    {"name": row[0].strip(), "type": row[1].strip()}
+                    for row in rows if len(row) >= 2 and row[0].strip()
+                ]
+            else:
+                fields = [
+                    {"name": name, "type": field_type}
+                    for name, field_type in _DESCRIBE_WHITESPACE_LINE.findall(body)
+                ]
             
             return {"status": "success", "fields": fields}
         else:
@@ -97,20 +161,81 @@ async def _fetch_table_fields_from_db(table_name: str) -> dict:
         return {"status": "error", "message": str(e)}
 
 
-def find_similar_fields(input_field: str, available_fields: list, threshold: Optional[float] = None) -> list:
-    """查找相似的字段名"""
+async def _fetch_tables_fields_concurrently(table_names: List[str]) -> Dict[str, dict]:
+    """并发查询多个表的字段信息，使用信号量限制同时进行的MCP请求数"""
+    semaphore = asyncio.Semaphore(max(1, int(os.getenv("EDW_MCP_CONCURRENCY", "8"))))
+    
+    async def fetch(table_name: str) -> dict:
+        async with semaphore:
+            logger.info(f"正在查询底表字段信息: {table_name}")
+            return await get_table_fields_info(table_name)
+    
+    results = await asyncio.gather(*(fetch(t) for t in table_names), return_exceptions=True)
+    
+    tables_info = {}
+    for table_name, result in zip(table_names, results):
+        if isinstance(result, BaseException):
+            logger.error(f"查询表字段失败 {table_name}: {result}")
+            result = {"status": "error", "message": str(result)}
+        else:
+            logger.info(f"mcp返回信息: {result}")
+        tables_info[table_name] = result
+    return tables_info
+
+
+async def prefetch_tables_fields(table_names: List[str]) -> None:
+    """并发预查询表字段信息以预热缓存，失败不影响后续验证"""
+    table_names = list(dict.fromkeys(t for t in table_names if t))
+    if not table_names:
+        return
+    try:
+        await _fetch_tables_fields_concurrently(table_names)
+        logger.info(f"表字段缓存预热完成: {table_names}")
+    except Exception as e:
+        logger.warning(f"表字段缓存预热失败: {e}")
+
+
+def _field_similarity(name_lower: str, field_lower: str) -> float:
+    """计算两个小写字段名的相似度
+    
+    rapidfuzz可用时为Indel相似度（2*最长公共子序列长度/总长度），否则退回difflib的ratio。
+    difflib按连续匹配块计数，结果不高于Indel相似度（如 customer_name/create_time 为0.333对0.5），
+    因此同一阈值下的匹配结果取决于是否安装了rapidfuzz
+    """
+    if not RAPIDFUZZ_AVAILABLE:
+        return SequenceMatcher(None, name_lower, field_lower).ratio()
+    total = len(name_lower) + len(field_lower)
+    if not total:
+        return 1.0
+    return (total - rf_indel.distance(name_lower, field_lower)) / total
+
+
+def find_similar_fields(input_field: str, available_fields: list, threshold: Optional[float] = None,
+                        *, lc_cache: Optional[List[str]] = None) -> list:
+    """查找相似的字段名
+    
+    Args:
+        input_field: 待匹配的字段名
+        available_fields: 候选字段列表
+        threshold: 相似度阈值，默认读取验证配置
+        lc_cache: 候选字段的小写形式（与available_fields一一对应），批量调用时可预先计算传入
+    """
     from src.config import get_config_manager
     config_manager = get_config_manager()
     
+    validation_config = config_manager.get_validation_config()
     if threshold is None:
-        validation_config = config_manager.get_validation_config()
         threshold = validation_config.similarity_threshold
+    max_suggestions = validation_config.max_suggestions
+    
+    input_lower = input_field.lower()
+    fields_lower = lc_cache if lc_cache is not None else [field.lower() for field in available_fields]
     
     similar_fields = []
     
-    for field in available_fields:
+    for field, field_lower in zip(available_fields, fields_lower):
         # 计算字符串相似度
-        similarity = SequenceMatcher(None, input_field.lower(), field.lower()).ratio()
+        similarity = _field_similarity(input_lower, field_lower)
         if similarity >= threshold:
             similar_fields.append({
                 "field_name": field,
@@ -120,11 +245,160 @@ def find_similar_fields(input_field: str, available_fields: list, threshold: Opt
     # 按相似度排序
     similar_fields.sort(key=lambda x: x["similarity"], reverse=True)
     
-    validation_config = config_manager.get_validation_config()
-    max_suggestions = validation_config.max_suggestions
     return similar_fields[:max_suggestions]
 
 
+def find_similar_fields_batch(input_fields: list, available_fields: list, threshold: Optional[float] = None,
+                              *, lc_cache: Optional[List[str]] = None) -> List[list]:
+    """批量查找相似字段名，返回与input_fields一一对应的相似字段列表
+    
+    rapidfuzz和numpy可用时一次性计算相似度矩阵，否则逐个调用find_similar_fields
+    """
+    fields_lower = lc_cache if lc_cache is not None else [field.lower() for field in available_fields]
+    
+    if not (RAPIDFUZZ_AVAILABLE and NUMPY_AVAILABLE) or not input_fields or not available_fields:
+        return [
+            find_similar_fields(input_field, available_fields, lc_cache=fields_lower, threshold=threshold)
+            for input_field in input_fields
+        ]
+    
+    from src.config import get_config_manager
+    validation_config = get_config_manager().get_validation_config()
+    if threshold is None:
+        threshold = validation_config.similarity_threshold
+    max_suggestions = validation_config.max_suggestions
+    
+    inputs_lower = [input_field.lower() for input_field in input_fields]
+    # 由整数Indel距离换算相似度 2*最长公共子序列长度/总长度（与_field_similarity一致），避免百分制和float32带来的精度误差
+    distances = rf_process.cdist(inputs_lower, fields_lower, scorer=rf_indel.distance, dtype=np.int32)
+    totals = np.add.outer(
+        np.array([len(name) for name in inputs_lower], dtype=np.int64),
+        np.array([len(name) for name in fields_lower], dtype=np.int64)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(totals > 0, (totals - distances) / totals, 1.0)
+    
+    # 稳定排序，相似度相同时保持候选字段原有顺序
+    ordered_indices = np.argsort(-scores, axis=1, kind="stable")[:, :max_suggestions]
+    
+    results = []
+    for row_scores, indices in zip(scores, ordered_indices):
+        results.append([
+            {"field_name": available_fields[index], "similarity": float(row_scores[index])}
+            for index in indices if row_scores[index] >= threshold
+        ])
+    return results
+
+
+def _analyze_field(query: str, available_fields: list, lc_fields: List[str], split_fields: List[set],
+                  threshold: float, max_suggestions: int) -> Tuple[list, list]:
+    """单次遍历候选字段，同时计算相似字段和基于词汇模式的建议
+    
+    Returns:
+        (相似字段列表, 模式建议列表)
+    """
+    query_lower = query.lower()
+    query_parts = set(query_lower.split('_'))
+    similars = []
+    pattern_hits = []
+    
+    for field, field_lower, field_parts in zip(available_fields, lc_fields, split_fields):
+        similarity = _field_similarity(query_lower, field_lower)
+        if similarity >= threshold:
+            similars.append({"field_name": field, "similarity": similarity})
+        
+        # 模式建议最多保留3个
+        if len(pattern_hits) < 3:
+            common_parts = query_parts & field_parts
+            if common_parts:
+                pattern_hits.append({
+                    "field_name": field,
+                    "reason": f"包含相同词汇: {', '.join(common_parts)}"
+                })
+    
+    similars.sort(key=lambda x: x["similarity"], reverse=True)
+    return similars[:max_suggestions], pattern_hits
+
+
+def _analyze_fields(source_names: List[str], available_fields: list, lc_fields: List[str],
+                    split_fields: List[set]) -> List[Tuple[list, list]]:
+    """批量分析字段，返回与source_names一一对应的 (相似字段, 模式建议)
+    
+    底表中存在同名字段（忽略大小写）时直接视为完全匹配，跳过模糊计算；
+    其余字段在rapidfuzz和numpy可用时使用矩阵批量计算相似度，仅对无相似字段的输入补充模式建议，
+    否则逐字段单次遍历同时完成两项计算
+    """
+    # 小写字段名 -> 原始字段名，用于精确匹配
+    exact_lookup = dict(zip(lc_fields, available_fields))
+    results: List[Optional[Tuple[list, list]]] = [None] * len(source_names)
+    fuzzy_indices = []
+    for i, name in enumerate(source_names):
+        exact_field = exact_lookup.get(name.lower())
+        if exact_field is not None:
+            results[i] = ([{"field_name": exact_field, "similarity": 1.0}], [])
+        else:
+            fuzzy_indices.append(i)
+    
+    if not fuzzy_indices:
+        return results
+    
+    fuzzy_names = [source_names[i] for i in fuzzy_indices]
+    if RAPIDFUZZ_AVAILABLE and NUMPY_AVAILABLE:
+        similar_fields_list = find_similar_fields_batch(fuzzy_names, available_fields, lc_cache=lc_fields)
+        fuzzy_results = [
+            (similars, [] if similars else _generate_pattern_suggestions(name, available_fields, parts_cache=split_fields))
+            for name, similars in zip(fuzzy_names, similar_fields_list)
+        ]
+    else:
+        from src.config import get_config_manager
+        validation_config = get_config_manager().get_validation_config()
+        fuzzy_results = [
+            _analyze_field(name, available_fields, lc_fields, split_fields,
+                          validation_config.similarity_threshold, validation_config.max_suggestions)
+            for name in fuzzy_names
+        ]
+    
+    for i, result in zip(fuzzy_indices, fuzzy_results):
+        results[i] = result
+    return results
+
+
+def _cpu_validate(source_names: List[str], available_fields: list,
+                  table_name: Optional[str] = None) -> Tuple[List[str], Dict[str, list]]:
+    """同步执行字段相似度和模式匹配校验（纯CPU计算，供asyncio.to_thread调用）
+    
+    Args:
+        source_names: 待校验的源字段名列表
+        available_fields: 底表字段列表
+        table_name: 指定的来源表名，仅用于日志
+    
+    Returns:
+        (无效字段列表, 字段建议字典)
+    """
+    invalid_fields = []
+    suggestions = {}
+    
+    # 预先计算候选字段的小写形式和词汇集合，避免逐字段重复计算
+    fields_lower = [name.lower() for name in available_fields]
+    fields_parts = [set(name.split('_')) for name in fields_lower]
+    analysis_results = _analyze_fields(source_names, available_fields, fields_lower, fields_parts)
+    
+    location = f"指定底表 {table_name} 中" if table_name else "底表中"
+    for source_name, (similar_fields, pattern_suggestions) in zip(source_names, analysis_results):
+        if not similar_fields:
+            invalid_fields.append(source_name)  # 记录源字段名
+            # 提供基于字段名称模式的建议
+            if pattern_suggestions:
+                suggestions[source_name] = pattern_suggestions
+            logger.warning(f"字段 {source_name} 在{location}未找到相似字段")
+        elif similar_fields[0]["similarity"] < 0.8:
+            # 如果相似度不够高，也提供建议
+            suggestions[source_name] = similar_fields
+            logger.info(f"字段 {source_name} 在{location}找到相似字段: {[f['field_name'] for f in similar_fields[:3]]}")
+    
+    return invalid_fields, suggestions
+
+
 async def validate_fields_against_base_tables(fields: list, base_tables: list, source_code: str) -> dict:
     """验证新增字段是否基于底表中的现有字段
     
@@ -167,40 +441,33 @@ async def validate_fields_against_base_tables(fields: list, base_tables: list, s
         else:
             fields_without_table.append(field)
     
+    # 一次性并发查询所有需要的表（指定来源表 + 代码中提取的底表）
+    tables_to_query = list(fields_by_table)
+    if fields_without_table:
+        tables_to_query.extend(t for t in dict.fromkeys(base_tables) if t not in fields_by_table)
+    tables_info = await _fetch_tables_fields_concurrently(tables_to_query)
+    
     # 优先级1：验证有明确source_table的字段
     for table_name, table_fields in fields_by_table.items():
-        logger.info(f"正在查询指定底表字段信息: {table_name}")
-        table_info = await get_table_fields_info(table_name)
-        logger.info(f"mcp返回信息: {table_info}")
+        table_info = tables_info[table_name]
         
         if table_info["status"] == "success":
             table_field_names = [field["name"] for field in table_info["fields"]]
             validation_result["base_tables_info"][table_name] = table_field_names
             logger.info(f"底表 {table_name} 包含字段: {table_field_names}")
             
-            # 验证该表的字段
-            for field in table_fields:
-                if isinstance(field, dict):
-                    source_name = field.get("source_name", "")
-                else:
-                    source_name = getattr(field, "source_name", "")
-                
-                # 查找相似字段
-                similar_fields = find_similar_fields(source_name, table_field_names)
-                
-                if not similar_fields:
-                    validation_result["valid"] = False
-                    validation_result["invalid_fields"].append(source_name)
-                    # 提供建议
-                    pattern_suggestions = _generate_pattern_suggestions(source_name, table_field_names)
-                    if pattern_suggestions:
-                        validation_result["suggestions"][source_name] = pattern_suggestions
-                    logger.warning(f"字段 {source_name} 在指定底表 {table_name} 中未找到相似字段")
-                else:
-                    # 如果相似度不够高，也提供建议
-                    if similar_fields[0]["similarity"] < 0.8:
-                        validation_result["suggestions"][source_name] = similar_fields
-                        logger.info(f"字段 {source_name} 在表 {table_name} 中找到相似字段: {[f['field_name'] for f in similar_fields[:3]]}")
+            # 验证该表的字段（相似度计算在线程池中执行，避免阻塞事件循环）
+            source_names = [
+                field.get("source_name", "") if isinstance(field, dict) else getattr(field, "source_name", "")
+                for field in table_fields
+            ]
+            invalid_fields, suggestions = await asyncio.to_thread(
+                _cpu_validate, source_names, table_field_names, table_name
+            )
+            if invalid_fields:
+                validation_result["valid"] = False
+                validation_result["invalid_fields"].extend(invalid_fields)
+            validation_result["suggestions"].update(suggestions)
         else:
             logger.warning(f"无法获取指定底表 {table_name} 的字段信息: {table_info['message']}")
             validation_result["base_tables_info"][table_name] = []
@@ -225,9 +492,7 @@ async def validate_fields_against_base_tables(fields: list, base_tables: list, s
                 all_base_fields.extend(validation_result["base_tables_info"][table_name])
                 continue
                 
-            logger.info(f"正在查询底表字段信息: {table_name}")
-            table_info = await get_table_fields_info(table_name)
-            logger.info(f"mcp返回信息: {table_info}")
+            table_info = tables_info[table_name]
             if table_info["status"] == "success":
                 table_fields = [field["name"] for field in table_info["fields"]]
                 all_base_fields.extend(table_fields)
@@ -275,30 +540,19 @@ async def validate_fields_against_base_tables(fields: list, base_tables: list, s
         else:
             logger.info(f"所有底表字段（用于验证未指定source_table的字段）: {all_base_fields}")
             
-            # 检查每个未指定source_table的字段
-            for field in fields_without_table:
-                # 兼容字典和对象访问
-                if isinstance(field, dict):
-                    source_name = field.get("source_name", "")
-                else:
-                    source_name = getattr(field, "source_name", "")
-                
-                # 使用source_name检查是否在底表中存在相似字段
-                similar_fields = find_similar_fields(source_name, all_base_fields)
-                
-                if not similar_fields:
-                    validation_result["valid"] = False
-                    validation_result["invalid_fields"].append(source_name)  # 记录源字段名
-                    # 提供基于字段名称模式的建议
-                    pattern_suggestions = _generate_pattern_suggestions(source_name, all_base_fields)
-                    if pattern_suggestions:
-                        validation_result["suggestions"][source_name] = pattern_suggestions
-                    logger.warning(f"字段 {source_name} 在底表中未找到相似字段")
-                else:
-                    # 如果相似度不够高，也提供建议
-                    if similar_fields[0]["similarity"] < 0.8:
-                        validation_result["suggestions"][source_name] = similar_fields
-                        logger.info(f"字段 {source_name} 找到相似字段: {[f['field_name'] for f in similar_fields[:3]]}")
+            # 检查每个未指定source_table的字段（兼容字典和对象访问）
+            source_names = [
+                field.get("source_name", "") if isinstance(field, dict) else getattr(field, "source_name", "")
+                for field in fields_without_table
+            ]
+            # 使用source_name检查是否在底表中存在相似字段（在线程池中执行，避免阻塞事件循环）
+            invalid_fields, suggestions = await asyncio.to_thread(
+                _cpu_validate, source_names, all_base_fields
+            )
+            if invalid_fields:
+                validation_result["valid"] = False
+                validation_result["invalid_fields"].extend(invalid_fields)
+            validation_result["suggestions"].update(suggestions)
     
     # 记录结束时间和缓存统计
     end_time = datetime.now()
@@ -329,16 +583,20 @@ async def validate_fields_against_base_tables(fields: list, base_tables: list, s
     return validation_result
 
 
-def _generate_pattern_suggestions(field_name: str, available_fields: list) -> list:
-    """基于字段名称模式生成建议"""
+def _generate_pattern_suggestions(field_name: str, available_fields: list,
+                                  parts_cache: Optional[List[set]] = None) -> list:
+    """基于字段名称模式生成建议
+    
+    parts_cache 为候选字段按'_'拆分后的小写词汇集合（与available_fields一一对应），批量调用时可预先计算传入
+    """
     suggestions = []
-    field_parts = field_name.lower().split('_')
+    field_parts = set(field_name.lower().split('_'))
+    if parts_cache is None:
+        parts_cache = [set(field.lower().split('_')) for field in available_fields]
     
-    for available_field in available_fields:
-        available_parts = available_field.lower().split('_')
-        
+    for available_field, available_parts in zip(available_fields, parts_cache):
         # 检查是否有共同的词汇
-        common_parts = set(field_parts) & set(available_parts)
+        common_parts = field_parts & available_parts
         if common_parts:
             suggestions.append({
                 "field_name": available_field,
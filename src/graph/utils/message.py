@@ -3,7 +3,7 @@
 """
 
 import logging
-from typing import List
+from typing import Any, Dict, List
 from langchain.schema.messages import HumanMessage, AIMessage
 from langchain.docstore.document import Document
 from langchain.chains.summarize import load_summarize_chain
@@ -90,6 +90,27 @@ def build_context_info(state: EDWState) -> str:
     return "\n".join(context_parts) if context_parts else "无特殊上下文信息"
 
 
+def build_error_state(content: str, error_msg: str, user_id: str = "", **extras) -> Dict[str, Any]:
+    """
+    构建节点失败时返回的状态更新
+    
+    Args:
+        content: 展示给用户的错误消息内容
+        error_msg: 写入状态的错误信息
+        user_id: 用户ID
+        **extras: 节点特有的附加字段
+    
+    Returns:
+        包含messages、error_message、user_id及附加字段的状态更新
+    """
+    return {
+        "messages": [AIMessage(content=content)],
+        "error_message": error_msg,
+        "user_id": user_id,
+        **extras
+    }
+
+
 def format_conversation_history(messages: List) -> str:
     """格式化对话历史为易读格式"""
     if not messages:
@@ -99,19 +120,12 @@ def format_conversation_history(messages: List) -> str:
     for i, message in enumerate(messages, 1):
         content = extract_message_content(message)
         
-        # 确定消息来源
-        if isinstance(message, HumanMessage):
-            source = "用户"
-        elif isinstance(message, AIMessage):
-            source = "系统"
-        else:
-            source = "系统"
+        # 确定消息来源（非用户消息均视为系统消息）
+        source = "用户" if isinstance(message, HumanMessage) else "系统"
         
         # 限制单条消息长度
-        if len(content) > 200:
-            content = content[:200] + "..."
-        
-        formatted_messages.append(f"{i}. **{source}**: {content}")
+        suffix = "..." if len(content) > 200 else ""
+        formatted_messages.append(f"{i}. **{source}**: {content[:200]}{suffix}")
     
     return "\n".join(formatted_messages)
 
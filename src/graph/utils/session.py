@@ -5,6 +5,7 @@
 
 import uuid
 import hashlib
+from functools import lru_cache
 from typing import List, Optional
 from src.config import get_config_manager
 
@@ -13,6 +14,15 @@ config_manager = get_config_manager()
 system_config = config_manager.get_system_config()
 
 
+@lru_cache(maxsize=4096)
+def _thread_id_impl(user_id: str, agent_type: str, length: int) -> str:
+    """计算thread_id（结果确定，按参数缓存）"""
+    combined_id = f"{user_id}_{agent_type}"
+    # BLAKE2b直接生成所需长度的摘要（每字节对应2个十六进制字符）
+    digest_size = min(64, max(4, (length + 1) // 2))
+    return hashlib.blake2b(combined_id.encode(), digest_size=digest_size).hexdigest()[:length]
+
+
 class SessionManager:
     """统一管理用户会话，特别是线程ID管理"""
     
@@ -24,9 +34,7 @@ class SessionManager:
             return str(uuid.uuid4())
         
         # 使用user_id和agent_type的组合生成thread_id，确保不同智能体的会话隔离
-        combined_id = f"{user_id}_{agent_type}"
-        thread_id_length = system_config.thread_id_length
-        return hashlib.md5(combined_id.encode()).hexdigest()[:thread_id_length]
+        return _thread_id_impl(user_id, agent_type, system_config.thread_id_length)
     
     @staticmethod
     def get_config(user_id: str = "", agent_type: str = "default") -> dict:
@@ -3,8 +3,10 @@
 使用MultiServerMCPClient连接到SSE MCP服务
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any, AsyncGenerator
+import threading
+from typing import List, Dict, Any, AsyncGenerator, Optional
 from contextlib import asynccontextmanager
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from src.config import get_config_manager
@@ -16,6 +18,11 @@ class MCPClientManager:
     
     def __init__(self):
         self.config_manager = get_config_manager()
+        # 进程内共享的客户端和工具列表（懒加载），避免每次查询都重新连接并拉取工具
+        self._shared_client: Optional[MultiServerMCPClient] = None
+        self._shared_tools: Optional[List] = None
+        # 每个请求运行在独立线程的事件循环上，共享客户端的初始化需要进程级的锁
+        self._init_lock = threading.Lock()
         
     def get_mcp_servers_config(self) -> Dict[str, Dict[str, str]]:
         """获取MCP服务器配置"""
@@ -65,6 +72,41 @@ class MCPClientManager:
                 except:
                     pass
     
+    async def get_shared_tools(self) -> List:
+        """获取共享的MCP工具列表，首次调用时创建客户端并拉取工具，并发调用只初始化一次"""
+        if self._shared_tools is not None:
+            return self._shared_tools
+        
+        # 轮询获取线程锁，等待期间不阻塞当前事件循环
+        while not self._init_lock.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+        try:
+            if self._shared_tools is None:
+                mcp_servers_config = self.get_mcp_servers_config()
+                if not mcp_servers_config:
+                    logger.warning("未配置MCP服务器")
+                    return []
+                
+                if self._shared_client is None:
+                    logger.info(f"正在连接MCP服务器: {list(mcp_servers_config.keys())}")
+                    self._shared_client = MultiServerMCPClient(mcp_servers_config)
+                
+                tools = await asyncio.wait_for(self._shared_client.get_tools(), timeout=10.0)
+                logger.info(f"获取到 {len(tools)} 个共享MCP工具")
+                # 空列表不缓存，下次调用重新获取
+                self._shared_tools = tools or None
+                return tools
+        
+            return self._shared_tools
+        finally:
+            self._init_lock.release()
+    
+    def reset_shared_client(self):
+        """重置共享客户端，下次调用时重新连接（如服务重启或配置变更）"""
+        with self._init_lock:
+            self._shared_client = None
+            self._shared_tools = None
+    
     @asynccontextmanager 
     async def get_mcp_tools(self) -> AsyncGenerator[List, None]:
         """获取MCP工具列表"""
@@ -106,26 +148,29 @@ async def get_mcp_tools():
 
 # 为了向后兼容保留的函数
 async def execute_sql_via_mcp(query: str, mode: str = "batch") -> str:
-    """通过MCP执行SQL查询"""
-    async with get_mcp_client() as client:
-        if client:
-            try:
-                tools = await client.get_tools()
-                # 查找SQL执行工具
-                sql_tool = None
-                for tool in tools:
-                    if hasattr(tool, 'name') and 'execute_sql' in tool.name:
-                        sql_tool = tool
-                        break
-                
-                if sql_tool:
-                    result = await sql_tool.ainvoke({"query": query, "mode": mode})
-                    return str(result)
-                else:
-                    logger.error("未找到SQL执行工具")
-                    return "错误: 未找到SQL执行工具"
-            except Exception as e:
-                logger.error(f"MCP SQL执行失败: {e}")
-                return f"错误: {str(e)}"
-        else:
-            return "错误: MCP客户端未连接"
\ No newline at end of file
+    """通过MCP执行SQL查询（复用共享客户端和工具列表）"""
+    manager = get_mcp_client_manager()
+    try:
+        tools = await manager.get_shared_tools()
+    except Exception as e:
+        logger.error(f"MCP客户端连接失败: {e}")
+        manager.reset_shared_client()
+        return "错误: MCP客户端未连接"
+    
+    if not tools:
+        return "错误: MCP客户端未连接"
+    
+    # 查找SQL执行工具
+    sql_tool = next((tool for tool in tools if 'execute_sql' in getattr(tool, 'name', '')), None)
+    if not sql_tool:
+        logger.error("未找到SQL执行工具")
+        return "错误: 未找到SQL执行工具"
+    
+    try:
+        result = await sql_tool.ainvoke({"query": query, "mode": mode})
+        return str(result)
+    except Exception as e:
+        logger.error(f"MCP SQL执行失败: {e}")
+        # 服务可能已重启，下次调用时重新获取工具列表
+        manager.reset_shared_client()
+        return f"错误: {str(e)}"
@@ -53,6 +53,7 @@ class EDWState(TypedDict):
     refinement_requested: Optional[bool]  # 用户是否请求微调
     refinement_history: Optional[List[dict]]  # 微调对话历史
     current_refinement_round: Optional[int]  # 当前微调轮次
+    refinement_rounds: Optional[int]  # 本次增强后已执行的代码微调次数，用于限制微调循环
     original_enhanced_code: Optional[str]  # 原始代码备份
     refinement_feedback: Optional[str]  # 用户最新反馈
     user_refinement_input: Optional[str]  # 用户微调输入
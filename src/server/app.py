@@ -17,7 +17,6 @@ import logging
 # 导入EDW相关模块
 from src.server.edw_service import EDWStreamService, EDWStreamConfig
 from src.server.socket_manager import register_session_socket, unregister_session_socket
-from src.agent.edw_agents import get_agent_manager
 from pydantic import BaseModel
 from openai.types.responses import ResponseTextDeltaEvent
 from collections import defaultdict
@@ -704,29 +703,9 @@ if __name__ == '__main__':
     print("   MCP服务器会在应用关闭时正确清理")
     print("   Agent实例会在会话结束时自动清理")
 
-    # 初始化功能Agent
+    # 代码增强/功能Agent依赖MCP工具，首次处理相关任务时才异步初始化，避免拖慢服务启动
     print("\n功能Agent初始化:")
-    try:
-        import asyncio
-        from src.agent.edw_agents import get_agent_manager
-        
-        def initialize_function_agent():
-            async def _init():
-                agent_manager = get_agent_manager()
-                await agent_manager.async_initialize()
-                print("   ✅ 功能Agent初始化完成")
-                
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(_init())
-            finally:
-                loop.close()
-        
-        initialize_function_agent()
-    except Exception as e:
-        print(f"   ❌ 功能Agent初始化失败: {e}")
-        logger.error(f"功能Agent初始化失败: {e}")
+    print("   首次使用时按需加载MCP工具")
 
     try:
         socketio.run(app, debug=True, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
@@ -9,8 +9,10 @@ EDW图流式服务适配器 - 桥接Flask和LangGraph
 """
 
 import asyncio
+import hashlib
 import json
 import uuid
+from collections import OrderedDict
 from typing import AsyncGenerator, Dict, Any, Optional, List
 from dataclasses import dataclass
 from datetime import datetime
@@ -25,6 +27,170 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 单次执行中记录已推送内容摘要的上限，超出后淘汰最早的记录
+MAX_DISPLAYED_CONTENT = 512
+
+# 图的流式模式：updates 获取节点输出，custom 获取节点通过 stream writer 推送的增量内容（如增强代码的生成片段）
+# 不使用 messages 模式，否则导航分类、意图识别等内部LLM调用的token也会被推送给用户
+GRAPH_STREAM_MODES = ["updates", "custom"]
+
+# 节点展示元数据：节点进度推送时按节点名查表，未登记的节点使用通用样式
+NODE_METADATA = {
+    "navigate_node": {
+        "icon": "🧭",
+        "label": "任务分类",
+        "color": "#4CAF50",
+        "description": "正在分析您的需求类型..."
+    },
+    "chat_node": {
+        "icon": "💬",
+        "label": "智能对话",
+        "color": "#2196F3",
+        "description": "正在与AI助手对话..."
+    },
+    "function_node": {
+        "icon": "⚡",
+        "label": "功能执行",
+        "color": "#673AB7",
+        "description": "正在执行功能任务..."
+    },
+    "validation_subgraph": {
+        "icon": "✅",
+        "label": "信息验证",
+        "color": "#FF9800",
+        "description": "正在验证必要信息的完整性..."
+    },
+    "search_table_code_node": {
+        "icon": "🔍",
+        "label": "代码搜索",
+        "color": "#4CAF50",
+        "description": "正在搜索目标表的代码文件..."
+    },
+    "requirement_extraction_node": {
+        "icon": "📋",
+        "label": "需求提取",
+        "color": "#2196F3",
+        "description": "正在提取和理解您的需求..."
+    },
+    "field_standardization_node": {
+        "icon": "📏",
+        "label": "字段标准化",
+        "color": "#9C27B0",
+        "description": "正在标准化字段命名..."
+    },
+    "attribute_review_subgraph": {
+        "icon": "📝",
+        "label": "属性命名Review",
+        "color": "#00BCD4",
+        "description": "正在评审字段属性名称..."
+    },
+    "attribute_review": {
+        "icon": "✏️",
+        "label": "属性评估",
+        "color": "#00ACC1",
+        "description": "正在评估属性命名的规范性..."
+    },
+    "model_enhance_node": {
+        "icon": "🚀",
+        "label": "代码增强",
+        "color": "#9C27B0",
+        "description": "正在生成增强代码..."
+    },
+    "code_enhance_node": {
+        "icon": "⚙️",
+        "label": "代码生成",
+        "color": "#673AB7",
+        "description": "正在生成优化后的代码..."
+    },
+    "code_review_subgraph": {
+        "icon": "🔍",
+        "label": "代码Review",
+        "color": "#FF5722",
+        "description": "正在评审代码质量..."
+    },
+    "review": {
+        "icon": "📊",
+        "label": "质量评估",
+        "color": "#FF5722",
+        "description": "正在评估代码质量和需求符合度..."
+    },
+    "regenerate": {
+        "icon": "🔧",
+        "label": "代码改进",
+        "color": "#FF6F00",
+        "description": "根据评审意见改进代码..."
+    },
+    "code_refinement_node": {
+        "icon": "✨",
+        "label": "代码微调",
+        "color": "#00BCD4",
+        "description": "正在微调代码细节..."
+    },
+    "refinement_inquiry_node": {
+        "icon": "💭",
+        "label": "微调询问",
+        "color": "#FFC107",
+        "description": "正在询问微调需求..."
+    },
+    "refinement_intent_node": {
+        "icon": "🎯",
+        "label": "意图识别",
+        "color": "#795548",
+        "description": "正在识别用户意图..."
+    },
+    "github_push_node": {
+        "icon": "📤",
+        "label": "推送GitHub",
+        "color": "#607D8B",
+        "description": "正在推送代码到GitHub..."
+    },
+    "publish_node": {
+        "icon": "🚚",
+        "label": "发布同步",
+        "color": "#E91E63",
+        "description": "正在并行更新ADB并生成文档、发送邮件..."
+    },
+    "adb_update_node": {
+        "icon": "🔄",
+        "label": "更新ADB",
+        "color": "#E91E63",
+        "description": "正在更新ADB数据库..."
+    },
+    "confluence_node": {
+        "icon": "📝",
+        "label": "生成文档",
+        "color": "#3F51B5",
+        "description": "正在生成技术文档..."
+    },
+    "email_node": {
+        "icon": "📧",
+        "label": "发送邮件",
+        "color": "#009688",
+        "description": "正在发送邮件通知..."
+    }
+}
+
+# 任务类型的中文标签
+TASK_TYPE_LABELS = {
+    "model_enhance": "模型增强",
+    "model_add": "新增模型",
+    "chat": "智能对话",
+    "other": "其他任务"
+}
+
+
+async def astream_graph(graph, graph_input: Any, config: Dict) -> AsyncGenerator[tuple, None]:
+    """
+    流式执行图，逐条返回 (namespace, mode, chunk)
+
+    增强代码片段等custom数据由模型开发子图内的节点推送，需开启subgraphs才能收到；
+    namespace 为空元组表示主图自身的事件
+    """
+    async for namespace, mode, chunk in graph.astream(
+        graph_input, config, stream_mode=GRAPH_STREAM_MODES, subgraphs=True
+    ):
+        yield namespace, mode, chunk
+
 
 @dataclass
 class EDWStreamConfig:
@@ -44,6 +210,8 @@ class EDWStreamService:
         self.interrupt_data = None
         self.current_state = None
         self.workflow_active = False
+        # 已推送内容的摘要（有界LRU），避免同一次执行中重复推送相同的AI消息
+        self._displayed_content = OrderedDict()
         
         # 🎯 注册socket队列到全局管理器
         if config.socket_queue:
@@ -53,6 +221,23 @@ class EDWStreamService:
         """获取当前会话的socket队列"""
         return get_session_socket(self.config.session_id)
 
+    def _mark_content_displayed(self, content: str) -> bool:
+        """记录即将推送的内容，已推送过则返回False"""
+        key = hashlib.blake2b(str(content).encode("utf-8"), digest_size=16).digest()
+        if key in self._displayed_content:
+            self._displayed_content.move_to_end(key)
+            return False
+        self._displayed_content[key] = None
+        if len(self._displayed_content) > MAX_DISPLAYED_CONTENT:
+            self._displayed_content.popitem(last=False)
+        return True
+
+    def _build_custom_chunk(self, payload: Any) -> Optional[Dict]:
+        """将节点通过stream writer推送的数据转为SSE数据块，只转发带type字段的字典"""
+        if isinstance(payload, dict) and payload.get("type"):
+            return {**payload, "session_id": self.config.session_id}
+        return None
+
     async def stream_workflow(self, user_message: str) -> AsyncGenerator[Dict, None]:
         """
         流式执行EDW工作流，生成SSE格式的数据
@@ -64,6 +249,8 @@ class EDWStreamService:
             Dict: SSE格式的数据块，包含type、content、session_id等字段
         """
 
+        self._displayed_content.clear()
+
         try:
             # 1. 创建初始状态 - 🎯 socket_queue已移至全局管理器
             initial_state = {
@@ -89,16 +276,20 @@ class EDWStreamService:
             self.workflow_active = True
 
             # 4. 流式执行图 - 使用组合模式获取节点路由和自定义数据
-            async for stream_data in guid.astream(initial_state, graph_config, stream_mode=["updates"]):
-                # 组合模式返回 (mode, chunk) 元组
-                mode, chunk = stream_data
+            async for namespace, mode, chunk in astream_graph(guid, initial_state, graph_config):
+                # 处理custom模式的数据 - 节点（包括子图中的节点）生成过程中推送的增量内容，直接转发
+                if mode == "custom":
+                    custom_chunk = self._build_custom_chunk(chunk)
+                    if custom_chunk:
+                        yield custom_chunk
+                    continue
                 
                 # 🔍 调试：记录所有stream数据的结构
                 logger.debug(f"收到stream数据: mode='{mode}', type={type(chunk)}, content={str(chunk)[:200] if chunk else 'None'}...")
                 
 
-                # 处理updates模式的数据 - 正常的节点路由信息
-                if mode == "updates":
+                # 处理updates模式的数据 - 正常的节点路由信息，只处理主图层级的节点（子图的中断也会上报到主图）
+                if mode == "updates" and not namespace:
                     # 处理每个节点的输出
                     for node_name, node_output in chunk.items():
                         
@@ -232,6 +423,8 @@ class EDWStreamService:
             }
             return
 
+        self._displayed_content.clear()
+
         try:
             # 🎯 关键：使用Command恢复中断执行
             # 注意：使用resume参数传递用户输入，这样interrupt()函数会返回这个值
@@ -266,11 +459,15 @@ class EDWStreamService:
                 )
 
             # 🎯 使用Command继续流式执行
-            async for stream_data in guid.astream(resume_command, graph_config, stream_mode=["updates"]):
-                # 组合模式返回 (mode, chunk) 元组
-                mode, chunk = stream_data
-                # 处理updates模式的数据
-                if mode == "updates":
+            async for namespace, mode, chunk in astream_graph(guid, resume_command, graph_config):
+                # 处理custom模式的数据 - 节点（包括子图中的节点）生成过程中推送的增量内容，直接转发
+                if mode == "custom":
+                    custom_chunk = self._build_custom_chunk(chunk)
+                    if custom_chunk:
+                        yield custom_chunk
+                    continue
+                # 处理updates模式的数据，只处理主图层级的节点
+                if mode == "updates" and not namespace:
                     for node_name, node_output in chunk.items():
                         
                         # 🎯 处理特殊节点（如__interrupt__）的tuple输出
@@ -358,6 +555,15 @@ class EDWStreamService:
                 "session_id": self.config.session_id
             }
 
+    # 节点名称 -> 输出处理方法名的分发表，未登记的节点走默认处理
+    # （验证、增强、review、GitHub、ADB、Confluence等节点的专用输出已停用，统一按默认方式输出）
+    _NODE_OUTPUT_HANDLERS = {
+        "navigate_node": "_handle_navigate_output",
+        "model_dev_node": "_handle_model_dev_output",
+        "chat_node": "_handle_chat_output",
+        "function_node": "_handle_chat_output",
+    }
+
     async def _process_node_output(self, node_name: str, node_output: Dict) -> AsyncGenerator[Dict, None]:
         """
         处理不同节点的输出，生成相应的流式数据
@@ -369,152 +575,58 @@ class EDWStreamService:
         Yields:
             Dict: 处理后的输出数据
         """
-
-        # 导航节点 - 返回任务分类结果
-        if node_name == "navigate_node":
-            task_type = node_output.get("type", "unknown")
-            # 只记录日志，不输出到流（让后续节点处理实际输出）
-            logger.info(f"导航节点识别任务类型: {task_type}")
-            # 如果是other类型，表示将进入chat_node
-            # 如果是model_dev类型，表示将进入model_node
-            # 对于model_dev_node，需要特殊处理
-        elif node_name == "model_dev_node":
-            # 从state中获取最后一条message（workflow_summary生成的内容）
-            messages = node_output.get("messages", [])
-            if messages:
-                last_message = messages[-1]
-                if hasattr(last_message, 'content'):
-                    # 直接发送content类型的数据，让前端能够显示
-                    logger.info(f"发送model_dev_node总结内容: {last_message.content[:100]}...")
-                    yield {
-                        "type": "content",
-                        "content": last_message.content,
-                        "session_id": self.config.session_id
-                    }
-                    await asyncio.sleep(0.02)  # 轻微延迟，模拟流式效果
-            else:
-                # 如果没有messages，尝试使用原有的流式处理
-                async for text_chunk in self._stream_chat_content(node_output):
-                    yield text_chunk
-        # 聊天节点 - 流式返回AI响应（普通聊天）
-        elif node_name in ("chat_node", "function_node"):
+        handler = getattr(self, self._NODE_OUTPUT_HANDLERS.get(node_name, "_handle_default_output"))
+        async for output_chunk in handler(node_name, node_output):
+            yield output_chunk
+
+    async def _handle_navigate_output(self, node_name: str, node_output: Dict) -> AsyncGenerator[Dict, None]:
+        """导航节点 - 只记录任务分类结果，不输出到流（让后续节点处理实际输出）"""
+        task_type = node_output.get("type", "unknown")
+        logger.info(f"导航节点识别任务类型: {task_type}")
+        return
+        yield  # 保持异步生成器签名
+
+    async def _handle_model_dev_output(self, node_name: str, node_output: Dict) -> AsyncGenerator[Dict, None]:
+        """模型开发节点 - 发送workflow_summary生成的总结内容"""
+        # 从state中获取最后一条message（workflow_summary生成的内容）
+        messages = node_output.get("messages", [])
+        if messages:
+            last_message = messages[-1]
+            if hasattr(last_message, 'content') and self._mark_content_displayed(last_message.content):
+                # 直接发送content类型的数据，让前端能够显示
+                logger.info(f"发送model_dev_node总结内容: {last_message.content[:100]}...")
+                yield {
+                    "type": "content",
+                    "content": last_message.content,
+                    "session_id": self.config.session_id
+                }
+                await asyncio.sleep(0.02)  # 轻微延迟，模拟流式效果
+        else:
+            # 如果没有messages，尝试使用原有的流式处理
             async for text_chunk in self._stream_chat_content(node_output):
                 yield text_chunk
-        # # 功能节点 - 流式返回功能执行结果
-        # elif node_name == "function_node":
-        #     async for text_chunk in self._stream_chat_content(node_output):
-        #         yield text_chunk
-        #
-        # # 验证子图 - 返回验证进度
-        # elif node_name == "validation_subgraph":
-        #     validation_status = node_output.get("validation_status", "processing")
-        #     yield {
-        #         "type": "validation_progress",
-        #         "status": validation_status,
-        #         "message": node_output.get("status_message", "正在验证信息..."),
-        #         "session_id": self.config.session_id
-        #     }
-        #
-        # # 代码增强节点 - 流式返回增强过程和结果
-        # elif node_name == "model_enhance_node":
-        #     async for progress_chunk in self._stream_enhancement_progress(node_output):
-        #         yield progress_chunk
-        #
-        # # 属性名称review节点 - 返回属性review结果
-        # elif node_name == "attribute_review_subgraph" or node_name == "attribute_review":
-        #     avg_score = node_output.get("attribute_avg_score", 0)
-        #     review_results = node_output.get("attribute_review_results", [])
-        #     improvements_applied = node_output.get("attribute_improvements_applied", False)
-        #
-        #     yield {
-        #         "type": "attribute_review",
-        #         "avg_score": avg_score,
-        #         "review_results": review_results,
-        #         "improvements_applied": improvements_applied,
-        #         "message": "属性命名review完成" if improvements_applied else "保持原有属性命名",
-        #         "session_id": self.config.session_id
-        #     }
-        #
-        # # 代码review节点 - 返回review结果
-        # elif node_name == "code_review_subgraph" or node_name == "review":
-        #     review_score = node_output.get("review_score", 0)
-        #     review_feedback = node_output.get("review_feedback", "")
-        #     review_suggestions = node_output.get("review_suggestions", [])
-        #     review_round = node_output.get("review_round", 1)
-        #
-        #     yield {
-        #         "type": "code_review",
-        #         "score": review_score,
-        #         "feedback": review_feedback,
-        #         "suggestions": review_suggestions,
-        #         "round": review_round,
-        #         "session_id": self.config.session_id
-        #     }
-        #
-        # # 代码重新生成节点 - 返回改进进度
-        # elif node_name == "regenerate":
-        #     yield {
-        #         "type": "code_regeneration",
-        #         "status": node_output.get("status", "processing"),
-        #         "message": node_output.get("status_message", "正在根据review建议重新生成代码..."),
-        #         "session_id": self.config.session_id
-        #     }
-        #
-        # # 微调节点 - 返回微调后的代码
-        # elif node_name == "code_refinement_node":
-        #     refined_code = node_output.get("enhance_code", "")
-        #     if refined_code:
-        #         yield {
-        #             "type": "refined_code",
-        #             "content": refined_code,
-        #             "round": node_output.get("current_refinement_round", 1),
-        #             "session_id": self.config.session_id
-        #         }
-        #
-        # # GitHub推送节点
-        # elif node_name == "github_push_node":
-        #     yield {
-        #         "type": "github_push",
-        #         "status": node_output.get("status", "processing"),
-        #         "message": node_output.get("status_message", "正在推送到GitHub..."),
-        #         "pr_url": node_output.get("pr_url", ""),
-        #         "session_id": self.config.session_id
-        #     }
-        #
-        # # ADB更新节点
-        # elif node_name == "adb_update_node":
-        #     yield {
-        #         "type": "adb_update",
-        #         "status": node_output.get("status", "processing"),
-        #         "message": node_output.get("status_message", "正在更新ADB..."),
-        #         "session_id": self.config.session_id
-        #     }
-        #
-        # # Confluence节点
-        # elif node_name == "confluence_node":
-        #     yield {
-        #         "type": "confluence_update",
-        #         "status": node_output.get("status", "processing"),
-        #         "page_url": node_output.get("confluence_page_url", ""),
-        #         "session_id": self.config.session_id
-        #     }
-
-        # 默认节点输出
-        else:
-            yield {
-                "type": "node_update",
-                "node": node_name,
-                "status": node_output.get("status", "processing"),
-                "message": node_output.get("status_message", ""),
-                "session_id": self.config.session_id
-            }
+
+    async def _handle_chat_output(self, node_name: str, node_output: Dict) -> AsyncGenerator[Dict, None]:
+        """聊天/功能节点 - 流式返回AI响应"""
+        async for text_chunk in self._stream_chat_content(node_output):
+            yield text_chunk
+
+    async def _handle_default_output(self, node_name: str, node_output: Dict) -> AsyncGenerator[Dict, None]:
+        """默认节点输出"""
+        yield {
+            "type": "node_update",
+            "node": node_name,
+            "status": node_output.get("status", "processing"),
+            "message": node_output.get("status_message", ""),
+            "session_id": self.config.session_id
+        }
 
     async def _stream_chat_content(self, node_output: Dict) -> AsyncGenerator[Dict, None]:
         """流式输出聊天内容"""
         messages = node_output.get("messages", [])
 
         for msg in messages:
-            if isinstance(msg, AIMessage):
+            if isinstance(msg, AIMessage) and self._mark_content_displayed(msg.content):
                 content = msg.content
                 # 对于较短的内容（如workflow_summary），可以一次性发送
                 if len(content) < 500:
@@ -605,135 +717,7 @@ class EDWStreamService:
 
     def _get_node_metadata(self, node_name: str) -> Dict:
         """获取节点元数据 - 增强版"""
-        metadata_map = {
-            "navigate_node": {
-                "icon": "🧭", 
-                "label": "任务分类", 
-                "color": "#4CAF50",
-                "description": "正在分析您的需求类型..."
-            },
-            "chat_node": {
-                "icon": "💬", 
-                "label": "智能对话", 
-                "color": "#2196F3",
-                "description": "正在与AI助手对话..."
-            },
-            "function_node": {
-                "icon": "⚡", 
-                "label": "功能执行", 
-                "color": "#673AB7",
-                "description": "正在执行功能任务..."
-            },
-            "validation_subgraph": {
-                "icon": "✅", 
-                "label": "信息验证", 
-                "color": "#FF9800",
-                "description": "正在验证必要信息的完整性..."
-            },
-            "search_table_code_node": {
-                "icon": "🔍",
-                "label": "代码搜索",
-                "color": "#4CAF50",
-                "description": "正在搜索目标表的代码文件..."
-            },
-            "requirement_extraction_node": {
-                "icon": "📋",
-                "label": "需求提取",
-                "color": "#2196F3",
-                "description": "正在提取和理解您的需求..."
-            },
-            "field_standardization_node": {
-                "icon": "📏",
-                "label": "字段标准化",
-                "color": "#9C27B0",
-                "description": "正在标准化字段命名..."
-            },
-            "attribute_review_subgraph": {
-                "icon": "📝", 
-                "label": "属性命名Review", 
-                "color": "#00BCD4",
-                "description": "正在评审字段属性名称..."
-            },
-            "attribute_review": {
-                "icon": "✏️", 
-                "label": "属性评估", 
-                "color": "#00ACC1",
-                "description": "正在评估属性命名的规范性..."
-            },
-            "model_enhance_node": {
-                "icon": "🚀", 
-                "label": "代码增强", 
-                "color": "#9C27B0",
-                "description": "正在生成增强代码..."
-            },
-            "code_enhance_node": {
-                "icon": "⚙️",
-                "label": "代码生成",
-                "color": "#673AB7",
-                "description": "正在生成优化后的代码..."
-            },
-            "code_review_subgraph": {
-                "icon": "🔍", 
-                "label": "代码Review", 
-                "color": "#FF5722",
-                "description": "正在评审代码质量..."
-            },
-            "review": {
-                "icon": "📊", 
-                "label": "质量评估", 
-                "color": "#FF5722",
-                "description": "正在评估代码质量和需求符合度..."
-            },
-            "regenerate": {
-                "icon": "🔧", 
-                "label": "代码改进", 
-                "color": "#FF6F00",
-                "description": "根据评审意见改进代码..."
-            },
-            "code_refinement_node": {
-                "icon": "✨", 
-                "label": "代码微调", 
-                "color": "#00BCD4",
-                "description": "正在微调代码细节..."
-            },
-            "refinement_inquiry_node": {
-                "icon": "💭", 
-                "label": "微调询问", 
-                "color": "#FFC107",
-                "description": "正在询问微调需求..."
-            },
-            "refinement_intent_node": {
-                "icon": "🎯", 
-                "label": "意图识别", 
-                "color": "#795548",
-                "description": "正在识别用户意图..."
-            },
-            "github_push_node": {
-                "icon": "📤", 
-                "label": "推送GitHub", 
-                "color": "#607D8B",
-                "description": "正在推送代码到GitHub..."
-            },
-            "adb_update_node": {
-                "icon": "🔄", 
-                "label": "更新ADB", 
-                "color": "#E91E63",
-                "description": "正在更新ADB数据库..."
-            },
-            "confluence_node": {
-                "icon": "📝", 
-                "label": "生成文档", 
-                "color": "#3F51B5",
-                "description": "正在生成技术文档..."
-            },
-            "email_node": {
-                "icon": "📧", 
-                "label": "发送邮件", 
-                "color": "#009688",
-                "description": "正在发送邮件通知..."
-            }
-        }
-        return metadata_map.get(node_name, {
+        return NODE_METADATA.get(node_name, {
             "icon": "⚙️",
             "label": node_name.replace("_", " ").title(),
             "color": "#757575",
@@ -742,13 +726,7 @@ class EDWStreamService:
 
     def _get_task_type_label(self, task_type: str) -> str:
         """获取任务类型的中文标签"""
-        type_labels = {
-            "model_enhance": "模型增强",
-            "model_add": "新增模型",
-            "chat": "智能对话",
-            "other": "其他任务"
-        }
-        return type_labels.get(task_type, task_type)
+        return TASK_TYPE_LABELS.get(task_type, task_type)
 
     def _check_interrupt(self, node_output: Dict) -> bool:
         """检查节点输出是否包含中断信号"""
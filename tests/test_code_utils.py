@@ -0,0 +1,32 @@
+"""
+代码工具函数：表名提取
+"""
+
+import pytest
+
+from src.graph.utils.code import extract_tables_from_code
+
+
+@pytest.mark.parametrize("code, expected", [
+    ("SELECT a FROM dwd_fi.fi_invoice t JOIN dim.dim_company c ON t.id = c.id",
+     {"dwd_fi.fi_invoice", "dim.dim_company"}),
+    ("INSERT INTO ads.ads_result SELECT * FROM dws.dws_summary;",
+     {"ads.ads_result", "dws.dws_summary"}),
+    # 不同关键字的匹配相互重叠时，各关键字都要单独识别
+    ("select * from update x.yyyyyy", {"x.yyyyyy"}),
+    ("FROM JOIN db.zzzzz", {"db.zzzzz"}),
+    ("select 1\nfrom\njoin db.c1234", {"db.c1234"}),
+])
+def test_extract_tables_from_sql(code, expected):
+    assert set(extract_tables_from_code(code)) == expected
+
+
+def test_extract_tables_from_spark():
+    code = (
+        'df = spark.table("dwd_fi.fi_invoice")\n'
+        'df2 = spark.read.table("dim.dim_company")\n'
+        'df3 = spark.sql("SELECT * FROM dws.dws_summary")\n'
+    )
+    assert set(extract_tables_from_code(code)) == {
+        "dwd_fi.fi_invoice", "dim.dim_company", "dws.dws_summary"
+    }
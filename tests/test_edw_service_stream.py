@@ -0,0 +1,70 @@
+"""
+EDW流式服务：子图节点推送的custom数据需要能到达客户端
+"""
+
+import asyncio
+from typing import TypedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.config import get_stream_writer
+from langgraph.graph import StateGraph, START, END
+
+from src.server.edw_service import EDWStreamConfig, EDWStreamService, astream_graph
+
+
+class _State(TypedDict, total=False):
+    enhance_code: str
+
+
+async def _enhance_node(state: _State):
+    # 与增强引擎相同的推送方式
+    get_stream_writer()({"type": "enhancement_chunk", "content": "SELECT 1"})
+    return {"enhance_code": "SELECT 1"}
+
+
+def _build_graph():
+    checkpointer = InMemorySaver()
+    model_dev = (
+        StateGraph(_State)
+        .add_node("model_enhance_node", _enhance_node)
+        .add_edge(START, "model_enhance_node")
+        .add_edge("model_enhance_node", END)
+        .compile(checkpointer=checkpointer)
+    )
+    return (
+        StateGraph(_State)
+        .add_node("model_dev_node", model_dev)
+        .add_edge(START, "model_dev_node")
+        .add_edge("model_dev_node", END)
+        .compile(checkpointer=checkpointer)
+    )
+
+
+async def _collect(graph):
+    config = {"configurable": {"thread_id": "test"}}
+    return [item async for item in astream_graph(graph, {}, config)]
+
+
+def test_subgraph_custom_chunk_reaches_client():
+    events = asyncio.run(_collect(_build_graph()))
+
+    custom = [chunk for _, mode, chunk in events if mode == "custom"]
+    assert custom == [{"type": "enhancement_chunk", "content": "SELECT 1"}]
+
+    service = EDWStreamService(EDWStreamConfig(session_id="s1", user_id="u1"))
+    assert service._build_custom_chunk(custom[0]) == {
+        "type": "enhancement_chunk",
+        "content": "SELECT 1",
+        "session_id": "s1",
+    }
+
+
+def test_top_level_updates_still_reported():
+    events = asyncio.run(_collect(_build_graph()))
+
+    top_level_nodes = [
+        node for namespace, mode, chunk in events
+        if mode == "updates" and not namespace
+        for node in chunk
+    ]
+    assert top_level_nodes == ["model_dev_node"]
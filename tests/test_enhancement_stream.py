@@ -0,0 +1,75 @@
+"""
+代码增强流式执行：非流式模型整条返回的AI消息也要作为结果，工具调用前的片段需通知前端丢弃
+"""
+
+import asyncio
+from typing import TypedDict
+
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.graph import StateGraph, START, END
+from langgraph.prebuilt import create_react_agent
+
+from src.graph.utils.enhancement import _astream_agent_content
+
+
+@tool
+def lookup_schema(table_name: str) -> str:
+    """查询表结构"""
+    return "id bigint"
+
+
+class _NonStreamingModel(FakeMessagesListChatModel):
+    """只实现整条生成、不逐token输出的模型"""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def _build_agent():
+    responses = [
+        AIMessage(
+            content="先查询表结构",
+            tool_calls=[{"name": "lookup_schema", "args": {"table_name": "a.b"}, "id": "call_1"}],
+        ),
+        AIMessage(content='{"enhanced_code": "SELECT 1"}'),
+    ]
+    return create_react_agent(_NonStreamingModel(responses=responses), [lookup_schema])
+
+
+class _State(TypedDict, total=False):
+    content: str
+
+
+# 与增强引擎一致，智能体调用携带线程配置
+_AGENT_CONFIG = {"configurable": {"thread_id": "enhance-test"}}
+
+
+def test_final_round_content_without_token_streaming():
+    content = asyncio.run(_astream_agent_content(_build_agent(), "增强代码", _AGENT_CONFIG))
+    assert content == '{"enhanced_code": "SELECT 1"}'
+
+
+def test_reset_is_pushed_before_the_next_round():
+    agent = _build_agent()
+
+    async def _enhance_node(state: _State):
+        return {"content": await _astream_agent_content(agent, "增强代码", _AGENT_CONFIG)}
+
+    graph = (
+        StateGraph(_State)
+        .add_node("enhance", _enhance_node)
+        .add_edge(START, "enhance")
+        .add_edge("enhance", END)
+        .compile()
+    )
+
+    async def _collect():
+        return [chunk async for chunk in graph.astream({}, stream_mode="custom")]
+
+    assert asyncio.run(_collect()) == [
+        {"type": "enhancement_chunk", "content": "先查询表结构"},
+        {"type": "enhancement_chunk", "content": "", "reset": True},
+        {"type": "enhancement_chunk", "content": '{"enhanced_code": "SELECT 1"}'},
+    ]
@@ -0,0 +1,73 @@
+"""
+字段相似度计算
+"""
+
+from difflib import SequenceMatcher
+
+import pytest
+
+from src.graph.utils import field as field_utils
+from src.graph.utils.field import find_similar_fields, find_similar_fields_batch
+
+AVAILABLE_FIELDS = ["customer_name", "customer_id", "order_amount", "order_date", "cust_nm"]
+INPUT_FIELDS = ["customer_nme", "order_amt", "ordr_date", "unknown_col"]
+
+
+def _lcs_ratio(a: str, b: str) -> float:
+    """Indel相似度的独立实现：2*最长公共子序列长度/总长度"""
+    previous = [0] * (len(b) + 1)
+    for char_a in a:
+        current = [0]
+        for j, char_b in enumerate(b):
+            current.append(previous[j] + 1 if char_a == char_b else max(previous[j + 1], current[j]))
+        previous = current
+    return 2 * previous[-1] / (len(a) + len(b))
+
+
+@pytest.mark.skipif(not (field_utils.RAPIDFUZZ_AVAILABLE and field_utils.NUMPY_AVAILABLE),
+                    reason="需要rapidfuzz和numpy")
+def test_batch_scores_are_exact_indel_ratios():
+    for input_field, similars in zip(INPUT_FIELDS, find_similar_fields_batch(INPUT_FIELDS, AVAILABLE_FIELDS)):
+        for item in similars:
+            assert type(item["similarity"]) is float
+            assert item["similarity"] == _lcs_ratio(input_field.lower(), item["field_name"].lower())
+
+
+@pytest.mark.skipif(not field_utils.RAPIDFUZZ_AVAILABLE, reason="需要rapidfuzz")
+def test_similarity_backend_semantics(monkeypatch):
+    # rapidfuzz按最长公共子序列计分，difflib按连续匹配块计分，同一组字段得分不同
+    assert field_utils._field_similarity("customer_name", "create_time") == 0.5
+    monkeypatch.setattr(field_utils, "RAPIDFUZZ_AVAILABLE", False)
+    assert field_utils._field_similarity("customer_name", "create_time") == \
+        SequenceMatcher(None, "customer_name", "create_time").ratio() == 1 / 3
+
+
+@pytest.mark.parametrize("rapidfuzz_available", [True, False])
+def test_threshold_filters_under_both_backends(monkeypatch, rapidfuzz_available):
+    if rapidfuzz_available and not field_utils.RAPIDFUZZ_AVAILABLE:
+        pytest.skip("需要rapidfuzz")
+    monkeypatch.setattr(field_utils, "RAPIDFUZZ_AVAILABLE", rapidfuzz_available)
+    similars = find_similar_fields("customer_nme", AVAILABLE_FIELDS, 0.9)
+    assert [item["field_name"] for item in similars] == ["customer_name"]
+    assert all(item["similarity"] >= 0.9 for item in similars)
+
+
+def test_threshold_is_third_positional_argument():
+    assert find_similar_fields("customer_nme", AVAILABLE_FIELDS, 0.99) == []
+
+
+def test_batch_matches_single_lookup():
+    batch = find_similar_fields_batch(INPUT_FIELDS, AVAILABLE_FIELDS)
+    single = [find_similar_fields(input_field, AVAILABLE_FIELDS) for input_field in INPUT_FIELDS]
+    assert batch == single
+
+
+def test_analyze_fields_uses_same_scores(monkeypatch):
+    # 关闭numpy时走逐字段分析路径，相似度需与find_similar_fields一致
+    monkeypatch.setattr(field_utils, "NUMPY_AVAILABLE", False)
+    lc_fields = [name.lower() for name in AVAILABLE_FIELDS]
+    split_fields = [set(name.split('_')) for name in lc_fields]
+    results = field_utils._analyze_fields(INPUT_FIELDS, AVAILABLE_FIELDS, lc_fields, split_fields)
+    assert [similars for similars, _ in results] == [
+        find_similar_fields(input_field, AVAILABLE_FIELDS) for input_field in INPUT_FIELDS
+    ]
@@ -0,0 +1,68 @@
+"""
+微调意图关键词预判：只对明确的确认语和修改诉求短路，否定和提问交给LLM
+"""
+
+import pytest
+
+from src.graph.nodes.refinement import intent as intent_module
+from src.graph.nodes.refinement.intent import _quick_classify_intent
+
+
+@pytest.mark.parametrize("text", ["好的", "可以", "没问题", "继续吧", "OK", "满意！"])
+def test_affirmative_confirmation_short_circuits(text):
+    result = _quick_classify_intent(text)
+    assert result is not None
+    assert result.intent == "SATISFIED_CONTINUE"
+
+
+@pytest.mark.parametrize("text", [
+    "帮我优化一下", "加个注释", "调换一下字段顺序",
+    "改成左连接", "调整过滤条件", "再改改", "重写这段逻辑", "Refine the join",
+])
+def test_explicit_refinement_request_short_circuits(text):
+    result = _quick_classify_intent(text)
+    assert result is not None
+    assert result.intent == "REFINEMENT_NEEDED"
+    assert result.extracted_requirements == text
+
+
+@pytest.mark.parametrize("text", [
+    "不要修改",
+    "别修改了",
+    "不用优化",
+    "无需调整注释",
+    "没必要重构",
+    "不对，改成左连接",
+    "这样对不对",
+    "性能怎么样？",
+    "为什么要优化？",
+    "注释是什么意思",
+    "可以加注释吗",
+    "可以?",
+    "性能不错，继续吧",
+])
+def test_negation_and_questions_go_to_llm(text):
+    assert _quick_classify_intent(text) is None
+
+
+def test_empty_input_goes_to_llm():
+    assert _quick_classify_intent("   ") is None
+
+
+def test_keyword_hit_skips_message_summarization(monkeypatch):
+    calls = []
+
+    class _RecordingSummarizer:
+        def summarize_if_needed(self, messages):
+            calls.append(messages)
+            return messages[-2:]
+
+    monkeypatch.setattr(intent_module, "get_message_summarizer", lambda: _RecordingSummarizer())
+    result = intent_module.refinement_intent_node({
+        "user_refinement_input": "好的",
+        "messages": ["历史消息"] * 50,
+    })
+    assert result["user_intent"] == "SATISFIED_CONTINUE"
+    assert result["intent_confidence"] == 0.95
+    assert [m.content for m in result["messages"]] == ["好的"]
+    assert calls == []